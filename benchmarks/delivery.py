@@ -0,0 +1,219 @@
+"""Measure how fast events are built, serialized and delivered to a local TCP
+listener standing in for the Sensu client.
+
+Each case reports events per second and the p50/p99 latency of a single
+call. Results can be saved as JSON and compared with an earlier run, e.g. of
+another version:
+
+    python benchmarks/delivery.py --output new.json --compare old.json
+
+Run it with pysensu_yelp installed (e.g. ``pip install -e .``).
+"""
+
+import argparse
+import json
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pysensu_yelp
+
+EVENT = dict(
+    name="benchmark_check",
+    runbook="http://pysensu-yelp.readthedocs.org",
+    status=pysensu_yelp.Status.OK,
+    output="OK: everything is fine",
+    team="benchmarks",
+    check_every="1m",
+    alert_after="5m",
+    ttl="10m",
+    tip="This is only a benchmark",
+)
+
+LARGE_EVENT = dict(EVENT, output="x" * 60 * 1024)
+
+BATCH_SIZE = 100
+
+
+class Listener:
+    """A TCP server that reads and discards everything sent to it, counting
+    the events.
+    """
+
+    def __init__(self):
+        self.events = 0
+        self._cond = threading.Condition()
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen(128)
+        self.host, self.port = self._server.getsockname()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            sock, _ = self._server.accept()
+            threading.Thread(target=self._read, args=(sock,), daemon=True).start()
+
+    def _read(self, sock):
+        with sock:
+            while True:
+                data = sock.recv(1 << 16)
+                if not data:
+                    return
+                with self._cond:
+                    self.events += data.count(b"\n")
+                    self._cond.notify_all()
+
+    def wait_for(self, events, timeout):
+        """Wait until ``events`` events have been read, returning whether they
+        were.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self.events >= events, timeout)
+
+
+def percentile(sorted_timings, fraction):
+    index = min(len(sorted_timings) - 1, int(len(sorted_timings) * fraction))
+    return sorted_timings[index]
+
+
+def warm_up_calls(iterations):
+    return min(iterations, 10)
+
+
+def measure(call, iterations, events_per_call=1):
+    """Time ``iterations`` calls, after a few warm-up calls."""
+    for _ in range(warm_up_calls(iterations)):
+        call()
+    timings = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call_start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - call_start)
+    total = time.perf_counter() - start
+    timings.sort()
+    return {
+        "iterations": iterations,
+        "events_per_sec": iterations * events_per_call / total,
+        "p50_us": percentile(timings, 0.50) * 1e6,
+        "p99_us": percentile(timings, 0.99) * 1e6,
+    }
+
+
+def run_cases(listener, iterations):
+    client = pysensu_yelp.SensuClient(
+        sensu_host=listener.host, sensu_port=listener.port
+    )
+    pysensu_yelp.set_default_client(client)
+    result_dict = pysensu_yelp.build_event(**EVENT)
+    event = pysensu_yelp.Event(**EVENT)
+    batch = [EVENT] * BATCH_SIZE
+    # Explicitly, for versions before set_default_client or that ignored it
+    destination = dict(sensu_host=listener.host, sensu_port=listener.port)
+    sensu_dict = {k: v for k, v in EVENT.items() if k not in ("status", "output")}
+    sensu_dict.update(destination)
+    wrapper_command = [
+        sys.executable,
+        "-m",
+        "pysensu_yelp",
+        json.dumps(sensu_dict),
+        "true",
+    ]
+
+    # The call, how many times to make it, how many events it sends (if any)
+    cases = {
+        "build_event": (lambda: pysensu_yelp.build_event(**EVENT), iterations, 0),
+        "encode_event": (lambda: pysensu_yelp.encode_event(result_dict), iterations, 0),
+        "send_event": (
+            lambda: pysensu_yelp.send_event(**EVENT, **destination),
+            iterations,
+            1,
+        ),
+        "send_prebuilt_event": (lambda: client.send(event), iterations, 1),
+        "send_events_batch": (
+            lambda: pysensu_yelp.send_events(batch, **destination),
+            max(1, iterations // BATCH_SIZE),
+            BATCH_SIZE,
+        ),
+        "send_event_large_output": (
+            lambda: pysensu_yelp.send_event(**LARGE_EVENT, **destination),
+            max(1, iterations // 10),
+            1,
+        ),
+        "do_command_wrapper": (
+            lambda: subprocess.run(wrapper_command, check=True),
+            max(1, iterations // 500),
+            1,
+        ),
+    }
+    results = {}
+    sent = 0
+    for name, (call, case_iterations, events_per_call) in cases.items():
+        results[name] = measure(call, case_iterations, max(1, events_per_call))
+        sent += (warm_up_calls(case_iterations) + case_iterations) * events_per_call
+    client.close()
+    if not listener.wait_for(sent, timeout=10):
+        raise SystemExit(
+            f"The listener got {listener.events} events instead of {sent}: "
+            "the results don't measure delivering to it"
+        )
+    return results
+
+
+def compare(results, baseline):
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["events_per_sec"]
+        after = result["events_per_sec"]
+        print(
+            f"{name:<24} {before:12.0f} -> {after:12.0f} events/s ({after / before:.2f}x)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=10000,
+        help="How many single events to send, other cases scale from this. "
+        "Defaults to %(default)s.",
+    )
+    parser.add_argument("--output", help="Save the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run")
+    args = parser.parse_args()
+
+    listener = Listener()
+    results = run_cases(listener, args.iterations)
+
+    for name, result in results.items():
+        print(
+            f"{name:<24} {result['events_per_sec']:12.0f} events/s  "
+            f"p50 {result['p50_us']:10.1f}us  p99 {result['p99_us']:10.1f}us"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "serializer": pysensu_yelp._dumps.__name__,
+                    "time": time.time(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+    if args.compare:
+        with open(args.compare) as f:
+            print()
+            compare(results, json.load(f)["results"])
+
+
+if __name__ == "__main__":
+    main()
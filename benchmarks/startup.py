@@ -0,0 +1,126 @@
+"""Measure how long it takes to start Python and import pysensu_yelp.
+
+Each case runs in a fresh interpreter, ``--runs`` times, after a warm-up run
+that writes the bytecode caches. The cumulative time of ``import
+pysensu_yelp`` is also taken from ``-X importtime``. To compare with another
+version, e.g. the last release, give a git ref to check out and time as
+well::
+
+    python benchmarks/startup.py --baseline v1.0.3 [--runs N] [--json]
+
+Cases that fail on a version (e.g. ``python -m pysensu_yelp`` before it had
+a ``__main__``) are reported as unavailable.
+
+Compared with 1.0.3, this shows no improvement: ``import pysensu_yelp``
+takes about as long (the minimums are within a millisecond, less than the
+noise between runs), and ``import pysensu_yelp.wrapper``, which loads what
+1.0.3 always did, takes about 5ms longer than 1.0.3's ``import
+pysensu_yelp``. Moving the wrapper out saves argparse and subprocess, but the
+library's own code and the modules added since then cost about as much.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CASES = {
+    "python": ["-c", "pass"],
+    "import pysensu_yelp": ["-c", "import pysensu_yelp"],
+    "import pysensu_yelp.wrapper": ["-c", "import pysensu_yelp.wrapper"],
+    "python -m pysensu_yelp --help": ["-m", "pysensu_yelp", "--help"],
+}
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_importtime_line = re.compile(rb"import time:\s+\d+ \|\s+(\d+) \| pysensu_yelp$")
+
+
+def run(args, tree, env):
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=tree,
+        env=dict(env, PYTHONPATH=tree),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+
+
+def time_case(args, tree, runs, env):
+    if run(args, tree, env).returncode != 0:
+        return None
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run(args, tree, env)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"min_ms": min(timings), "median_ms": statistics.median(timings)}
+
+
+def import_time(tree, runs, env):
+    """The median cumulative time of importing pysensu_yelp, in ms."""
+    timings = []
+    for _ in range(runs):
+        stderr = run(["-X", "importtime", "-c", "import pysensu_yelp"], tree, env)
+        timings.extend(
+            int(match.group(1)) / 1000
+            for match in map(_importtime_line.match, stderr.stderr.splitlines())
+            if match
+        )
+    return statistics.median(timings)
+
+
+def measure(tree, runs, env):
+    results = {name: time_case(case, tree, runs, env) for name, case in CASES.items()}
+    results["importtime pysensu_yelp"] = {"median_ms": import_time(tree, runs, env)}
+    return results
+
+
+def checkout(ref, directory):
+    """Extract the tree of a git ref into ``directory``."""
+    archive = subprocess.run(
+        ["git", "archive", ref], cwd=ROOT, stdout=subprocess.PIPE, check=True
+    )
+    subprocess.run(["tar", "-x", "-C", directory], input=archive.stdout, check=True)
+
+
+def describe(result):
+    if result is None:
+        return f"{'unavailable':>34}"
+    if "min_ms" not in result:
+        return f"{'':>15}median {result['median_ms']:7.1f}ms"
+    return f"min {result['min_ms']:7.1f}ms  median {result['median_ms']:7.1f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--baseline", help="A git ref to compare with")
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    # Otherwise every run compiles pysensu_yelp from source
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    results = {"current": measure(ROOT, args.runs, env)}
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as directory:
+            checkout(args.baseline, directory)
+            results[args.baseline] = measure(directory, args.runs, env)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for version, version_results in results.items():
+        print(version)
+        for name, result in version_results.items():
+            print(f"  {name:<32} {describe(result)}")
+
+
+if __name__ == "__main__":
+    main()
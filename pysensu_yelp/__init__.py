@@ -1,16 +1,48 @@
-#!/usr/bin/env python
-import argparse
+import abc
+import functools
 import json
+import os
 import re
 import socket
-import subprocess
 import sys
+import threading
+import time
+import weakref
 from collections import OrderedDict
+from enum import Enum
 from enum import IntEnum
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Optional
+from typing import Tuple
+from typing import Type
+from typing import TYPE_CHECKING
 from typing import Union
 
+# orjson takes longer to import than the rest of the library, so only check
+# that it's there for now (a None in sys.modules means it mustn't be imported).
+# This asks the import system's finders directly, as importlib.util.find_spec
+# would, rather than import importlib for it.
+_has_orjson = (
+    sys.modules["orjson"] is not None
+    if "orjson" in sys.modules
+    else any(
+        finder.find_spec("orjson", None) is not None
+        for finder in sys.meta_path
+        if hasattr(finder, "find_spec")
+    )
+)
+
+if TYPE_CHECKING:
+    from pysensu_yelp.breaker import CircuitBreaker
+    from pysensu_yelp.sinks import Sink
+    from pysensu_yelp.spool import Spool
+    from pysensu_yelp.stats import Stats
+    from pysensu_yelp.suppression import Suppressor
+
 """
 pysensu-yelp
 ============
@@ -79,6 +111,11 @@ In Sensu it is called `ttl` and is a check-defined configuration option.
 unit. (`ttl=1h` will make Sensu send an alert if the `send_event` function
 isn't called at least once an hour)
 
+Rather than writing a timer loop to keep such a check fresh, register it
+with a ``HeartbeatScheduler`` from ``pysensu_yelp.heartbeat``, which sends
+keepalives for all registered checks from a single thread, spread out so
+that a fleet of hosts doesn't send them all at once.
+
 **Note**: If you have removed a check, renamed it, or moved it to a different
 host, Sensu will *still* fire a staleness alert. This is because the
 `source/check_name` is the primary key to distinguish events in Sensu.
@@ -114,8 +151,154 @@ A final invocation might look like this::
         source="my_cool_service",
     )
 
+
+Reusing Connections
+^^^^^^^^^^^^^^^^^^^
+
+``send_event`` keeps one long-lived connection open per ``sensu_host`` and
+``sensu_port`` instead of connecting for every event, and transparently
+reconnects if the Sensu client has gone away in the meantime. If you want
+to manage that connection yourself (for example to close it when a worker
+shuts down), create a ``SensuClient`` and send through it::
+
+    client = pysensu_yelp.SensuClient(sensu_host="127.0.0.1")
+    client.send_event(
+        name="my_cool_check",
+        output="Everything is fine",
+        status=0,
+        team="ops",
+        runbook="http://pysensu-yelp.readthedocs.org",
+    )
+    client.close()
+
+A ``SensuClient`` is safe to share between threads. It also survives
+``os.fork()``, e.g. in preforking servers such as gunicorn and uwsgi: the
+child forgets the connections it inherited and opens its own on its first
+send, so processes never write to the same socket.
+
+For high-volume checks where losing the odd event is acceptable, events can
+be sent over UDP instead, with ``transport=pysensu_yelp.Transport.UDP``. Each
+event is then a single datagram, which never blocks on a dead Sensu client,
+and outputs too large for a datagram are truncated.
+
+A Sensu client listening on a Unix domain socket is reached by giving its
+path instead of a host and port, with ``sensu_socket_path="/run/sensu.sock"``
+or ``sensu_host="unix:///run/sensu.sock"``. The connection is a stream one,
+or a datagram one with ``Transport.UDP``, and is reused just the same.
+
+In tests, load tests and dry runs, a sink from ``pysensu_yelp.sinks`` can
+take the Sensu client's place: ``transport=MemorySink()`` keeps the events in
+memory, ``FileSink(path)`` writes them to a file and ``NullSink()`` throws
+them away. Setting the ``PYSENSU_YELP_TRANSPORT`` environment variable to
+``memory``, ``null`` or ``file:<path>`` does the same for every client that
+isn't given a transport, including the one behind ``send_event``. A
+transport it doesn't know is an error for those clients, except for the one
+behind ``send_event``, which logs a warning and uses TCP instead.
+
+
+Suppressing Repeated Events
+^^^^^^^^^^^^^^^^^^^^^^^^^^^
+
+If your code may report the same result much more often than the check's
+``check_every``, give the client a ``Suppressor``. It sends status (and
+output) changes right away, but identical repeats only once per
+``check_every``::
+
+    from pysensu_yelp.suppression import Suppressor
+
+    pysensu_yelp.set_default_client(pysensu_yelp.SensuClient(suppressor=Suppressor()))
+
+
+Periodic Checks
+^^^^^^^^^^^^^^^
+
+Most of the arguments to ``send_event`` are the same every time a periodic
+check reports its result. A ``CheckTemplate`` validates and serializes them
+once, so that reporting a result is just a matter of filling in the
+status and output::
+
+    check = pysensu_yelp.CheckTemplate(
+        name="my_cool_check",
+        team="ops",
+        runbook="http://pysensu-yelp.readthedocs.org",
+        ttl="1h",
+    )
+    check.emit(pysensu_yelp.Status.OK, "Everything is fine")
+
+
+Sending in the Background
+^^^^^^^^^^^^^^^^^^^^^^^^^
+
+``send_event`` normally writes the event to the Sensu client before it
+returns, so a slow or missing Sensu client slows down the caller too. To
+hand events off to a background thread instead, install a
+``BackgroundEmitter`` as the default client::
+
+    from pysensu_yelp.emitter import BackgroundEmitter
+
+    pysensu_yelp.set_default_client(BackgroundEmitter(max_queue_size=1000))
+
+Events still in the queue are flushed when the interpreter exits.
+
+
+Alerting on Log Records
+^^^^^^^^^^^^^^^^^^^^^^^
+
+To alert when something logs an error, add a ``SensuHandler`` from
+``pysensu_yelp.handler`` to its logger. It sends an event per record from a
+background thread, named after the logger, and rolls repeats of a record up
+into one event per minute::
+
+    from pysensu_yelp.handler import SensuHandler
+
+    logging.getLogger("my_service").addHandler(
+        SensuHandler(runbook="y/my-service", team="my_team")
+    )
+
+
+Timeouts and Circuit Breaking
+^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
+
+Connecting to the Sensu client gives up after ``connect_timeout`` seconds
+(5 by default), and writing to it after ``send_timeout`` (10). When the
+Sensu client is down for good, a ``CircuitBreaker`` saves even that: after a
+few failures in a row, further sends fail right away (or are spooled) until
+a probe gets through again::
+
+    from pysensu_yelp.breaker import CircuitBreaker
+
+    pysensu_yelp.set_default_client(
+        pysensu_yelp.SensuClient(connect_timeout=1, breaker=CircuitBreaker())
+    )
+
+
+Statistics
+^^^^^^^^^^
+
+To find out what became of the events a client sent, and how long sending
+took, give it a ``Stats`` from ``pysensu_yelp.stats``::
+
+    from pysensu_yelp.stats import Stats
+
+    stats = Stats()
+    pysensu_yelp.set_default_client(pysensu_yelp.SensuClient(stats=stats))
+
+``stats.snapshot()`` then returns the counts of sent, failed, spooled,
+dropped and suppressed events per check, along with connect and send latency
+histograms and the number of bytes written.
+
 """
 
+DEFAULT_SENSU_HOST = "169.254.255.254"
+DEFAULT_SENSU_PORT = 3030
+# Largest UDP payload sent by default, comfortably below what the Sensu
+# client reads per datagram.
+DEFAULT_MAX_DATAGRAM_SIZE = 8192
+# How many seconds to wait for the Sensu client to accept a connection, and
+# to take more of a payload, before giving up
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_SEND_TIMEOUT = 10.0
+
 
 # Status codes for sensu checks
 # Code using this module can write pysensu_yelp.Status.OK, etc
@@ -127,6 +310,73 @@ class Status(IntEnum):
     UNKNOWN = 3
 
 
+class Transport(Enum):
+    """How events are delivered to the Sensu client."""
+
+    # One long-lived stream connection, events are newline separated
+    TCP = "tcp"
+    # One datagram per event. Cheaper and never blocks on a dead Sensu
+    # client, but events can be lost and large outputs get truncated.
+    UDP = "udp"
+    # The same two over a Unix domain socket, whose path is given as the host
+    UNIX = "unix"
+    UNIX_DATAGRAM = "unix_datagram"
+
+
+# The transports sending one datagram per event
+_DATAGRAM_TRANSPORTS = frozenset((Transport.UDP, Transport.UNIX_DATAGRAM))
+_UNIX_TRANSPORTS = frozenset((Transport.UNIX, Transport.UNIX_DATAGRAM))
+
+# Hosts starting with this are Unix socket paths, e.g. "unix:///run/sensu.sock"
+UNIX_PREFIX = "unix://"
+
+# What TCP and UDP turn into when the host is a Unix socket path
+_unix_transports = {
+    Transport.TCP: Transport.UNIX,
+    Transport.UDP: Transport.UNIX_DATAGRAM,
+}
+
+# Chooses the transport of clients that aren't given one, see parse_transport
+TRANSPORT_ENVIRONMENT_VARIABLE = "PYSENSU_YELP_TRANSPORT"
+
+
+# A network transport, or a stand-in for the Sensu client
+_AnyTransport = Union[Transport, "Sink"]
+
+
+def parse_transport(spec: str) -> _AnyTransport:
+    """Turn a transport's name into a :class:`Transport`, or a
+    :class:`pysensu_yelp.sinks.Sink` for the stand-ins: ``"tcp"``, ``"udp"``,
+    ``"unix"``, ``"unix_datagram"``, ``"memory"``, ``"null"``, or ``"file:"``
+    followed by a path.
+    """
+    if spec.startswith("file:"):
+        from pysensu_yelp.sinks import FileSink
+
+        return FileSink(spec[len("file:") :])
+    if spec == "memory":
+        from pysensu_yelp.sinks import MemorySink
+
+        return MemorySink()
+    if spec == "null":
+        from pysensu_yelp.sinks import NullSink
+
+        return NullSink()
+    try:
+        return Transport(spec)
+    except ValueError:
+        raise ValueError(
+            f"Unknown transport {spec!r}, expected tcp, udp, unix, unix_datagram, "
+            "memory, null or file:<path>"
+        ) from None
+
+
+def _as_transport(transport: Union[str, _AnyTransport]) -> _AnyTransport:
+    if isinstance(transport, (Transport, str)):
+        return Transport(transport)
+    return transport
+
+
 # Copied from:
 # http://thomassileo.com/blog/2013/03/31/how-to-convert-seconds-to-human-readable-interval-back-and-forth-with-python/
 interval_dict = OrderedDict(
@@ -142,38 +392,468 @@ interval_dict = OrderedDict(
 )
 
 
+# Matches one <value><unit> pair, e.g. the "3W" in "1M3W"
+interval_regex = re.compile(
+    "(?P<value>[0-9]+)(?P<unit>[{}])".format("".join(interval_dict.keys()))
+)
+
+
+class IntervalError(ValueError):
+    """Raised for interval strings :func:`human_to_seconds` can't parse."""
+
+
+@functools.lru_cache(maxsize=256)
+def _interval_to_seconds(string: str) -> int:
+    seconds = 0
+    position = 0
+    for match in interval_regex.finditer(string):
+        # finditer skips over anything that doesn't match, which we don't
+        if match.start() != position:
+            break
+        seconds += int(match.group("value")) * interval_dict[match.group("unit")]
+        position = match.end()
+    if position != len(string):
+        raise IntervalError(f"Bad interval format for {string}")
+    return seconds
+
+
 def human_to_seconds(string: Optional[str]) -> Optional[int]:
     """Convert internal string like 1M, 1Y3M, 3W to seconds.
 
+    The results are cached, as the same few intervals tend to be converted
+    over and over again.
+
     :type string: str
     :param string: Interval string like 1M, 1W, 1M3W4h2s...
                    (s => seconds, m => minutes, h => hours, D => days, W => weeks, M => months, Y => Years).
 
     :rtype: int
     :return: The conversion in seconds of string.
-    """
-    interval_exc = f"Bad interval format for {string}"
-
-    interval_regex = re.compile(
-        "^(?P<value>[0-9]+)(?P<unit>[{}])".format("".join(interval_dict.keys()))
-    )
-    seconds = 0
 
+    :raises IntervalError: If the string is not a valid interval.
+    """
     if string is None:
         return None
-    while string:
-        match = interval_regex.match(string)
-        if match:
-            value, unit = int(match.group("value")), match.group("unit")
-            if unit in interval_dict:
-                seconds += value * interval_dict[unit]
-                string = string[match.end() :]
-            else:
-                interval_units = interval_dict.keys()
-                raise Exception(f"'{unit}' unit not present in {list(interval_units)}")
+    return _interval_to_seconds(string)
+
+
+name_regex = re.compile(r"^[\w\.-]+$")
+
+
+def build_event(
+    name: str,
+    runbook: str,
+    status: Union[Status, int],
+    output: str,
+    team: str,
+    page: bool = False,
+    tip: Optional[str] = None,
+    notification_email: Optional[str] = None,
+    check_every: str = "30s",
+    realert_every: int = -1,
+    alert_after: str = "0s",
+    dependencies: Optional[List[str]] = None,
+    irc_channels: Optional[str] = None,
+    slack_channels: Optional[str] = None,
+    ticket: bool = False,
+    project: Optional[str] = None,
+    priority: Optional[str] = None,
+    source: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    ttl: Optional[str] = None,
+    component: Optional[str] = None,
+    description: Optional[str] = None,
+    cluster_name: Optional[str] = None,
+    issuetype: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Validate the given information and build the result dict that
+    :func:`send_event` sends to the Sensu client. Takes the same arguments as
+    :func:`send_event`, except for ``sensu_host`` and ``sensu_port``.
+
+    :rtype: dict
+    :return: The result dict, ready to be serialized with :func:`encode_event`.
+    """
+    if not (name and team):
+        raise ValueError("Name and team must be present")
+    if not name_regex.match(name):
+        raise ValueError("Name cannot contain special characters")
+    if not runbook:
+        runbook = "Please set a runbook!"
+    result_dict: Dict[str, Any] = {
+        "name": name,
+        "status": status,
+        "output": output,
+        "handler": "default",
+        "team": team,
+        "runbook": runbook,
+        "tip": tip,
+        "notification_email": notification_email,
+        "interval": human_to_seconds(check_every),
+        "page": page,
+        "realert_every": int(realert_every),
+        "dependencies": [] if dependencies is None else dependencies,
+        "alert_after": human_to_seconds(alert_after),
+        "ticket": ticket,
+        "project": project,
+        "priority": priority,
+        "source": source,
+        "tags": [] if tags is None else tags,
+        "ttl": human_to_seconds(ttl),
+        "issuetype": issuetype,
+    }
+    if irc_channels is not None:
+        result_dict["irc_channels"] = irc_channels
+
+    if slack_channels is not None:
+        result_dict["slack_channels"] = slack_channels
+
+    if component is not None:
+        result_dict["component"] = component
+
+    if description is not None:
+        result_dict["description"] = description
+
+    if cluster_name is not None:
+        result_dict["cluster_name"] = cluster_name
+
+    return result_dict
+
+
+# The arguments of build_event, in order
+_EVENT_FIELDS = (
+    "name",
+    "runbook",
+    "status",
+    "output",
+    "team",
+    "page",
+    "tip",
+    "notification_email",
+    "check_every",
+    "realert_every",
+    "alert_after",
+    "dependencies",
+    "irc_channels",
+    "slack_channels",
+    "ticket",
+    "project",
+    "priority",
+    "source",
+    "tags",
+    "ttl",
+    "component",
+    "description",
+    "cluster_name",
+    "issuetype",
+)
+
+
+def _freeze(value: Any) -> Any:
+    return tuple(value) if isinstance(value, list) else value
+
+
+# The keys of a result dict whose values can be lists, which events keep as
+# tuples
+_LIST_KEYS = ("dependencies", "tags", "irc_channels", "slack_channels")
+
+
+class Event:
+    """An event, validated once when it's created, to be sent with
+    :meth:`SensuClient.send`.
+
+    Takes the same arguments as :func:`build_event`, which become read-only
+    attributes. Lists, e.g. ``tags``, are stored as tuples. Events are
+    immutable and hashable, so they can be cached, shared and deduplicated.
+    They are encoded once, the first time they are sent. Use
+    :meth:`replace` to derive an event with a new status and output::
+
+        event = pysensu_yelp.Event(
+            name="my_cool_check",
+            runbook="http://pysensu-yelp.readthedocs.org",
+            status=pysensu_yelp.Status.OK,
+            output="Everything is fine",
+            team="ops",
+        )
+        client.send(event)
+        client.send(event.replace(status=pysensu_yelp.Status.CRITICAL, output="Oh no"))
+
+    :raises ValueError: If the event is not valid.
+    """
+
+    __slots__ = ("_values", "_result_dict", "_hash", "_payload")
+
+    # For mypy, which doesn't know about the properties of the fields, added
+    # below the class
+    name: str
+    status: Union[Status, int]
+    output: str
+    source: Optional[str]
+    _values: Tuple[Any, ...]
+    _result_dict: Dict[str, Any]
+    _hash: Optional[int]
+    _payload: Optional[bytes]
+
+    def __init__(
+        self,
+        name: str,
+        runbook: str,
+        status: Union[Status, int],
+        output: str,
+        team: str,
+        page: bool = False,
+        tip: Optional[str] = None,
+        notification_email: Optional[str] = None,
+        check_every: str = "30s",
+        realert_every: int = -1,
+        alert_after: str = "0s",
+        dependencies: Optional[List[str]] = None,
+        irc_channels: Optional[str] = None,
+        slack_channels: Optional[str] = None,
+        ticket: bool = False,
+        project: Optional[str] = None,
+        priority: Optional[str] = None,
+        source: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        ttl: Optional[str] = None,
+        component: Optional[str] = None,
+        description: Optional[str] = None,
+        cluster_name: Optional[str] = None,
+        issuetype: Optional[str] = None,
+    ) -> None:
+        values: Tuple[Any, ...] = (
+            name,
+            runbook,
+            status,
+            output,
+            team,
+            page,
+            tip,
+            notification_email,
+            check_every,
+            int(realert_every),
+            alert_after,
+            () if dependencies is None else tuple(dependencies),
+            _freeze(irc_channels),
+            _freeze(slack_channels),
+            ticket,
+            project,
+            priority,
+            source,
+            () if tags is None else tuple(tags),
+            ttl,
+            component,
+            description,
+            cluster_name,
+            issuetype,
+        )
+        # Validate everything now, rather than when the event is sent
+        result_dict = build_event(*values)
+        object.__setattr__(self, "_values", values)
+        object.__setattr__(self, "_result_dict", result_dict)
+        object.__setattr__(self, "_hash", None)
+        object.__setattr__(self, "_payload", None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Events are immutable, use replace()")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Events are immutable")
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # For copy and pickle, which would otherwise restore the slots
+        # through __setattr__
+        return (Event, self._values)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Event):
+            return NotImplemented
+        return self._values == other._values
+
+    def __hash__(self) -> int:
+        value = self._hash
+        if value is None:
+            value = hash(self._values)
+            object.__setattr__(self, "_hash", value)
+        return value
+
+    def __repr__(self) -> str:
+        return (
+            f"Event(name={self.name!r}, status={self.status!r}, output={self.output!r})"
+        )
+
+    def replace(self, **changes: Any) -> "Event":
+        """A copy of the event, with the given arguments changed."""
+        kwargs = dict(zip(_EVENT_FIELDS, self._values))
+        kwargs.update(changes)
+        return Event(**kwargs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The event's result dict, as built by :func:`build_event`."""
+        result_dict = dict(self._result_dict)
+        for key in _LIST_KEYS:
+            value = result_dict.get(key)
+            if isinstance(value, tuple):
+                result_dict[key] = list(value)
+        return result_dict
+
+    def encode(self) -> bytes:
+        """The event, serialized like :func:`encode_event` does. The payload
+        is cached, so later changes of serializer don't affect it.
+        """
+        payload = self._payload
+        if payload is None:
+            payload = encode_event(self.to_dict())
+            object.__setattr__(self, "_payload", payload)
+        return payload
+
+
+def _event_field(index: int) -> property:
+    return property(lambda event: event._values[index])
+
+
+# The fields are read-only attributes, kept together in one tuple
+for _index, _field in enumerate(_EVENT_FIELDS):
+    setattr(Event, _field, _event_field(_index))
+del _index, _field
+
+
+# Serializes an object into a newline-terminated line of JSON
+Serializer = Callable[[Any], bytes]
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return (json.dumps(obj, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+serializers: Dict[str, Serializer] = {"json": _json_dumps}
+
+if _has_orjson:
+
+    class _LazyOrjson:
+        """Stands in for the orjson module until it's first used."""
+
+        def __getattr__(self, name: str) -> Any:
+            global orjson
+            import orjson
+
+            return getattr(orjson, name)
+
+    orjson: Any = _LazyOrjson()
+
+    def _orjson_dumps(obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            # orjson is stricter than json, e.g. about integers over 64 bits
+            # or lone surrogates in strings
+            return _json_dumps(obj)
+
+    serializers["orjson"] = _orjson_dumps
+
+# orjson is a lot faster, use it if it's installed
+_dumps: Serializer = serializers["orjson" if _has_orjson else "json"]
+
+
+def set_serializer(serializer: Union[str, Serializer]) -> None:
+    """Choose how events are serialized to JSON. By default ``orjson`` is used
+    if it is installed, and the standard library's ``json`` otherwise.
+
+    :type serializer: str or callable
+    :param serializer: The name of a serializer in :data:`serializers`
+                       (``"json"`` or ``"orjson"``), or a function taking an
+                       object and returning it serialized as a single
+                       newline-terminated line of compact JSON, as bytes.
+    """
+    global _dumps
+    if isinstance(serializer, str):
+        if serializer not in serializers:
+            raise ValueError(
+                f"Unknown serializer {serializer}, expected one of {list(serializers)}"
+            )
+        serializer = serializers[serializer]
+    _dumps = serializer
+
+
+def encode_event(result_dict: Dict[str, Any]) -> bytes:
+    """Serialize a result dict into the newline-terminated JSON payload the
+    Sensu client socket expects.
+    """
+    return _dumps(result_dict)
+
+
+# Appended to outputs that had to be truncated
+TRUNCATION_MARKER = "... (truncated)"
+
+
+def encode_event_truncated(result_dict: Dict[str, Any], max_size: int) -> bytes:
+    """Like :func:`encode_event`, but if the payload would be larger than
+    ``max_size`` bytes, cut the end of the event's output off to make it fit.
+
+    :raises ValueError: If the event is too large even without any output.
+    """
+    payload = encode_event(result_dict)
+    if len(payload) <= max_size:
+        return payload
+    output = result_dict["output"]
+    # How an output is encoded doesn't depend on the rest of the event, so
+    # only the output has to be re-encoded to find how much of it fits.
+    dumps = _dumps
+    overhead = len(dumps(dict(result_dict, output=""))) - len(dumps(""))
+
+    def fits(keep: int) -> bool:
+        return overhead + len(dumps(output[:keep] + TRUNCATION_MARKER)) <= max_size
+
+    if not fits(0):
+        raise ValueError(f"Event {result_dict['name']} doesn't fit in {max_size} bytes")
+    low, high = 0, len(output)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if fits(middle):
+            low = middle
         else:
-            raise Exception(interval_exc)
-    return seconds
+            high = middle - 1
+    return encode_event(dict(result_dict, output=output[:low] + TRUNCATION_MARKER))
+
+
+def build_events(
+    events: Iterable[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], List[Tuple[int, Exception]]]:
+    """Validate a batch of events and build their result dicts.
+
+    :type events: iterable
+    :param events: Dicts of keyword arguments to :func:`build_event`, e.g.
+                   ``{"name": ..., "runbook": ..., "status": ..., ...}``.
+
+    :rtype: tuple
+    :return: The result dicts of all valid events, and a list of
+             ``(index, exception)`` pairs for the events that failed
+             validation.
+    """
+    result_dicts = []
+    failures = []
+    for index, event in enumerate(events):
+        try:
+            result_dicts.append(build_event(**event))
+        except Exception as e:
+            failures.append((index, e))
+    return result_dicts, failures
+
+
+def encode_events(
+    events: Iterable[Dict[str, Any]],
+) -> Tuple[bytes, List[Tuple[int, Exception]]]:
+    """Validate and serialize a batch of events into a single buffer.
+
+    :type events: iterable
+    :param events: Dicts of keyword arguments to :func:`build_event`.
+
+    :rtype: tuple
+    :return: The concatenated payloads of all valid events, and a list of
+             ``(index, exception)`` pairs for the events that failed
+             validation.
+    """
+    result_dicts, failures = build_events(events)
+    return b"".join(encode_event(r) for r in result_dicts), failures
 
 
 def send_event(
@@ -188,21 +868,22 @@ def send_event(
     check_every: str = "30s",
     realert_every: int = -1,
     alert_after: str = "0s",
-    dependencies: List[str] = [],
+    dependencies: Optional[List[str]] = None,
     irc_channels: Optional[str] = None,
     slack_channels: Optional[str] = None,
     ticket: bool = False,
     project: Optional[str] = None,
     priority: Optional[str] = None,
     source: Optional[str] = None,
-    tags: List[str] = [],
+    tags: Optional[List[str]] = None,
     ttl: Optional[str] = None,
-    sensu_host: str = "169.254.255.254",
-    sensu_port: int = 3030,
+    sensu_host: Optional[str] = None,
+    sensu_port: Optional[int] = None,
     component: Optional[str] = None,
     description: Optional[str] = None,
     cluster_name: Optional[str] = None,
     issuetype: Optional[str] = None,
+    transport: Optional[_AnyTransport] = None,
 ) -> None:
     """Send a new event with the given information. Requires a name, runbook,
     status code, event output, and team but the other keys are kwargs and have
@@ -309,7 +990,13 @@ def send_event(
 
     :type sensu_host: str
     :param sensu_host: The IP or Name to connect to for sending the event.
-                       Defaults to the yocalhost IP.
+                       Defaults to the default client's, the yocalhost IP
+                       unless :func:`set_default_client` says otherwise.
+
+    :type sensu_port: int
+    :param sensu_port: The port to connect to for sending the event.
+                       Defaults to the default client's, 3030 unless
+                       :func:`set_default_client` says otherwise.
 
     :type component: list
     :param component: Component(s) affected by the event. Good example here would
@@ -322,12 +1009,25 @@ def send_event(
                         created.
 
     :type cluster_name: str
-    :param cluster_name: To be added to the result output, used by cluster checks
+    :param cluster_name: To be added to the result output, used by cluster checks.
+                         To send one event for a whole cluster rather than
+                         one per member, see
+                         :class:`pysensu_yelp.rollup.ClusterRollup`.
 
     :type issuetype: str
     :param issuetype: An issue type name such as "Incident" or "Task" to use for
                       newly created JIRA tickets from sensu checks.
 
+    :type transport: Transport
+    :param transport: ``Transport.TCP`` or ``Transport.UDP``. UDP is cheaper and
+                      never blocks on a dead Sensu client, but events can get
+                      lost, and outputs too large for a datagram are truncated.
+                      With a ``sensu_host`` of ``"unix://<path>"`` they go
+                      over a Unix stream or datagram socket instead.
+                      A :class:`pysensu_yelp.sinks.Sink` can stand in for the
+                      Sensu client. Defaults to the default client's, which is
+                      TCP unless ``PYSENSU_YELP_TRANSPORT`` says otherwise.
+
     Note on TTL events and alert_after:
     ``alert_after`` and ``check_every`` only really make sense on events that are created
     periodically. Setting ``alert_after`` on checks that are not periodic is not advised
@@ -340,82 +1040,818 @@ def send_event(
     `Pull request <https://github.com/sensu/sensu/pull/1200>`_)
 
     """
-    if not (name and team):
-        raise ValueError("Name and team must be present")
-    if not re.match(r"^[\w\.-]+$", name):
-        raise ValueError("Name cannot contain special characters")
-    if not runbook:
-        runbook = "Please set a runbook!"
-    result_dict = {
-        "name": name,
-        "status": status,
-        "output": output,
-        "handler": "default",
-        "team": team,
-        "runbook": runbook,
-        "tip": tip,
-        "notification_email": notification_email,
-        "interval": human_to_seconds(check_every),
-        "page": page,
-        "realert_every": int(realert_every),
-        "dependencies": dependencies,
-        "alert_after": human_to_seconds(alert_after),
-        "ticket": ticket,
-        "project": project,
-        "priority": priority,
-        "source": source,
-        "tags": tags,
-        "ttl": human_to_seconds(ttl),
-        "issuetype": issuetype,
-    }
-    if irc_channels is not None:
-        result_dict["irc_channels"] = irc_channels
+    result_dict = build_event(
+        name,
+        runbook,
+        status,
+        output,
+        team,
+        page=page,
+        tip=tip,
+        notification_email=notification_email,
+        check_every=check_every,
+        realert_every=realert_every,
+        alert_after=alert_after,
+        dependencies=dependencies,
+        irc_channels=irc_channels,
+        slack_channels=slack_channels,
+        ticket=ticket,
+        project=project,
+        priority=priority,
+        source=source,
+        tags=tags,
+        ttl=ttl,
+        component=component,
+        description=description,
+        cluster_name=cluster_name,
+        issuetype=issuetype,
+    )
+    _default_client.send_result(
+        result_dict, sensu_host=sensu_host, sensu_port=sensu_port, transport=transport
+    )
 
-    if slack_channels is not None:
-        result_dict["slack_channels"] = slack_channels
 
-    if component is not None:
-        result_dict["component"] = component
+def send_events(
+    events: Iterable[Dict[str, Any]],
+    sensu_host: Optional[str] = None,
+    sensu_port: Optional[int] = None,
+    transport: Optional[_AnyTransport] = None,
+) -> List[Tuple[int, Exception]]:
+    """Send many events at once. All the events are validated and serialized
+    up front and then written to the Sensu client in one go, which is a lot
+    cheaper than calling :func:`send_event` for each of them.
 
-    if description is not None:
-        result_dict["description"] = description
+    An event that fails validation doesn't prevent the rest of the batch from
+    being sent, it is reported in the return value instead.
 
-    if cluster_name is not None:
-        result_dict["cluster_name"] = cluster_name
+    :type events: iterable
+    :param events: Dicts of keyword arguments to :func:`send_event`, except for
+                   ``sensu_host``, ``sensu_port`` and ``transport`` which apply
+                   to the whole batch.
 
-    json_hash = json.dumps(result_dict)
+    :type sensu_host: str
+    :param sensu_host: The IP or Name to connect to for sending the events.
+                       Defaults to the default client's, the yocalhost IP
+                       unless :func:`set_default_client` says otherwise.
 
-    sock = socket.socket()
-    try:
-        sock.connect((sensu_host, sensu_port))
-        sock.sendall(json_hash.encode("utf-8") + b"\n")
-    finally:
-        sock.close()
+    :type sensu_port: int
+    :param sensu_port: The port to connect to for sending the events.
+                       Defaults to the default client's, 3030 unless
+                       :func:`set_default_client` says otherwise.
 
+    :type transport: Transport
+    :param transport: How to deliver the events, see :func:`send_event`.
 
-def do_command_wrapper() -> int:
-    parser = argparse.ArgumentParser(
-        description="Execute a nagios plugin and report the results to a local Sensu agent"
+    :rtype: list
+    :return: ``(index, exception)`` pairs for the events that were not sent
+             because they failed validation. Empty if all events were sent.
+    """
+    return _default_client.send_events(
+        events, sensu_host=sensu_host, sensu_port=sensu_port, transport=transport
     )
-    parser.add_argument("sensu_dict")
-    parser.add_argument("command", nargs=argparse.REMAINDER)
-    args = parser.parse_args()
 
-    sensu_dict = json.loads(args.sensu_dict)
 
-    p = subprocess.Popen(args.command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-    output, _ = p.communicate()
-    status = p.wait()
+# Size of the chunks used to discard the "ok" acknowledgements the Sensu
+# client writes back on a connection we keep open.
+_RECV_BUFSIZE = 4096
+
+
+def _peer_closed(sock: socket.socket) -> bool:
+    """Check, without blocking, whether the other end of an idle connection
+    has gone away. Any acknowledgements the Sensu client sent back in the
+    meantime are read and thrown away so they don't pile up.
+    """
+    try:
+        data = sock.recv(_RECV_BUFSIZE, socket.MSG_DONTWAIT)
+    except (BlockingIOError, InterruptedError):
+        return False
+    except OSError:
+        return True
+    return not data
+
+
+def _set_send_timeout(sock: socket.socket, seconds: float) -> None:
+    # Unlike settimeout(), this leaves the socket in blocking mode, so that
+    # _peer_closed's MSG_DONTWAIT reads don't wait for the timeout. Sends that
+    # time out raise BlockingIOError.
+    if hasattr(socket, "SO_SNDTIMEO"):
+        # Only needed here, and not worth importing with the library
+        import struct
+
+        whole = int(seconds)
+        sock.setsockopt(
+            socket.SOL_SOCKET,
+            socket.SO_SNDTIMEO,
+            struct.pack("ll", whole, int((seconds - whole) * 1e6)),
+        )
+
 
-    if status > Status.WARNING:
-        status = Status.WARNING
+# Objects with sockets, locks or threads that need resetting in the child
+# after a fork, through their _after_fork method. Only the thread that forked
+# lives on in the child, so locks held by other threads would never be
+# released there, and sockets are still shared with the parent.
+_fork_aware: "weakref.WeakSet[Any]" = weakref.WeakSet()
 
-    sensu_dict["status"] = status
-    sensu_dict["output"] = output
-    send_event(**sensu_dict)
 
-    return 0
+def _after_fork_in_child() -> None:
+    for obj in list(_fork_aware):
+        obj._after_fork()
+
+
+# Not on Windows, which can't fork anyway
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+# A (host, port) pair, or the path of a Unix socket
+_Address = Union[Tuple[str, int], str]
+
+
+class _Connection(abc.ABC):
+    """A lazily opened socket to a single Sensu client.
+
+    All use of the underlying socket is serialized by ``lock``, so that
+    payloads from different threads are never interleaved on the wire.
+    """
+
+    family = socket.AF_INET
+    socket_type = socket.SOCK_STREAM
+
+    def __init__(
+        self,
+        address: _Address,
+        stats: Optional["Stats"] = None,
+        connect_timeout: Optional[float] = None,
+        send_timeout: Optional[float] = None,
+    ) -> None:
+        self.address = address
+        self.stats = stats
+        self.connect_timeout = connect_timeout
+        self.send_timeout = send_timeout
+        self.lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(self.family, self.socket_type)
+        try:
+            if self.connect_timeout is not None:
+                sock.settimeout(self.connect_timeout)
+            if self.stats is None:
+                sock.connect(self.address)
+            else:
+                start = time.perf_counter()
+                sock.connect(self.address)
+                self.stats.record_connect(time.perf_counter() - start)
+            if self.connect_timeout is not None:
+                sock.settimeout(None)
+            if self.send_timeout is not None:
+                _set_send_timeout(sock, self.send_timeout)
+        except BaseException:
+            sock.close()
+            raise
+        self._sock = sock
+        return sock
+
+    def _close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+
+    def _abandon(self) -> None:
+        """Close the socket without taking the lock, which may be held by a
+        thread that didn't survive a fork. The parent's copy stays open.
+        """
+        self.lock = threading.Lock()
+        self._close()
+
+    @abc.abstractmethod
+    def send(self, payloads: List[bytes]) -> None:
+        """Send the payloads, connecting first if need be."""
+
+    def close(self) -> None:
+        with self.lock:
+            self._close()
+
+
+class _StreamConnection(_Connection):
+    """A long-lived TCP connection, reopened when the Sensu client closes it."""
+
+    def send(self, payloads: List[bytes]) -> None:
+        payload = b"".join(payloads)
+        with self.lock:
+            sock = self._sock
+            if sock is not None and _peer_closed(sock):
+                self._close()
+                sock = None
+            if sock is not None:
+                try:
+                    sock.sendall(payload)
+                    return
+                except OSError:
+                    # The Sensu client went away since we last used this
+                    # connection (restart, idle timeout, ...). Anything we
+                    # managed to write is discarded by the client along with
+                    # the connection, so it's safe to resend on a fresh one.
+                    self._close()
+            sock = self._connect()
+            try:
+                sock.sendall(payload)
+            except BaseException:
+                self._close()
+                raise
+
+
+class _DatagramConnection(_Connection):
+    """A connected UDP socket, sending one datagram per event."""
+
+    socket_type = socket.SOCK_DGRAM
+
+    def send(self, payloads: List[bytes]) -> None:
+        with self.lock:
+            sock = self._sock or self._connect()
+            for payload in payloads:
+                try:
+                    sock.send(payload)
+                except ConnectionRefusedError:
+                    # An earlier datagram found nobody listening. The error
+                    # is reported (once) by the next send, which didn't go
+                    # out, so give it another go.
+                    sock.send(payload)
+
+
+# Where events are sent: transport, host and port. The host of the Unix
+# transports is the socket's path, and sinks ignore both host and port.
+_Destination = Tuple[_AnyTransport, str, int]
+
+
+def _resolve_destination(
+    transport: _AnyTransport, host: str, port: int
+) -> _Destination:
+    if host.startswith(UNIX_PREFIX):
+        if isinstance(transport, Transport):
+            transport = _unix_transports.get(transport, transport)
+        # Ports mean nothing to Unix sockets
+        return transport, host[len(UNIX_PREFIX) :], 0
+    return transport, host, port
+
+
+_connection_types: Dict[Transport, Type[_Connection]] = {
+    Transport.TCP: _StreamConnection,
+    Transport.UDP: _DatagramConnection,
+}
+
+if hasattr(socket, "AF_UNIX"):
+
+    class _UnixStreamConnection(_StreamConnection):
+        """A long-lived connection to a Unix stream socket."""
+
+        family = socket.AF_UNIX
+
+    class _UnixDatagramConnection(_DatagramConnection):
+        """A connected Unix datagram socket, sending one datagram per event."""
+
+        family = socket.AF_UNIX
+
+        def send(self, payloads: List[bytes]) -> None:
+            with self.lock:
+                sock = self._sock or self._connect()
+                for payload in payloads:
+                    try:
+                        sock.send(payload)
+                    except ConnectionRefusedError:
+                        # The socket we were connected to is gone, e.g. the
+                        # Sensu client was restarted and made a new one
+                        self._close()
+                        sock = self._connect()
+                        sock.send(payload)
+
+    _connection_types[Transport.UNIX] = _UnixStreamConnection
+    _connection_types[Transport.UNIX_DATAGRAM] = _UnixDatagramConnection
+
+
+class SensuClient:
+    """Sends events to Sensu clients over long-lived connections.
+
+    One connection is kept open per (host, port) and reused for every event
+    sent to it. Broken connections are replaced transparently on the next
+    send. Instances are safe to share between threads.
+
+    :type sensu_host: str
+    :param sensu_host: The IP or Name to send events to unless overridden per
+                       call. Defaults to the yocalhost IP.
+
+    :type sensu_port: int
+    :param sensu_port: The port to send events to unless overridden per call.
+                       Defaults to 3030.
+
+    :type suppressor: pysensu_yelp.suppression.Suppressor
+    :param suppressor: If set, decides which events are actually sent and
+                       which are suppressed as repeats.
+
+    :type transport: Transport or pysensu_yelp.sinks.Sink
+    :param transport: How to deliver events unless overridden per call.
+                      Defaults to the one named by the ``PYSENSU_YELP_TRANSPORT``
+                      environment variable (see :func:`parse_transport`), or
+                      TCP.
+
+    :type max_datagram_size: int
+    :param max_datagram_size: With UDP, the largest payload to send. The output
+                              of larger events is truncated to fit.
+
+    :type spool: pysensu_yelp.spool.Spool
+    :param spool: If set, events that can't be delivered are written to this
+                  spool instead of raising an exception, and sent once the
+                  Sensu client can be reached again.
+
+    :type stats: pysensu_yelp.stats.Stats
+    :param stats: If set, counts what happens to the events sent, and how
+                  long connecting and sending take.
+
+    :type sensu_socket_path: str
+    :param sensu_socket_path: If set, send events to the Sensu client's Unix
+                              socket at this path rather than to
+                              ``sensu_host`` and ``sensu_port``. It's a
+                              datagram socket with ``Transport.UDP`` and a
+                              stream socket otherwise. A ``sensu_host`` of
+                              ``"unix://<path>"`` does the same, also per
+                              call.
+
+    :type connect_timeout: float
+    :param connect_timeout: How many seconds to wait for a connection to the
+                            Sensu client before giving up with a
+                            :class:`TimeoutError`. ``None`` waits as long as
+                            the operating system does, which can be minutes.
+
+    :type send_timeout: float
+    :param send_timeout: How many seconds a write can wait for the Sensu
+                         client to make room for more of the payload before
+                         failing with a :class:`BlockingIOError`. ``None``
+                         waits forever.
+
+    :type breaker: pysensu_yelp.breaker.CircuitBreaker
+    :param breaker: If set, sends to a Sensu client that keeps failing fail
+                    fast for a while, or go to the spool if there is one,
+                    instead of waiting on it again.
+    """
+
+    def __init__(
+        self,
+        sensu_host: str = DEFAULT_SENSU_HOST,
+        sensu_port: int = DEFAULT_SENSU_PORT,
+        suppressor: Optional["Suppressor"] = None,
+        transport: Optional[_AnyTransport] = None,
+        max_datagram_size: int = DEFAULT_MAX_DATAGRAM_SIZE,
+        spool: Optional["Spool"] = None,
+        stats: Optional["Stats"] = None,
+        sensu_socket_path: Optional[str] = None,
+        connect_timeout: Optional[float] = DEFAULT_CONNECT_TIMEOUT,
+        send_timeout: Optional[float] = DEFAULT_SEND_TIMEOUT,
+        breaker: Optional["CircuitBreaker"] = None,
+    ) -> None:
+        if sensu_socket_path is not None:
+            sensu_host = UNIX_PREFIX + sensu_socket_path
+        self.sensu_host = sensu_host
+        self.sensu_port = sensu_port
+        self.suppressor = suppressor
+        if transport is None:
+            transport = parse_transport(
+                os.environ.get(TRANSPORT_ENVIRONMENT_VARIABLE, "tcp")
+            )
+        self.transport = _as_transport(transport)
+        self.max_datagram_size = max_datagram_size
+        self.spool = spool
+        self.stats = stats
+        self.connect_timeout = connect_timeout
+        self.send_timeout = send_timeout
+        self.breaker = breaker
+        self._connections: Dict[_Destination, _Connection] = {}
+        self._lock = threading.Lock()
+        _fork_aware.add(self)
+
+    def _after_fork(self) -> None:
+        # Connections are reopened by the child's first send
+        connections = self._connections
+        self._connections = {}
+        self._lock = threading.Lock()
+        for connection in connections.values():
+            connection._abandon()
+
+    def _destination(
+        self,
+        sensu_host: Optional[str],
+        sensu_port: Optional[int],
+        transport: Optional[_AnyTransport],
+    ) -> _Destination:
+        return _resolve_destination(
+            self.transport if transport is None else _as_transport(transport),
+            self.sensu_host if sensu_host is None else sensu_host,
+            self.sensu_port if sensu_port is None else sensu_port,
+        )
+
+    def _connection(self, destination: _Destination) -> Union[_Connection, "Sink"]:
+        transport, host, port = destination
+        if not isinstance(transport, Transport):
+            return transport
+        # The fast path doesn't need the lock, dict lookups are atomic
+        connection = self._connections.get(destination)
+        if connection is None:
+            with self._lock:
+                connection = self._connections.setdefault(
+                    destination,
+                    _connection_types[transport](
+                        host if transport in _UNIX_TRANSPORTS else (host, port),
+                        stats=self.stats,
+                        connect_timeout=self.connect_timeout,
+                        send_timeout=self.send_timeout,
+                    ),
+                )
+        return connection
+
+    def _deliver(self, payloads: List[bytes], destination: _Destination) -> None:
+        if destination[0] in _DATAGRAM_TRANSPORTS:
+            for payload in payloads:
+                if len(payload) > self.max_datagram_size:
+                    raise ValueError(
+                        f"Payload of {len(payload)} bytes is too large for a "
+                        f"{self.max_datagram_size} byte datagram"
+                    )
+        self._write(payloads, destination)
+
+    def _sender(self, destination: _Destination) -> Callable[[List[bytes]], None]:
+        send = self._connection(destination).send
+        if self.breaker is not None:
+            send = functools.partial(self.breaker.call, destination, send)
+        if self.stats is not None:
+            send = functools.partial(
+                self.stats.record_send, send, spooling=self.spool is not None
+            )
+        return send
+
+    def _write(self, payloads: List[bytes], destination: _Destination) -> None:
+        send = self._sender(destination)
+        if self.spool is None:
+            send(payloads)
+            return
+        try:
+            if self.spool.pending:
+                # Keep the events in order
+                self.spool.replay(send)
+            send(payloads)
+        except OSError:
+            try:
+                self.spool.append(payloads)
+            except BaseException:
+                if self.stats is not None:
+                    self.stats.count_payloads("failed", payloads)
+                raise
+            if self.stats is not None:
+                self.stats.count_payloads("spooled", payloads)
+
+    def replay_spool(self) -> int:
+        """Send the events in the client's spool to its Sensu client now,
+        rather than with the next event sent.
+
+        :rtype: int
+        :return: How many events were sent.
+        """
+        if self.spool is None or not self.spool.pending:
+            return 0
+        return self.spool.replay(self._sender(self._destination(None, None, None)))
+
+    def send_payloads(
+        self,
+        payloads: List[bytes],
+        sensu_host: Optional[str] = None,
+        sensu_port: Optional[int] = None,
+        transport: Optional[_AnyTransport] = None,
+    ) -> None:
+        """Send already encoded payloads (see :func:`encode_event`) to the
+        Sensu client, reusing the open connection if there is one. Over TCP
+        they are written in one go, over UDP each one is a datagram.
+        """
+        self._deliver(payloads, self._destination(sensu_host, sensu_port, transport))
+
+    def send_payload(
+        self,
+        payload: bytes,
+        sensu_host: Optional[str] = None,
+        sensu_port: Optional[int] = None,
+        transport: Optional[_AnyTransport] = None,
+    ) -> None:
+        """Send a single already encoded payload. See :meth:`send_payloads`."""
+        self.send_payloads(
+            [payload], sensu_host=sensu_host, sensu_port=sensu_port, transport=transport
+        )
+
+    def _encode(self, result_dict: Dict[str, Any], transport: _AnyTransport) -> bytes:
+        if transport in _DATAGRAM_TRANSPORTS:
+            return encode_event_truncated(result_dict, self.max_datagram_size)
+        return encode_event(result_dict)
+
+    def _should_send(self, result_dict: Dict[str, Any]) -> bool:
+        if self.suppressor is None or self.suppressor.would_send(result_dict):
+            return True
+        if self.stats is not None:
+            self.stats.count("suppressed", result_dict["name"])
+        return False
+
+    def _record_sent(self, result_dicts: Iterable[Dict[str, Any]]) -> None:
+        # Only once they were delivered (or queued, or spooled), so that the
+        # caller can retry events that failed
+        if self.suppressor is not None:
+            for result_dict in result_dicts:
+                self.suppressor.record_sent(result_dict)
+
+    def send_result(
+        self,
+        result_dict: Dict[str, Any],
+        sensu_host: Optional[str] = None,
+        sensu_port: Optional[int] = None,
+        transport: Optional[_AnyTransport] = None,
+    ) -> None:
+        """Send a result dict built by :func:`build_event`, unless the
+        client's suppressor decides against it.
+        """
+        if self._should_send(result_dict):
+            destination = self._destination(sensu_host, sensu_port, transport)
+            self._deliver([self._encode(result_dict, destination[0])], destination)
+            self._record_sent([result_dict])
+
+    def send(
+        self,
+        event: Event,
+        sensu_host: Optional[str] = None,
+        sensu_port: Optional[int] = None,
+        transport: Optional[_AnyTransport] = None,
+    ) -> None:
+        """Send an :class:`Event`, unless the client's suppressor decides
+        against it.
+        """
+        if self.suppressor is not None:
+            result_dict = event.to_dict()
+            if not self._should_send(result_dict):
+                return
+        destination = self._destination(sensu_host, sensu_port, transport)
+        payload = event.encode()
+        if (
+            destination[0] in _DATAGRAM_TRANSPORTS
+            and len(payload) > self.max_datagram_size
+        ):
+            payload = encode_event_truncated(event.to_dict(), self.max_datagram_size)
+        self._deliver([payload], destination)
+        if self.suppressor is not None:
+            self._record_sent([result_dict])
+
+    def send_event(
+        self,
+        name: str,
+        runbook: str,
+        status: Union[Status, int],
+        output: str,
+        team: str,
+        **kwargs: Any,
+    ) -> None:
+        """Send a new event through this client. Takes the same arguments as
+        :func:`send_event`; ``sensu_host``, ``sensu_port`` and ``transport``
+        default to the ones the client was created with.
+        """
+        sensu_host = kwargs.pop("sensu_host", None)
+        sensu_port = kwargs.pop("sensu_port", None)
+        transport = kwargs.pop("transport", None)
+        result_dict = build_event(name, runbook, status, output, team, **kwargs)
+        self.send_result(
+            result_dict,
+            sensu_host=sensu_host,
+            sensu_port=sensu_port,
+            transport=transport,
+        )
+
+    def send_events(
+        self,
+        events: Iterable[Dict[str, Any]],
+        sensu_host: Optional[str] = None,
+        sensu_port: Optional[int] = None,
+        transport: Optional[_AnyTransport] = None,
+    ) -> List[Tuple[int, Exception]]:
+        """Send many events at once through this client. See
+        :func:`send_events`.
+        """
+        result_dicts, failures = build_events(events)
+        if self.suppressor is not None:
+            # Nothing is recorded as sent before it is, so repeats within the
+            # batch are dropped here
+            seen = set()
+            unsuppressed = []
+            for r in result_dicts:
+                key = (r.get("source"), r["name"], r["status"], r["output"])
+                if key not in seen and self._should_send(r):
+                    unsuppressed.append(r)
+                seen.add(key)
+            result_dicts = unsuppressed
+        if result_dicts:
+            destination = self._destination(sensu_host, sensu_port, transport)
+            self._deliver(
+                [self._encode(r, destination[0]) for r in result_dicts], destination
+            )
+            self._record_sent(result_dicts)
+        return failures
+
+    def close(self) -> None:
+        """Close all open connections, and the client's sink if it has one.
+        The client can still be used afterwards, connections are reopened on
+        the next send.
+        """
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for connection in connections:
+            connection.close()
+        if not isinstance(self.transport, Transport):
+            self.transport.close()
+
+    def __enter__(self) -> "SensuClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def _make_default_client() -> SensuClient:
+    try:
+        return SensuClient()
+    except ValueError as e:
+        # Not worth failing the import over, which would break code that only
+        # needs Status, say: clients made explicitly still raise
+        import logging
+
+        logging.getLogger(__name__).warning(
+            "Ignoring %s, sending over TCP: %s", TRANSPORT_ENVIRONMENT_VARIABLE, e
+        )
+        return SensuClient(transport=Transport.TCP)
+
+
+# Shared by the module-level send_event
+_default_client = _make_default_client()
+
+
+def set_default_client(client: SensuClient) -> SensuClient:
+    """Replace the client used by the module-level :func:`send_event` and
+    :func:`send_events`, for example with a
+    :class:`pysensu_yelp.emitter.BackgroundEmitter` to send events without
+    blocking the caller.
+
+    :rtype: SensuClient
+    :return: The previous default client. It is not closed.
+    """
+    global _default_client
+    previous, _default_client = _default_client, client
+    return previous
+
+
+# Stand-ins for the status and output of a CheckTemplate's event, that won't
+# turn up anywhere else in its serialized form.
+_STATUS_PLACEHOLDER = "\x00pysensu_yelp status\x00"
+_OUTPUT_PLACEHOLDER = "\x00pysensu_yelp output\x00"
+
+
+class CheckTemplate:
+    """The parts of an event that don't change between runs of a periodic
+    check, validated and serialized once so that sending the check's result
+    only has to fill in the status and output.
+
+    Takes the same arguments as :func:`send_event`, except for ``status`` and
+    ``output``, which are passed to :meth:`emit` instead::
+
+        check = pysensu_yelp.CheckTemplate(
+            name="my_cool_check",
+            runbook="http://pysensu-yelp.readthedocs.org",
+            team="my_team",
+            ttl="1h",
+        )
+        while True:
+            check.emit(pysensu_yelp.Status.OK, "Everything is fine")
+            time.sleep(60)
+
+    Unlike ``send_event``, ``sensu_host``, ``sensu_port`` and ``transport``
+    default to the ones of the client the event is sent through.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        runbook: str,
+        team: str,
+        sensu_host: Optional[str] = None,
+        sensu_port: Optional[int] = None,
+        transport: Optional[_AnyTransport] = None,
+        **kwargs: Any,
+    ) -> None:
+        result_dict = build_event(name, runbook, Status.OK, "", team, **kwargs)
+        self.name = name
+        self.sensu_host = sensu_host
+        self.sensu_port = sensu_port
+        self.transport = transport
+        self._result_dict = result_dict
+        # Serialize the event with placeholders for the status and output,
+        # and keep the bytes around them.
+        self._dumps = dumps = _dumps
+        payload = dumps(
+            dict(result_dict, status=_STATUS_PLACEHOLDER, output=_OUTPUT_PLACEHOLDER)
+        )
+        self._head, rest = payload.split(dumps(_STATUS_PLACEHOLDER)[:-1])
+        self._middle, self._tail = rest.split(dumps(_OUTPUT_PLACEHOLDER)[:-1])
+
+    def build(self, status: Union[Status, int], output: str) -> Dict[str, Any]:
+        """Build the result dict for the given status and output, the same
+        one :func:`build_event` would.
+        """
+        result_dict = dict(self._result_dict)
+        result_dict["status"] = status
+        result_dict["output"] = output
+        return result_dict
+
+    def encode(self, status: Union[Status, int], output: str) -> bytes:
+        """Encode the event for the given status and output, the same way
+        :func:`encode_event` would.
+        """
+        return b"".join(
+            (
+                self._head,
+                b"%d" % status,
+                self._middle,
+                self._dumps(output)[:-1],
+                self._tail,
+            )
+        )
+
+    def emit(
+        self,
+        status: Union[Status, int],
+        output: str,
+        client: Optional[SensuClient] = None,
+    ) -> None:
+        """Send the check's result.
+
+        :type status: int
+        :param status: Exit status code, 0,1,2,3. See :func:`send_event`.
+
+        :type output: str
+        :param output: The output of the check itself. See :func:`send_event`.
+
+        :type client: SensuClient
+        :param client: The client to send the event through. Defaults to the
+                       one used by :func:`send_event`.
+        """
+        if client is None:
+            client = _default_client
+        result_dict = None
+        if client.suppressor is not None:
+            result_dict = self.build(status, output)
+            if not client._should_send(result_dict):
+                return
+        payload = self.encode(status, output)
+        transport = client.transport if self.transport is None else self.transport
+        destination = client._destination(self.sensu_host, self.sensu_port, transport)
+        if (
+            destination[0] in _DATAGRAM_TRANSPORTS
+            and len(payload) > client.max_datagram_size
+        ):
+            payload = encode_event_truncated(
+                self.build(status, output), client.max_datagram_size
+            )
+        client.send_payload(
+            payload,
+            sensu_host=self.sensu_host,
+            sensu_port=self.sensu_port,
+            transport=transport,
+        )
+        if result_dict is not None:
+            client._record_sent([result_dict])
+
+
+# The command wrapper's names, which are loaded on first use so that library
+# users don't pay for argparse and subprocess
+_wrapper_names = frozenset(
+    (
+        "DEFAULT_MAX_OUTPUT_BYTES",
+        "OUTPUT_OMITTED_MARKER",
+        "CommandResult",
+        "STATUS_POLICIES",
+        "do_command_wrapper",
+        "max_warning_status",
+        "nagios_status",
+        "read_output",
+        "report_command",
+        "run_command",
+    )
+)
+
 
+def __getattr__(name: str) -> Any:
+    if name in _wrapper_names:
+        from pysensu_yelp import wrapper
 
-if __name__ == "__main__":
-    sys.exit(do_command_wrapper())
+        return getattr(wrapper, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
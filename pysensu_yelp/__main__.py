@@ -0,0 +1,5 @@
+import sys
+
+from pysensu_yelp.wrapper import do_command_wrapper
+
+sys.exit(do_command_wrapper())
@@ -0,0 +1,382 @@
+"""Send Sensu events from asyncio code without blocking the event loop::
+
+from pysensu_yelp.aio import async_send_event
+
+await async_send_event(
+    name="my_cool_check",
+    output="Everything is fine",
+    status=0,
+    team="my_team",
+    runbook="http://pysensu-yelp.readthedocs.org",
+)
+"""
+
+import asyncio
+import os
+import socket
+import weakref
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import MutableMapping
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from pysensu_yelp import _Address
+from pysensu_yelp import _AnyTransport
+from pysensu_yelp import _as_transport
+from pysensu_yelp import _DATAGRAM_TRANSPORTS
+from pysensu_yelp import _Destination
+from pysensu_yelp import _RECV_BUFSIZE
+from pysensu_yelp import _resolve_destination
+from pysensu_yelp import _UNIX_TRANSPORTS
+from pysensu_yelp import build_event
+from pysensu_yelp import build_events
+from pysensu_yelp import DEFAULT_MAX_DATAGRAM_SIZE
+from pysensu_yelp import DEFAULT_SENSU_HOST
+from pysensu_yelp import DEFAULT_SENSU_PORT
+from pysensu_yelp import encode_event
+from pysensu_yelp import encode_event_truncated
+from pysensu_yelp import parse_transport
+from pysensu_yelp import Status
+from pysensu_yelp import Transport
+from pysensu_yelp import TRANSPORT_ENVIRONMENT_VARIABLE
+from pysensu_yelp import UNIX_PREFIX
+
+
+class _AsyncConnection:
+    """A lazily opened stream connection to a single Sensu client."""
+
+    def __init__(self, address: _Address) -> None:
+        self.address = address
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional["asyncio.Future[None]"] = None
+
+    @staticmethod
+    async def _discard_acknowledgements(reader: asyncio.StreamReader) -> None:
+        # Reading until EOF keeps the "ok"s the Sensu client writes back from
+        # piling up, and tells us when it has closed the connection.
+        try:
+            while await reader.read(_RECV_BUFSIZE):
+                pass
+        except OSError:
+            pass
+
+    async def _write(self, payload: bytes) -> None:
+        assert self._writer is not None
+        self._writer.write(payload)
+        await self._writer.drain()
+
+    async def sendall(self, payload: bytes) -> None:
+        if self._reader_task is not None and self._reader_task.done():
+            self.close()
+        if self._writer is not None:
+            try:
+                await self._write(payload)
+                return
+            except OSError:
+                # Same as the blocking client: the Sensu client discards
+                # whatever we managed to write along with the connection.
+                self.close()
+        if isinstance(self.address, str):
+            reader, self._writer = await asyncio.open_unix_connection(self.address)
+        else:
+            reader, self._writer = await asyncio.open_connection(*self.address)
+        self._reader_task = asyncio.ensure_future(
+            self._discard_acknowledgements(reader)
+        )
+        await self._write(payload)
+
+    def close(self) -> Optional[asyncio.StreamWriter]:
+        writer, self._writer = self._writer, None
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if writer is not None:
+            writer.close()
+        return writer
+
+
+class _AsyncConnectionPool:
+    """Up to ``size`` connections to a single Sensu client, reused across
+    sends. A send waits for a free connection when all of them are busy.
+    """
+
+    def __init__(self, address: _Address, size: int) -> None:
+        self.address = address
+        self._idle: List[_AsyncConnection] = []
+        self._busy: List[_AsyncConnection] = []
+        self._semaphore = asyncio.Semaphore(size)
+
+    async def send(self, payloads: List[bytes]) -> None:
+        async with self._semaphore:
+            if self._idle:
+                connection = self._idle.pop()
+            else:
+                connection = _AsyncConnection(self.address)
+            self._busy.append(connection)
+            try:
+                await connection.sendall(b"".join(payloads))
+            except BaseException:
+                # Including cancellation, which may leave half a payload on
+                # the wire.
+                connection.close()
+                raise
+            else:
+                self._idle.append(connection)
+            finally:
+                self._busy.remove(connection)
+
+    def close(self) -> List[asyncio.StreamWriter]:
+        writers = []
+        for connection in self._idle + self._busy:
+            writer = connection.close()
+            if writer is not None:
+                writers.append(writer)
+        self._idle.clear()
+        return writers
+
+
+class _AsyncDatagramEndpoint:
+    """A connected UDP or Unix datagram endpoint, sending one datagram per event. Sending a
+    datagram never waits, so there's no need for more than one.
+    """
+
+    def __init__(self, address: _Address) -> None:
+        self.address = address
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def send(self, payloads: List[bytes]) -> None:
+        if self._transport is None or self._transport.is_closing():
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                if self._transport is None or self._transport.is_closing():
+                    loop = asyncio.get_event_loop()
+                    self._transport, _ = await loop.create_datagram_endpoint(
+                        asyncio.DatagramProtocol,
+                        remote_addr=self.address,
+                        family=(
+                            socket.AF_UNIX
+                            if isinstance(self.address, str)
+                            else socket.AF_UNSPEC
+                        ),
+                    )
+        for payload in payloads:
+            self._transport.sendto(payload)
+
+    def close(self) -> List[asyncio.StreamWriter]:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        return []
+
+
+_AsyncPool = Union[_AsyncConnectionPool, _AsyncDatagramEndpoint]
+
+
+class AsyncSensuClient:
+    """The asyncio counterpart of :class:`pysensu_yelp.SensuClient`.
+
+    Connections are kept open and reused across sends. Up to
+    ``max_connections`` events can be in flight to the same Sensu client at
+    once, further sends wait for one of them to finish. A client must only be
+    used from the event loop it was first used in.
+
+    :type sensu_host: str
+    :param sensu_host: The IP or Name to send events to unless overridden per
+                       call. Defaults to the yocalhost IP.
+
+    :type sensu_port: int
+    :param sensu_port: The port to send events to unless overridden per call.
+                       Defaults to 3030.
+
+    :type sensu_socket_path: str
+    :param sensu_socket_path: If set, send events to the Sensu client's Unix
+                              socket at this path instead, like
+                              :class:`pysensu_yelp.SensuClient`.
+
+    :type max_connections: int
+    :param max_connections: How many concurrent sends (and so connections) to
+                            allow per Sensu client.
+
+    :type transport: pysensu_yelp.Transport or pysensu_yelp.sinks.Sink
+    :param transport: How to deliver events unless overridden per call.
+                      Defaults to the one named by the ``PYSENSU_YELP_TRANSPORT``
+                      environment variable, or TCP. Sinks are written to
+                      directly from the event loop.
+
+    :type max_datagram_size: int
+    :param max_datagram_size: With UDP, the largest payload to send. The output
+                              of larger events is truncated to fit.
+    """
+
+    def __init__(
+        self,
+        sensu_host: str = DEFAULT_SENSU_HOST,
+        sensu_port: int = DEFAULT_SENSU_PORT,
+        max_connections: int = 4,
+        transport: Optional[_AnyTransport] = None,
+        max_datagram_size: int = DEFAULT_MAX_DATAGRAM_SIZE,
+        sensu_socket_path: Optional[str] = None,
+    ) -> None:
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1")
+        if sensu_socket_path is not None:
+            sensu_host = UNIX_PREFIX + sensu_socket_path
+        self.sensu_host = sensu_host
+        self.sensu_port = sensu_port
+        self.max_connections = max_connections
+        if transport is None:
+            transport = parse_transport(
+                os.environ.get(TRANSPORT_ENVIRONMENT_VARIABLE, "tcp")
+            )
+        self.transport = _as_transport(transport)
+        self.max_datagram_size = max_datagram_size
+        self._pools: Dict[_Destination, _AsyncPool] = {}
+
+    def _destination(
+        self,
+        sensu_host: Optional[str],
+        sensu_port: Optional[int],
+        transport: Optional[_AnyTransport],
+    ) -> _Destination:
+        return _resolve_destination(
+            self.transport if transport is None else _as_transport(transport),
+            self.sensu_host if sensu_host is None else sensu_host,
+            self.sensu_port if sensu_port is None else sensu_port,
+        )
+
+    async def _deliver(self, payloads: List[bytes], destination: _Destination) -> None:
+        transport, host, port = destination
+        if not isinstance(transport, Transport):
+            transport.send(payloads)
+            return
+        pool = self._pools.get(destination)
+        if pool is None:
+            address = host if transport in _UNIX_TRANSPORTS else (host, port)
+            if transport in _DATAGRAM_TRANSPORTS:
+                pool = _AsyncDatagramEndpoint(address)
+            else:
+                pool = _AsyncConnectionPool(address, self.max_connections)
+            self._pools[destination] = pool
+        await pool.send(payloads)
+
+    def _encode(self, result_dict: Dict[str, Any], transport: _AnyTransport) -> bytes:
+        if transport in _DATAGRAM_TRANSPORTS:
+            return encode_event_truncated(result_dict, self.max_datagram_size)
+        return encode_event(result_dict)
+
+    async def send_payload(
+        self,
+        payload: bytes,
+        sensu_host: Optional[str] = None,
+        sensu_port: Optional[int] = None,
+        transport: Optional[_AnyTransport] = None,
+    ) -> None:
+        """Write an already encoded payload (see
+        :func:`pysensu_yelp.encode_event`) to the Sensu client.
+        """
+        destination = self._destination(sensu_host, sensu_port, transport)
+        if (
+            destination[0] in _DATAGRAM_TRANSPORTS
+            and len(payload) > self.max_datagram_size
+        ):
+            raise ValueError(
+                f"Payload of {len(payload)} bytes is too large for a "
+                f"{self.max_datagram_size} byte datagram"
+            )
+        await self._deliver([payload], destination)
+
+    async def send_event(
+        self,
+        name: str,
+        runbook: str,
+        status: Union[Status, int],
+        output: str,
+        team: str,
+        **kwargs: Any,
+    ) -> None:
+        """Send a new event through this client. Takes the same arguments as
+        :func:`pysensu_yelp.send_event`; ``sensu_host``, ``sensu_port`` and
+        ``transport`` default to the ones the client was created with.
+        """
+        destination = self._destination(
+            kwargs.pop("sensu_host", None),
+            kwargs.pop("sensu_port", None),
+            kwargs.pop("transport", None),
+        )
+        result_dict = build_event(name, runbook, status, output, team, **kwargs)
+        await self._deliver([self._encode(result_dict, destination[0])], destination)
+
+    async def send_events(
+        self,
+        events: Iterable[Dict[str, Any]],
+        sensu_host: Optional[str] = None,
+        sensu_port: Optional[int] = None,
+        transport: Optional[_AnyTransport] = None,
+    ) -> List[Tuple[int, Exception]]:
+        """Send many events at once through this client. See
+        :func:`pysensu_yelp.send_events`.
+        """
+        destination = self._destination(sensu_host, sensu_port, transport)
+        result_dicts, failures = build_events(events)
+        if result_dicts:
+            await self._deliver(
+                [self._encode(r, destination[0]) for r in result_dicts], destination
+            )
+        return failures
+
+    async def close(self) -> None:
+        """Close all open connections. The client can still be used
+        afterwards, connections are reopened on the next send.
+        """
+        pools, self._pools = list(self._pools.values()), {}
+        writers = [writer for pool in pools for writer in pool.close()]
+        for writer in writers:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def __aenter__(self) -> "AsyncSensuClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+
+# Connections belong to an event loop, so async_send_event keeps one default
+# client per loop.
+_default_clients: MutableMapping[asyncio.AbstractEventLoop, AsyncSensuClient] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_default_client() -> AsyncSensuClient:
+    """Get the client used by :func:`async_send_event` in the running event
+    loop.
+    """
+    loop = asyncio.get_event_loop()
+    client = _default_clients.get(loop)
+    if client is None:
+        client = _default_clients[loop] = AsyncSensuClient()
+    return client
+
+
+async def async_send_event(
+    name: str,
+    runbook: str,
+    status: Union[Status, int],
+    output: str,
+    team: str,
+    **kwargs: Any,
+) -> None:
+    """Send a new event without blocking the event loop. Takes the same
+    arguments as :func:`pysensu_yelp.send_event`, and reuses connections
+    across calls made from the same event loop.
+    """
+    await get_default_client().send_event(name, runbook, status, output, team, **kwargs)
@@ -0,0 +1,153 @@
+"""Stop waiting on a Sensu client that is down.
+
+Without a circuit breaker every event sent to a dead Sensu client pays for a
+connection attempt, which can take up to the client's ``connect_timeout``.
+With one, a few consecutive failures open the circuit, and further sends
+fail right away (or go to the client's spool) until the cooldown is over::
+
+    from pysensu_yelp.breaker import CircuitBreaker
+
+    pysensu_yelp.set_default_client(
+        pysensu_yelp.SensuClient(breaker=CircuitBreaker())
+    )
+"""
+import logging
+import threading
+import time
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import List
+from typing import Optional
+
+from pysensu_yelp import _fork_aware
+
+log = logging.getLogger(__name__)
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of sending to a Sensu client whose circuit is open.
+
+    Being a :class:`ConnectionError`, it is handled like any other failure to
+    reach the Sensu client, e.g. by spooling the events.
+    """
+
+
+class _Circuit:
+    __slots__ = ("failures", "opened_at", "probing")
+
+    def __init__(self) -> None:
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+
+class CircuitBreaker:
+    """Fails sends fast while a Sensu client is unreachable.
+
+    Each destination (transport, host and port) has its own circuit. It opens
+    after ``failure_threshold`` sends to it failed in a row. While it is open
+    sends raise :class:`CircuitOpenError` without touching the network. Once
+    ``cooldown`` seconds have gone by, the next send is let through as a
+    probe: if it succeeds the circuit closes again, if it fails the circuit
+    stays open for another ``cooldown``. Other sends keep failing fast while
+    the probe is in flight.
+
+    To use it, set it as the ``breaker`` of a :class:`pysensu_yelp.SensuClient`.
+
+    :type failure_threshold: int
+    :param failure_threshold: How many consecutive failures open a circuit.
+
+    :type cooldown: float
+    :param cooldown: How many seconds an open circuit waits before letting a
+                     probe through.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 30.0) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        # Total number of sends failed fast
+        self.rejected = 0
+        # Only destinations that have failed lately have a circuit
+        self._circuits: Dict[Hashable, _Circuit] = {}
+        self._lock = threading.Lock()
+        self._clock = time.monotonic
+        _fork_aware.add(self)
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    def state(self, key: Hashable) -> str:
+        """The state of a destination's circuit: ``"closed"``, ``"open"`` or
+        ``"half-open"`` if it would let a probe through, or has.
+        """
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None or circuit.opened_at is None:
+                return "closed"
+            if circuit.probing or self._clock() - circuit.opened_at >= self.cooldown:
+                return "half-open"
+            return "open"
+
+    def _allow(self, key: Hashable, circuit: _Circuit) -> None:
+        with self._lock:
+            if circuit.opened_at is None:
+                return
+            if circuit.probing or self._clock() - circuit.opened_at < self.cooldown:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit to {key!r} is open")
+            circuit.probing = True
+
+    def _failed(self, key: Hashable) -> None:
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None:
+                circuit = self._circuits[key] = _Circuit()
+            circuit.failures += 1
+            if circuit.probing or (
+                circuit.opened_at is None and circuit.failures >= self.failure_threshold
+            ):
+                if circuit.opened_at is None:
+                    log.warning(
+                        "Sending to %r failed %d times in a row, failing fast "
+                        "for %gs",
+                        key,
+                        circuit.failures,
+                        self.cooldown,
+                    )
+                circuit.opened_at = self._clock()
+            circuit.probing = False
+
+    def call(
+        self,
+        key: Hashable,
+        send: Callable[[List[bytes]], None],
+        payloads: List[bytes],
+    ) -> None:
+        """Call ``send(payloads)`` unless the circuit of ``key`` is open,
+        keeping track of whether it succeeded.
+
+        :raises CircuitOpenError: If the circuit is open.
+        """
+        # The fast path doesn't need the lock, dict lookups are atomic
+        circuit = self._circuits.get(key)
+        if circuit is not None:
+            self._allow(key, circuit)
+        try:
+            send(payloads)
+        except OSError:
+            self._failed(key)
+            raise
+        except BaseException:
+            # Not the Sensu client's fault, let the next send probe instead
+            if circuit is not None:
+                with self._lock:
+                    circuit.probing = False
+            raise
+        if circuit is not None:
+            with self._lock:
+                circuit = self._circuits.pop(key, None)
+            if circuit is not None and circuit.opened_at is not None:
+                log.info("Sending to %r works again", key)
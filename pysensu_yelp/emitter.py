@@ -0,0 +1,202 @@
+import atexit
+import itertools
+import logging
+import threading
+from collections import deque
+from enum import Enum
+from typing import Any
+from typing import Deque
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from pysensu_yelp import _Destination
+from pysensu_yelp import DEFAULT_SENSU_HOST
+from pysensu_yelp import DEFAULT_SENSU_PORT
+from pysensu_yelp import SensuClient
+from pysensu_yelp.stats import payload_name
+
+log = logging.getLogger(__name__)
+
+_Item = Tuple[bytes, _Destination]
+
+
+class Overflow(Enum):
+    """What a :class:`BackgroundEmitter` does with a new event when its queue
+    is full.
+    """
+
+    # Make room by discarding the oldest queued event
+    DROP_OLDEST = "drop_oldest"
+    # Discard the new event
+    DROP_NEWEST = "drop_newest"
+    # Wait up to ``block_timeout`` for room, then discard the new event
+    BLOCK = "block"
+
+
+class BackgroundEmitter(SensuClient):
+    """A :class:`pysensu_yelp.SensuClient` that sends events from a background
+    thread, so that sending never blocks the caller on the network.
+
+    Events are put on a bounded in-memory queue, which a single worker thread
+    drains to the Sensu client, writing queued events for the same Sensu
+    client in one go. Events that can't be delivered are logged and dropped,
+    unless the emitter has a spool. The queue is flushed when the interpreter
+    exits.
+
+    :type max_queue_size: int
+    :param max_queue_size: How many events can be waiting to be sent.
+
+    :type overflow: Overflow
+    :param overflow: What to do when an event is sent while the queue is full.
+
+    :type block_timeout: float
+    :param block_timeout: With ``Overflow.BLOCK``, how many seconds to wait for
+                          room in the queue before dropping the event. ``None``
+                          waits forever.
+
+    :type exit_timeout: float
+    :param exit_timeout: How many seconds to wait at interpreter exit for the
+                         queue to be flushed. ``None`` waits forever.
+
+    Any other keyword arguments are passed on to
+    :class:`pysensu_yelp.SensuClient`.
+    """
+
+    def __init__(
+        self,
+        sensu_host: str = DEFAULT_SENSU_HOST,
+        sensu_port: int = DEFAULT_SENSU_PORT,
+        max_queue_size: int = 1000,
+        overflow: Overflow = Overflow.DROP_OLDEST,
+        block_timeout: Optional[float] = None,
+        exit_timeout: Optional[float] = 5.0,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(sensu_host=sensu_host, sensu_port=sensu_port, **kwargs)
+        if max_queue_size < 1:
+            raise ValueError("max_queue_size must be at least 1")
+        self.max_queue_size = max_queue_size
+        self.overflow = Overflow(overflow)
+        self.block_timeout = block_timeout
+        self.exit_timeout = exit_timeout
+        # Events discarded because the queue was full
+        self.dropped = 0
+        # Events discarded because they couldn't be delivered
+        self.failed = 0
+        self._queue: Deque[_Item] = deque()
+        self._in_flight = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        atexit.register(self._atexit)
+
+    def _after_fork(self) -> None:
+        super()._after_fork()
+        # The parent still sends what was queued before the fork. The worker
+        # thread didn't survive it, a new one is started by the next send.
+        self._queue.clear()
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def _drop(self, item: _Item) -> None:
+        self.dropped += 1
+        if self.stats is not None:
+            self.stats.count("dropped", payload_name(item[0]))
+
+    def _enqueue(self, item: _Item) -> None:
+        if len(self._queue) >= self.max_queue_size:
+            if self.overflow is Overflow.DROP_OLDEST:
+                self._drop(self._queue.popleft())
+            elif self.overflow is Overflow.BLOCK:
+                self._cond.wait_for(
+                    lambda: len(self._queue) < self.max_queue_size or self._closed,
+                    self.block_timeout,
+                )
+            if self._closed or len(self._queue) >= self.max_queue_size:
+                self._drop(item)
+                return
+        self._queue.append(item)
+        self._cond.notify_all()
+
+    def _write(self, payloads: List[bytes], destination: _Destination) -> None:
+        # Queue the payloads instead of writing them
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Cannot send events through a closed emitter")
+            for payload in payloads:
+                self._enqueue((payload, destination))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="pysensu-yelp-emitter", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._closed)
+                if not self._queue:
+                    break
+                batch = list(self._queue)
+                self._queue.clear()
+                self._in_flight = len(batch)
+                # Wake up anyone blocked on a full queue
+                self._cond.notify_all()
+            try:
+                self._write_batch(batch)
+            finally:
+                with self._cond:
+                    self._in_flight = 0
+                    self._cond.notify_all()
+        super().close()
+
+    def _write_batch(self, batch: List[_Item]) -> None:
+        for destination, items in itertools.groupby(batch, key=lambda item: item[1]):
+            payloads = [payload for payload, _ in items]
+            try:
+                super()._write(payloads, destination)
+            except Exception:
+                self.failed += len(payloads)
+                log.exception(
+                    "Dropping %d event(s) that could not be sent to %r",
+                    len(payloads),
+                    destination,
+                )
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for all queued events to be sent (or dropped).
+
+        :type timeout: float
+        :param timeout: How many seconds to wait at most. ``None`` waits forever.
+
+        :rtype: bool
+        :return: Whether the queue was flushed before the timeout.
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._queue and not self._in_flight, timeout
+            )
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Send the events still in the queue, stop the worker thread and close
+        the connections. Events sent after this raise ``RuntimeError``.
+
+        :type timeout: float
+        :param timeout: How many seconds to wait for the queue to be flushed.
+                        ``None`` waits forever.
+        """
+        atexit.unregister(self._atexit)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is None:
+            super().close()
+        else:
+            # The worker closes the connections once it is done
+            thread.join(timeout)
+
+    def _atexit(self) -> None:
+        self.close(self.exit_timeout)
@@ -0,0 +1,302 @@
+"""Send Sensu events for log records.
+
+A :class:`SensuHandler` turns the records logged to it into events: the
+logger's name is the check's name, and the record's level its status. It
+never sends from the thread that logs, which is often an error path under
+stress already. Records are handed off to a background thread instead, and
+repeats of the same record are rolled up into one event::
+
+    import logging
+
+    from pysensu_yelp.handler import SensuHandler
+
+    logging.getLogger("my_service.billing").addHandler(
+        SensuHandler(runbook="y/billing", team="billing")
+    )
+    ...
+    log.error("Could not charge %s", customer)
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Any
+from typing import Deque
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from pysensu_yelp import _fork_aware
+from pysensu_yelp import CheckTemplate
+from pysensu_yelp import SensuClient
+from pysensu_yelp import Status
+
+# A record's logger name, level and unformatted message
+_Key = Tuple[str, int, str]
+# The check name, status, output and last record of an event to send
+_Event = Tuple[str, Status, str, logging.LogRecord]
+
+_invalid_name_characters = re.compile(r"[^\w\.-]")
+
+
+def level_to_status(levelno: int) -> Status:
+    """The status of the event for a record logged at ``levelno``: ERROR and
+    above are CRITICAL, WARNING is WARNING and anything lower is OK.
+    """
+    if levelno >= logging.ERROR:
+        return Status.CRITICAL
+    if levelno >= logging.WARNING:
+        return Status.WARNING
+    return Status.OK
+
+
+class _Burst:
+    __slots__ = ("name", "status", "output", "record", "count", "deadline")
+
+    def __init__(
+        self,
+        name: str,
+        status: Status,
+        output: str,
+        record: logging.LogRecord,
+        deadline: float,
+    ) -> None:
+        self.name = name
+        self.status = status
+        self.output = output
+        self.record = record
+        # Repeats since the last event was sent
+        self.count = 0
+        self.deadline = deadline
+
+
+class SensuHandler(logging.Handler):
+    """A logging handler that sends an event for each record, from a
+    background thread.
+
+    The first record of a kind (same logger, level and unformatted message)
+    is sent right away. Repeats of it over the next ``window`` seconds are
+    counted rather than sent, and at the end of the window one event is sent
+    for all of them, with the latest one's output. This goes on for as long
+    as the repeats do, so an error logged in a tight loop sends an event per
+    window rather than one per error. A record that changes the status of
+    the check ends the roll-ups of the records it replaces: what they rolled
+    up so far is sent before it.
+
+    Events stay in Sensu until something resolves them: a record logged at
+    INFO or below to the same logger sends an OK event, if the handler's
+    level lets it through.
+
+    :type runbook: str
+    :param runbook: The runbook of every check. See :func:`pysensu_yelp.send_event`.
+
+    :type team: str
+    :param team: The team of every check.
+
+    :type level: int
+    :param level: The lowest level of records to send. Defaults to ERROR.
+
+    :type window: float
+    :param window: How many seconds of repeats of a record to roll up into
+                   one event.
+
+    :type max_pending: int
+    :param max_pending: How many kinds of records to keep track of at once.
+                        Records of new kinds are dropped beyond that.
+
+    :type client: SensuClient
+    :param client: The client to send events through. Defaults to the one
+                   used by :func:`pysensu_yelp.send_event`.
+
+    Any other keyword arguments are passed on to
+    :class:`pysensu_yelp.CheckTemplate`.
+    """
+
+    def __init__(
+        self,
+        runbook: str,
+        team: str,
+        level: int = logging.ERROR,
+        window: float = 60.0,
+        max_pending: int = 1000,
+        client: Optional[SensuClient] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(level)
+        if window <= 0:
+            raise ValueError("window must be positive")
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        # Catch bad arguments now rather than in the background
+        CheckTemplate("pysensu_yelp", runbook, team, **kwargs)
+        self.runbook = runbook
+        self.team = team
+        self.window = window
+        self.max_pending = max_pending
+        self.client = client
+        self.kwargs = kwargs
+        # Records discarded because too many kinds were pending
+        self.dropped = 0
+        self._templates: Dict[str, CheckTemplate] = {}
+        # In the order of their deadlines
+        self._bursts: Dict[_Key, _Burst] = {}
+        self._ready: Deque[_Event] = deque()
+        self._in_flight = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        _fork_aware.add(self)
+
+    def _after_fork(self) -> None:
+        # The parent still sends what it was holding on to before the fork
+        self._bursts.clear()
+        self._ready.clear()
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def check_name(self, record: logging.LogRecord) -> str:
+        """The name of the check for ``record``: its logger's name, with any
+        characters Sensu doesn't allow in check names replaced by ``_``.
+        """
+        return _invalid_name_characters.sub("_", record.name)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if threading.current_thread() is self._thread:
+            # Logged while sending: sending it would only log it again
+            return
+        try:
+            name = self.check_name(record)
+            status = level_to_status(record.levelno)
+            output = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        key = (record.name, record.levelno, str(record.msg))
+        with self._cond:
+            if self._closed:
+                return
+            burst = self._bursts.get(key)
+            if burst is not None:
+                burst.count += 1
+                burst.output = output
+                burst.record = record
+                return
+            for other_key, other in list(self._bursts.items()):
+                if other.name == name and other.status != status:
+                    # This supersedes it: send its roll-up now, rather than
+                    # after this and with the status this changed
+                    del self._bursts[other_key]
+                    if other.count:
+                        self._roll_up(other)
+            if len(self._bursts) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._bursts[key] = _Burst(
+                name, status, output, record, time.monotonic() + self.window
+            )
+            self._ready.append((name, status, output, record))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="pysensu-yelp-logging", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _roll_up(self, burst: _Burst) -> None:
+        s = "" if burst.count == 1 else "s"
+        self._ready.append(
+            (
+                burst.name,
+                burst.status,
+                f"{burst.output}\n\n(Logged {burst.count} more time{s} in the "
+                f"last {self.window:g}s)",
+                burst.record,
+            )
+        )
+
+    def _expire(self, now: float) -> Optional[float]:
+        """Roll up the bursts whose window is over, returning the deadline of
+        the next one.
+        """
+        while self._bursts:
+            key, burst = next(iter(self._bursts.items()))
+            if burst.deadline > now and not self._closed:
+                return burst.deadline
+            del self._bursts[key]
+            if burst.count:
+                self._roll_up(burst)
+                if not self._closed:
+                    # Still going: keep rolling it up
+                    burst.count = 0
+                    burst.deadline = now + self.window
+                    self._bursts[key] = burst
+        return None
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    deadline = self._expire(time.monotonic())
+                    if self._ready or self._closed:
+                        break
+                    timeout = None if deadline is None else deadline - time.monotonic()
+                    self._cond.wait(timeout)
+                if not self._ready:
+                    break
+                batch = list(self._ready)
+                self._ready.clear()
+                self._in_flight = len(batch)
+            try:
+                self._send(batch)
+            finally:
+                with self._cond:
+                    self._in_flight = 0
+                    self._cond.notify_all()
+
+    def _send(self, batch: List[_Event]) -> None:
+        for name, status, output, record in batch:
+            try:
+                template = self._templates.get(name)
+                if template is None:
+                    template = self._templates[name] = CheckTemplate(
+                        name, self.runbook, self.team, **self.kwargs
+                    )
+                template.emit(status, output, client=self.client)
+            except Exception:
+                self.handleError(record)
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:  # type: ignore[override]
+        """Wait for the events due to be sent to be sent. Repeats being
+        rolled up are sent at the end of their window, or on :meth:`close`.
+
+        :type timeout: float
+        :param timeout: How many seconds to wait at most. ``None`` waits forever.
+
+        :rtype: bool
+        :return: Whether the events were sent before the timeout.
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._ready and not self._in_flight, timeout
+            )
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Send the events still pending, including the roll-ups of repeats,
+        and stop the background thread. Called by :func:`logging.shutdown`
+        when the interpreter exits.
+
+        :type timeout: float
+        :param timeout: How many seconds to wait for them to be sent. ``None``
+                        waits forever.
+        """
+        super().close()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
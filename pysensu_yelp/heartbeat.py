@@ -0,0 +1,275 @@
+"""Keep TTL checks from going stale, without a timer loop per check.
+
+A check with a ``ttl`` alerts when no event arrives for that long. Rather
+than sending one on a timer of its own, register the check with a
+:class:`HeartbeatScheduler`, whose single thread sends keepalives for every
+registered check::
+
+    from pysensu_yelp.heartbeat import HeartbeatScheduler
+
+    heartbeats = HeartbeatScheduler()
+    heartbeats.register(
+        name="my_service_alive",
+        runbook="y/my-service",
+        team="my_team",
+        ttl="1h",
+    )
+
+When there's something better to say than "still alive", report it. The
+keepalives repeat the latest report from then on::
+
+    heartbeats.report("my_service_alive", Status.CRITICAL, "Lost the database")
+
+So that thousands of hosts don't all send their keepalives at the top of the
+minute, each check's keepalives are due at a fixed point within its
+interval, picked from a hash of the check's source (this host, by default)
+and name.
+"""
+import heapq
+import itertools
+import logging
+import socket
+import threading
+import time
+import zlib
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from pysensu_yelp import _fork_aware
+from pysensu_yelp import CheckTemplate
+from pysensu_yelp import human_to_seconds
+from pysensu_yelp import SensuClient
+from pysensu_yelp import Status
+
+log = logging.getLogger(__name__)
+
+_Key = Tuple[Optional[str], str]
+
+
+def jitter_offset(source: Optional[str], name: str, interval: float) -> float:
+    """How many seconds into each ``interval`` the keepalives of a check are
+    due. The same for every run of the same check on the same host, and
+    spread evenly over checks and hosts.
+
+    :type source: str
+    :param source: The check's source, or ``None`` for this host.
+    """
+    if source is None:
+        source = socket.gethostname()
+    digest = zlib.crc32(f"{source}\0{name}".encode("utf-8"))
+    return digest / 2**32 * interval
+
+
+class _Heartbeat:
+    __slots__ = ("template", "interval", "offset", "status", "output", "due")
+
+    def __init__(
+        self,
+        template: CheckTemplate,
+        interval: float,
+        offset: float,
+        status: Union[Status, int],
+        output: str,
+    ) -> None:
+        self.template = template
+        self.interval = interval
+        self.offset = offset
+        self.status = status
+        self.output = output
+        self.due = 0.0
+
+
+class HeartbeatScheduler:
+    """Sends keepalives for registered checks from one background thread.
+
+    The thread starts with the first registration. Checks are kept in a heap
+    ordered by when their next keepalive is due, so the thread only wakes up
+    when one is. Neither the thread nor the registrations survive a fork:
+    the parent keeps sending those keepalives, and a child only sends the
+    ones of the checks it registers itself, from a thread of its own.
+
+    :type client: SensuClient
+    :param client: The client to send keepalives through. Defaults to the one
+                   used by :func:`pysensu_yelp.send_event`.
+
+    :type jitter: float
+    :param jitter: Which fraction of its interval a check's keepalives are
+                   spread over. 0 sends every check's keepalives at whole
+                   multiples of its interval.
+    """
+
+    def __init__(
+        self, client: Optional[SensuClient] = None, jitter: float = 1.0
+    ) -> None:
+        if not 0 <= jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1")
+        self.client = client
+        self.jitter = jitter
+        self._heartbeats: Dict[_Key, _Heartbeat] = {}
+        # (due, sequence number, key). Entries whose due time no longer
+        # matches their heartbeat's are stale, and skipped.
+        self._schedule: List[Tuple[float, int, _Key]] = []
+        self._counter = itertools.count()
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._clock = time.monotonic
+        self._wall_clock = time.time
+        _fork_aware.add(self)
+
+    def _after_fork(self) -> None:
+        # The parent keeps sending the keepalives of its registrations
+        self._heartbeats.clear()
+        self._schedule.clear()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def register(
+        self,
+        name: str,
+        runbook: str,
+        team: str,
+        status: Union[Status, int] = Status.OK,
+        output: Optional[str] = None,
+        interval: Optional[float] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Start sending keepalives for a check, replacing any earlier
+        registration of the same check (source and name).
+
+        The other keyword arguments are passed on to
+        :class:`pysensu_yelp.CheckTemplate`, and must include a ``ttl`` or a
+        ``check_every``.
+
+        :type status: int
+        :param status: The status of the keepalives until :meth:`report`
+                       says otherwise.
+
+        :type output: str
+        :param output: Their output. Defaults to saying the check is alive.
+
+        :type interval: float
+        :param interval: How many seconds to leave between keepalives.
+                         Defaults to the check's ``check_every``, or half its
+                         ``ttl`` if that's sooner or there's no
+                         ``check_every``.
+        """
+        if interval is None:
+            intervals: List[float] = []
+            check_every = human_to_seconds(kwargs.get("check_every"))
+            if check_every is not None:
+                intervals.append(check_every)
+            ttl = human_to_seconds(kwargs.get("ttl"))
+            if ttl is not None:
+                intervals.append(ttl / 2)
+            if not intervals:
+                raise ValueError("Heartbeats need a ttl, check_every or interval")
+            interval = min(intervals)
+        if interval <= 0:
+            raise ValueError("The interval between heartbeats must be positive")
+        if output is None:
+            output = f"{name} is alive"
+        source = kwargs.get("source")
+        heartbeat = _Heartbeat(
+            CheckTemplate(name, runbook, team, **kwargs),
+            interval,
+            jitter_offset(source, name, interval) * self.jitter,
+            status,
+            output,
+        )
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Cannot register heartbeats after close")
+            self._heartbeats[(source, name)] = heartbeat
+            self._schedule_next(heartbeat, (source, name), 0)
+
+    def unregister(self, name: str, source: Optional[str] = None) -> None:
+        """Stop sending keepalives for a check."""
+        with self._cond:
+            self._heartbeats.pop((source, name), None)
+
+    def report(
+        self,
+        name: str,
+        status: Union[Status, int],
+        output: str,
+        source: Optional[str] = None,
+    ) -> None:
+        """Send a registered check's actual result now, and repeat it in the
+        keepalives that follow. The next keepalive is put off accordingly.
+
+        :raises KeyError: If the check isn't registered.
+        """
+        key = (source, name)
+        with self._cond:
+            heartbeat = self._heartbeats[key]
+            heartbeat.status = status
+            heartbeat.output = output
+            # Leave at least half an interval before the next keepalive
+            self._schedule_next(heartbeat, key, heartbeat.interval / 2)
+        heartbeat.template.emit(status, output, client=self.client)
+
+    def _schedule_next(self, heartbeat: _Heartbeat, key: _Key, delay: float) -> None:
+        # The next time, at least delay seconds from now, that is a whole
+        # number of intervals plus the heartbeat's offset on the wall clock
+        wall = self._wall_clock() + delay
+        wait = delay + (heartbeat.offset - wall) % heartbeat.interval
+        heartbeat.due = self._clock() + wait
+        heapq.heappush(self._schedule, (heartbeat.due, next(self._counter), key))
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="pysensu-yelp-heartbeats", daemon=True
+            )
+            self._thread.start()
+        self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                heartbeat = None
+                while heartbeat is None:
+                    if self._closed:
+                        return
+                    if not self._schedule:
+                        self._cond.wait()
+                        continue
+                    due, _, key = self._schedule[0]
+                    candidate = self._heartbeats.get(key)
+                    if candidate is None or candidate.due != due:
+                        heapq.heappop(self._schedule)
+                        continue
+                    now = self._clock()
+                    if due > now:
+                        self._cond.wait(due - now)
+                        continue
+                    heartbeat = candidate
+                    heartbeat.due = due + heartbeat.interval
+                    if heartbeat.due <= now:
+                        # We fell behind (e.g. the machine was suspended):
+                        # don't try to catch up on the keepalives we missed
+                        heapq.heappop(self._schedule)
+                        self._schedule_next(heartbeat, key, 0)
+                    else:
+                        heapq.heapreplace(
+                            self._schedule, (heartbeat.due, next(self._counter), key)
+                        )
+                    status, output = heartbeat.status, heartbeat.output
+            try:
+                heartbeat.template.emit(status, output, client=self.client)
+            except Exception:
+                log.exception(
+                    "Failed to send a heartbeat for %s", heartbeat.template.name
+                )
+
+    def close(self) -> None:
+        """Stop sending keepalives."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
@@ -0,0 +1,332 @@
+"""Generate ``send_event`` traffic at a controlled rate, to find out how much a
+Sensu client (or relay) can take.
+
+Events are either synthesized, with a given number of distinct check names,
+output size and mix of statuses, or replayed from a file of JSON events, one
+per line, such as the ones :class:`pysensu_yelp.sinks.FileSink` writes. They
+are sent by a number of concurrent senders, each with a connection of its
+own, through the same code as :func:`pysensu_yelp.send_event`::
+
+    pysensu-yelp-loadgen --host 10.0.0.5 --rate 2000 --concurrency 8 --duration 60
+
+At the end it reports the throughput achieved, percentiles of the time each
+send took, and the errors encountered.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from pysensu_yelp import DEFAULT_SENSU_HOST
+from pysensu_yelp import DEFAULT_SENSU_PORT
+from pysensu_yelp import parse_transport
+from pysensu_yelp import SensuClient
+from pysensu_yelp import Status
+
+DEFAULT_STATUS_MIX = "0:90,1:6,2:3,3:1"
+
+
+def parse_status_mix(spec: str) -> List[Tuple[Status, float]]:
+    """Parse a mix of statuses like ``"0:90,2:10"``: 90% OK, 10% CRITICAL.
+
+    :raises ValueError: If the mix is malformed.
+    """
+    mix = []
+    for part in spec.split(","):
+        status, _, weight = part.partition(":")
+        mix.append((Status(int(status)), float(weight or 1)))
+    if sum(weight for _, weight in mix) <= 0:
+        raise ValueError(f"Status mix {spec!r} has no positive weights")
+    return mix
+
+
+def synthesize_events(
+    count: int,
+    names: int,
+    output_size: int,
+    status_mix: Sequence[Tuple[Status, float]],
+    seed: Optional[int] = None,
+    team: str = "loadgen",
+    runbook: str = "http://pysensu-yelp.readthedocs.org",
+) -> List[Dict[str, Any]]:
+    """Make up ``count`` events, as keyword arguments to
+    :func:`pysensu_yelp.send_event`, spread over ``names`` check names.
+    """
+    if names < 1:
+        raise ValueError("names must be at least 1")
+    rng = random.Random(seed)
+    statuses = [status for status, _ in status_mix]
+    weights = [weight for _, weight in status_mix]
+    events = []
+    for index in range(count):
+        status = rng.choices(statuses, weights)[0]
+        prefix = f"{status.name}: load test event {index}"
+        events.append(
+            dict(
+                name=f"loadgen_check_{index % names}",
+                runbook=runbook,
+                status=status,
+                output=prefix + "x" * max(0, output_size - len(prefix)),
+                team=team,
+            )
+        )
+    return events
+
+
+def load_events(path: str) -> List[Dict[str, Any]]:
+    """Read result dicts (see :func:`pysensu_yelp.build_event`), one JSON
+    object per line.
+    """
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+class _Sender(threading.Thread):
+    def __init__(
+        self,
+        client: SensuClient,
+        events: Sequence[Dict[str, Any]],
+        replay: bool,
+        count: Optional[int],
+        rate: float,
+        deadline: float,
+    ) -> None:
+        super().__init__(name="pysensu-yelp-loadgen", daemon=True)
+        self.client = client
+        self.events = events
+        self.replay = replay
+        self.count = count
+        self.rate = rate
+        self.deadline = deadline
+        self.latencies: List[float] = []
+        self.errors: "Counter[str]" = Counter()
+
+    def run(self) -> None:
+        interval = 1 / self.rate if self.rate else 0.0
+        due = time.monotonic()
+        sent = 0
+        try:
+            while self.count is None or sent < self.count:
+                now = time.monotonic()
+                if now >= self.deadline:
+                    break
+                if due > now:
+                    time.sleep(min(due, self.deadline) - now)
+                    continue
+                due += interval
+                event = self.events[sent % len(self.events)]
+                sent += 1
+                start = time.perf_counter()
+                try:
+                    if self.replay:
+                        self.client.send_result(event)
+                    else:
+                        self.client.send_event(**event)
+                except Exception as e:
+                    self.errors[type(e).__name__] += 1
+                else:
+                    self.latencies.append(time.perf_counter() - start)
+        finally:
+            self.client.close()
+
+
+def run_load(
+    events: Sequence[Dict[str, Any]],
+    sensu_host: str = DEFAULT_SENSU_HOST,
+    sensu_port: int = DEFAULT_SENSU_PORT,
+    transport: str = "tcp",
+    replay: bool = False,
+    rate: float = 0.0,
+    concurrency: int = 1,
+    duration: float = 10.0,
+    count: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Send ``events`` over and over, from ``concurrent`` threads with a
+    client each, until ``duration`` seconds have passed or ``count`` events
+    were sent.
+
+    :type events: sequence
+    :param events: Keyword arguments to :meth:`pysensu_yelp.SensuClient.send_event`,
+                   or with ``replay``, result dicts to send as they are.
+
+    :type rate: float
+    :param rate: How many events to send per second, over all the senders.
+                 0 sends them as fast as possible.
+
+    :rtype: dict
+    :return: A JSON-serializable report of what happened.
+    """
+    if not events:
+        raise ValueError("No events to send")
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    start = time.monotonic()
+    senders = [
+        _Sender(
+            SensuClient(sensu_host, sensu_port, transport=parse_transport(transport)),
+            # Each sender starts at a different point in the events
+            list(events[i::concurrency]) or list(events),
+            replay,
+            None if count is None else count // concurrency + (i < count % concurrency),
+            rate / concurrency,
+            start + duration,
+        )
+        for i in range(concurrency)
+    ]
+    for sender in senders:
+        sender.start()
+    for sender in senders:
+        sender.join()
+    elapsed = time.monotonic() - start
+
+    latencies = sorted(latency for sender in senders for latency in sender.latencies)
+    errors: "Counter[str]" = Counter()
+    for sender in senders:
+        errors.update(sender.errors)
+    return {
+        "sent": len(latencies),
+        "errors": dict(errors),
+        "seconds": elapsed,
+        "events_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            name: _percentile(latencies, fraction) * 1000
+            for name, fraction in (
+                ("p50", 0.5),
+                ("p90", 0.9),
+                ("p99", 0.99),
+                ("max", 1.0),
+            )
+        },
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_SENSU_HOST,
+        help="The Sensu client to send to, or unix://<path> for a Unix socket. "
+        "Defaults to %(default)s.",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_SENSU_PORT,
+        help="Defaults to %(default)s.",
+    )
+    parser.add_argument(
+        "--transport",
+        default="tcp",
+        help="tcp, udp, or one of the sinks, e.g. null to measure the "
+        "client alone. Defaults to %(default)s.",
+    )
+    parser.add_argument(
+        "--replay", metavar="FILE", help="Send the JSON events in this file"
+    )
+    parser.add_argument(
+        "--names",
+        type=int,
+        default=100,
+        help="How many distinct check names to synthesize. Defaults to %(default)s.",
+    )
+    parser.add_argument(
+        "--output-size",
+        type=int,
+        default=100,
+        help="How long synthesized outputs are. Defaults to %(default)s.",
+    )
+    parser.add_argument(
+        "--status-mix",
+        default=DEFAULT_STATUS_MIX,
+        help="Relative weights of the synthesized statuses. "
+        "Defaults to %(default)s.",
+    )
+    parser.add_argument("--seed", type=int, help="Seed for the synthesized events")
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=0.0,
+        help="Target events per second, over all senders. Defaults to as fast "
+        "as possible.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="How many senders to run, each with its own connection. "
+        "Defaults to %(default)s.",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=10.0,
+        help="How many seconds to send for. Defaults to %(default)s.",
+    )
+    parser.add_argument("--count", type=int, help="Stop after this many events")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+    if args.names < 1:
+        parser.error("--names must be at least 1")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    if args.replay:
+        events = load_events(args.replay)
+    else:
+        events = synthesize_events(
+            max(args.names, 1000),
+            args.names,
+            args.output_size,
+            parse_status_mix(args.status_mix),
+            seed=args.seed,
+        )
+    report = run_load(
+        events,
+        sensu_host=args.host,
+        sensu_port=args.port,
+        transport=args.transport,
+        replay=bool(args.replay),
+        rate=args.rate,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        count=args.count,
+    )
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        latency = report["latency_ms"]
+        print(
+            f"Sent {report['sent']} events in {report['seconds']:.2f}s: "
+            f"{report['events_per_sec']:.0f} events/s"
+        )
+        print(
+            f"Latency: p50 {latency['p50']:.3f}ms, p90 {latency['p90']:.3f}ms, "
+            f"p99 {latency['p99']:.3f}ms, max {latency['max']:.3f}ms"
+        )
+        errors = report["errors"]
+        print(
+            "Errors: "
+            + (", ".join(f"{count} {name}" for name, count in errors.items()) or "none")
+        )
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""Roll the results of a cluster's members up into a single event.
+
+When every shard or node of a cluster checks itself, sending each result to
+Sensu means thousands of events where only the cluster as a whole is acted
+on. A :class:`ClusterRollup` collects the members' results instead, and once
+per window sends one event for the cluster, whose status depends on how many
+members are unwell::
+
+    from pysensu_yelp.rollup import ClusterRollup
+
+    rollup = ClusterRollup(
+        name="shard_health",
+        runbook="y/shards",
+        team="storage",
+        cluster_name="shards-prod",
+        window=60,
+    )
+    rollup.start()
+    ...
+    rollup.record("shard-17", Status.CRITICAL, "Replication is 2h behind")
+"""
+
+import logging
+import threading
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+from pysensu_yelp import _fork_aware
+from pysensu_yelp import CheckTemplate
+from pysensu_yelp import SensuClient
+from pysensu_yelp import Status
+
+log = logging.getLogger(__name__)
+
+# Which statuses are worse than which. UNKNOWN goes between WARNING and
+# CRITICAL, as Nagios and Sensu order them.
+SEVERITY = {
+    Status.OK: 0,
+    Status.WARNING: 1,
+    Status.UNKNOWN: 2,
+    Status.CRITICAL: 3,
+}
+
+# (status, fraction): the cluster gets this status when more than this
+# fraction of its members have it or worse. Tried in order, OK otherwise.
+Threshold = Tuple[Status, float]
+
+DEFAULT_THRESHOLDS: Tuple[Threshold, ...] = (
+    (Status.CRITICAL, 0.1),
+    (Status.WARNING, 0.0),
+)
+
+# How much of each member's output goes in the summary
+_MEMBER_OUTPUT_LENGTH = 100
+
+
+def rollup_status(
+    statuses: Sequence[Status], thresholds: Sequence[Threshold] = DEFAULT_THRESHOLDS
+) -> Status:
+    """The status of a cluster whose members have ``statuses``, according to
+    ``thresholds``.
+    """
+    for status, fraction in thresholds:
+        worse = sum(1 for s in statuses if SEVERITY[s] >= SEVERITY[status])
+        if worse > fraction * len(statuses):
+            return status
+    return Status.OK
+
+
+def summarize(
+    status: Status,
+    results: Dict[str, Tuple[Status, str]],
+    max_listed: int = 5,
+) -> str:
+    """A compact output for a rollup event: how many members have each
+    status, followed by the worst ``max_listed`` of them with the first line
+    of their output.
+    """
+    counts = {s: 0 for s in SEVERITY}
+    for member_status, _ in results.values():
+        counts[member_status] += 1
+    lines = [
+        "{}: {} members, {}".format(
+            status.name,
+            len(results),
+            ", ".join(
+                f"{counts[s]} {s.name}"
+                for s in sorted(SEVERITY, key=SEVERITY.__getitem__, reverse=True)
+                if counts[s]
+            ),
+        )
+    ]
+    worst = sorted(
+        (
+            (member, member_status, output)
+            for member, (member_status, output) in results.items()
+            if member_status != Status.OK
+        ),
+        key=lambda item: (-SEVERITY[item[1]], item[0]),
+    )
+    for member, member_status, output in worst[:max_listed]:
+        first_line = output.split("\n", 1)[0][:_MEMBER_OUTPUT_LENGTH]
+        lines.append(f"{member}: {member_status.name} {first_line}".rstrip())
+    if len(worst) > max_listed:
+        lines.append(f"... and {len(worst) - max_listed} more")
+    return "\n".join(lines)
+
+
+class ClusterRollup:
+    """Collects the results of a cluster's members, and sends one event for
+    the whole cluster per window.
+
+    Each member counts once per window, with its latest result. Members that
+    didn't report during a window aren't counted in it, and a window without
+    any results is UNKNOWN.
+
+    Takes the same arguments as :class:`pysensu_yelp.CheckTemplate`, plus:
+
+    :type window: float
+    :param window: How many seconds of results go into each rollup event.
+
+    :type thresholds: sequence
+    :param thresholds: ``(status, fraction)`` pairs, tried in order: the
+                       cluster gets the first ``status`` that more than
+                       ``fraction`` of its members have, or worse (see
+                       :data:`SEVERITY`). Defaults to CRITICAL when more than
+                       10% of the members are CRITICAL, else WARNING when any
+                       member isn't OK.
+
+    :type max_listed: int
+    :param max_listed: How many of the worst members to list in the output.
+
+    :type client: SensuClient
+    :param client: The client to send the rollups through. Defaults to the one
+                   used by :func:`pysensu_yelp.send_event`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        runbook: str,
+        team: str,
+        cluster_name: str,
+        window: float = 60.0,
+        thresholds: Sequence[Threshold] = DEFAULT_THRESHOLDS,
+        max_listed: int = 5,
+        client: Optional[SensuClient] = None,
+        **kwargs: Any,
+    ) -> None:
+        if window <= 0:
+            raise ValueError("window must be positive")
+        kwargs.setdefault("check_every", f"{max(1, int(window))}s")
+        self.template = CheckTemplate(
+            name, runbook, team, cluster_name=cluster_name, **kwargs
+        )
+        self.window = window
+        self.thresholds = [(Status(s), fraction) for s, fraction in thresholds]
+        self.max_listed = max_listed
+        self.client = client
+        self._results: Dict[str, Tuple[Status, str]] = {}
+        self._lock = threading.Lock()
+        self._stop: Optional[threading.Event] = None
+        _fork_aware.add(self)
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    def record(self, member: str, status: Union[Status, int], output: str = "") -> None:
+        """Record a member's result, replacing any earlier one in this window."""
+        status = Status(status)
+        with self._lock:
+            self._results[member] = (status, output)
+
+    def record_event(self, result_dict: Dict[str, Any]) -> None:
+        """Record the result of a member's own event, as built by
+        :func:`pysensu_yelp.build_event`. The member is the event's source if
+        it has one, its name otherwise.
+        """
+        self.record(
+            result_dict.get("source") or result_dict["name"],
+            result_dict["status"],
+            result_dict["output"],
+        )
+
+    def flush(self) -> Tuple[Status, str]:
+        """Send the rollup of the results recorded since the last flush, and
+        start a new window.
+
+        :rtype: tuple
+        :return: The status and output sent.
+        """
+        with self._lock:
+            results, self._results = self._results, {}
+        if results:
+            status = rollup_status(
+                [member_status for member_status, _ in results.values()],
+                self.thresholds,
+            )
+            output = summarize(status, results, self.max_listed)
+        else:
+            status = Status.UNKNOWN
+            output = f"UNKNOWN: No members reported in the last {self.window:g}s"
+        self.template.emit(status, output, client=self.client)
+        return status, output
+
+    def start(self) -> None:
+        """Flush every ``window`` seconds, from a background thread."""
+        self.stop()
+        stop = self._stop = threading.Event()
+
+        def run() -> None:
+            while not stop.wait(self.window):
+                try:
+                    self.flush()
+                except Exception:
+                    log.exception("Failed to send %s", self.template.name)
+
+        threading.Thread(target=run, name="pysensu-yelp-rollup", daemon=True).start()
+
+    def stop(self) -> None:
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
@@ -0,0 +1,263 @@
+"""Run many Nagios plugins from one process, each on its own schedule, and
+send their results to Sensu over one shared connection.
+
+The checks are read from a JSON manifest, which is a list of checks like::
+
+    [
+        {
+            "sensu_dict": {
+                "name": "disk_space",
+                "runbook": "y/disk-space",
+                "team": "ops",
+                "check_every": "1m"
+            },
+            "command": ["/usr/lib/nagios/plugins/check_disk", "-w", "10%"],
+            "timeout": 30,
+            "status_policy": "nagios"
+        }
+    ]
+
+``sensu_dict`` and ``status_policy`` mean the same as for
+:func:`pysensu_yelp.wrapper.do_command_wrapper`. Each check runs every
+``check_every`` (30s by default) and is killed once it runs for longer than
+``timeout`` seconds, which defaults to its interval. A check that is still
+running when it is next due skips that run rather than piling up, and the
+other checks carry on as scheduled.
+
+Run it with ``pysensu-yelp-runner manifest.json``.
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from pysensu_yelp import build_event
+from pysensu_yelp import human_to_seconds
+from pysensu_yelp import SensuClient
+from pysensu_yelp.wrapper import DEFAULT_MAX_OUTPUT_BYTES
+from pysensu_yelp.wrapper import report_command
+from pysensu_yelp.wrapper import run_command
+from pysensu_yelp.wrapper import STATUS_POLICIES
+
+log = logging.getLogger(__name__)
+
+# sensu_dict keys that say where to send the event, rather than what's in it
+_DESTINATION_KEYS = ("sensu_host", "sensu_port", "transport")
+# sensu_dict keys that the command's result replaces
+_RESULT_KEYS = ("status", "output")
+
+
+class Check(NamedTuple):
+    """A command to run and report on every ``interval`` seconds."""
+
+    sensu_dict: Dict[str, Any]
+    command: List[str]
+    interval: float
+    timeout: Optional[float] = None
+    status_policy: str = "nagios"
+
+
+def parse_check(entry: Dict[str, Any]) -> Check:
+    """Validate a manifest entry and turn it into a :class:`Check`.
+
+    :raises ValueError: If the entry is not a valid check.
+    """
+    sensu_dict = dict(entry["sensu_dict"])
+    command = entry["command"]
+    if (
+        not isinstance(command, list)
+        or not command
+        or not all(isinstance(arg, str) for arg in command)
+    ):
+        raise ValueError("command must be a non-empty list of strings")
+    # Catch bad sensu_dicts now, rather than every time the check runs
+    build_event(
+        status=0,
+        output="",
+        **{
+            k: v
+            for k, v in sensu_dict.items()
+            if k not in _DESTINATION_KEYS + _RESULT_KEYS
+        },
+    )
+    interval = human_to_seconds(sensu_dict.get("check_every", "30s"))
+    if not interval:
+        raise ValueError("check_every must be at least 1s")
+    status_policy = entry.get("status_policy", "nagios")
+    if status_policy not in STATUS_POLICIES:
+        raise ValueError(f"Unknown status_policy: {status_policy!r}")
+    timeout = entry.get("timeout", interval)
+    return Check(sensu_dict, list(command), interval, timeout, status_policy)
+
+
+def load_manifest(path: str) -> List[Check]:
+    """Read the checks from a JSON manifest.
+
+    :raises ValueError: If any entry is not a valid check, naming the entry.
+    """
+    with open(path) as f:
+        entries = json.load(f)
+    checks = []
+    for index, entry in enumerate(entries):
+        try:
+            checks.append(parse_check(entry))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid check #{index} in {path}: {e!r}") from e
+    return checks
+
+
+class CheckRunner:
+    """Runs checks on their schedules, on a pool of worker threads.
+
+    A scheduler thread starts each check when it's due; the workers run the
+    commands and send the results. Checks that are due while all workers are
+    busy wait for one to be free, so ``max_workers`` should be large enough
+    for the checks that run at the same time, and the timeouts short enough
+    that a hung check can't hold on to a worker for long.
+
+    :type checks: iterable
+    :param checks: The :class:`Check` objects to run.
+    :type max_workers: int
+    :param max_workers: How many checks can run at the same time.
+    :type client: SensuClient
+    :param client: The client to send the results with. Defaults to a new
+                   :class:`pysensu_yelp.SensuClient`, which reuses one
+                   connection per Sensu client.
+    :type max_output_bytes: int
+    :param max_output_bytes: How much of each check's output to keep.
+    """
+
+    def __init__(
+        self,
+        checks: Iterable[Check],
+        max_workers: int = 8,
+        client: Optional[SensuClient] = None,
+        max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES,
+    ) -> None:
+        self.checks = list(checks)
+        self.client = client if client is not None else SensuClient()
+        self.max_output_bytes = max_output_bytes
+        # Runs that were skipped because the previous one was still going
+        self.skipped = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="pysensu-yelp-check"
+        )
+        self._lock = threading.Lock()
+        self._running: Set[int] = set()
+        self._stopped = threading.Event()
+        self._clock = time.monotonic
+
+    def run(self) -> None:
+        """Run the checks until :meth:`stop` is called, then wait for the
+        running ones to finish and close the client.
+        """
+        now = self._clock()
+        schedule: List[Tuple[float, int]] = [
+            (now, index) for index in range(len(self.checks))
+        ]
+        heapq.heapify(schedule)
+        try:
+            while schedule and not self._stopped.is_set():
+                due, index = schedule[0]
+                now = self._clock()
+                if due > now:
+                    self._stopped.wait(due - now)
+                    continue
+                next_due = due + self.checks[index].interval
+                if next_due <= now:
+                    # We fell behind (e.g. the machine was suspended): don't
+                    # try to catch up on the runs we missed
+                    next_due = now + self.checks[index].interval
+                heapq.heapreplace(schedule, (next_due, index))
+                self._start(index)
+        finally:
+            self._executor.shutdown(wait=True)
+            self.client.close()
+
+    def stop(self) -> None:
+        """Stop starting checks. :meth:`run` returns once the running ones
+        have finished.
+        """
+        self._stopped.set()
+
+    def _start(self, index: int) -> None:
+        with self._lock:
+            if index in self._running:
+                self.skipped += 1
+                log.warning(
+                    "Skipping %s: its previous run hasn't finished",
+                    self.checks[index].sensu_dict["name"],
+                )
+                return
+            self._running.add(index)
+        self._executor.submit(self._run_check, index)
+
+    def _run_check(self, index: int) -> None:
+        check = self.checks[index]
+        try:
+            result = run_command(
+                check.command,
+                timeout=check.timeout,
+                max_output_bytes=self.max_output_bytes,
+            )
+            report_command(
+                check.sensu_dict, result, check.status_policy, client=self.client
+            )
+        except Exception:
+            log.exception("Failed to run %s", check.sensu_dict["name"])
+        finally:
+            with self._lock:
+                self._running.discard(index)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Run the Nagios plugins in a manifest on their schedules "
+        "and report the results to a local Sensu agent"
+    )
+    parser.add_argument("manifest", help="JSON list of checks to run")
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=8,
+        help="How many checks can run at the same time. Defaults to %(default)s.",
+    )
+    parser.add_argument(
+        "--max-output-bytes",
+        type=int,
+        default=DEFAULT_MAX_OUTPUT_BYTES,
+        help="Keep at most this many bytes of each check's output. "
+        "Defaults to %(default)s.",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    runner = CheckRunner(
+        load_manifest(args.manifest),
+        max_workers=args.max_workers,
+        max_output_bytes=args.max_output_bytes,
+    )
+    signal.signal(signal.SIGTERM, lambda signum, frame: runner.stop())
+    try:
+        runner.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
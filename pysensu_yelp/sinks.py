@@ -0,0 +1,113 @@
+"""Stand-ins for the Sensu client, for tests, load tests and dry runs.
+
+A sink is used as a client's transport, and receives the encoded events
+instead of a Sensu client::
+
+    sink = MemorySink()
+    client = SensuClient(transport=sink)
+    client.send_event(name="my_check", ...)
+    assert sink.results()[0]["name"] == "my_check"
+
+Sinks can also be chosen without touching the code that sends events,
+through the ``PYSENSU_YELP_TRANSPORT`` environment variable (see
+:func:`pysensu_yelp.parse_transport`), e.g. ``PYSENSU_YELP_TRANSPORT=null``
+or ``PYSENSU_YELP_TRANSPORT=file:/tmp/events.ndjson``.
+"""
+
+import abc
+import json
+import threading
+from collections import deque
+from typing import Any
+from typing import BinaryIO
+from typing import Deque
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from pysensu_yelp import _fork_aware
+
+
+class Sink(abc.ABC):
+    """Somewhere to deliver encoded events to, other than a Sensu client.
+
+    Each payload is a single event, serialized as a newline-terminated line
+    of JSON (see :func:`pysensu_yelp.encode_event`). Sinks must be safe to
+    use from several threads at once.
+    """
+
+    @abc.abstractmethod
+    def send(self, payloads: List[bytes]) -> None:
+        """Deliver the payloads, or raise an exception if they can't be."""
+
+    def close(self) -> None:
+        """Release any resources held by the sink. It can still be sent to
+        afterwards.
+        """
+
+
+class NullSink(Sink):
+    """Discards events, only counting them."""
+
+    def __init__(self) -> None:
+        self.sent = 0
+
+    def send(self, payloads: List[bytes]) -> None:
+        # Not exact with several threads, which is fine for a count
+        self.sent += len(payloads)
+
+
+class MemorySink(Sink):
+    """Keeps the last ``max_events`` events in memory.
+
+    :type max_events: int
+    :param max_events: How many events to keep, older ones are discarded.
+                       ``None`` keeps them all.
+    """
+
+    def __init__(self, max_events: Optional[int] = 10000) -> None:
+        self.payloads: Deque[bytes] = deque(maxlen=max_events)
+
+    def send(self, payloads: List[bytes]) -> None:
+        self.payloads.extend(payloads)
+
+    def results(self) -> List[Dict[str, Any]]:
+        """The result dicts of the kept events, oldest first."""
+        return [json.loads(payload) for payload in list(self.payloads)]
+
+    def clear(self) -> None:
+        self.payloads.clear()
+
+
+class FileSink(Sink):
+    """Appends events to a file, one JSON object per line.
+
+    The file is opened on the first send and flushed after every send.
+
+    :type path: str
+    :param path: The file to append to.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._file: Optional[BinaryIO] = None
+        _fork_aware.add(self)
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    def send(self, payloads: List[bytes]) -> None:
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "ab")
+            self._file.write(b"".join(payloads))
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                try:
+                    self._file.close()
+                finally:
+                    self._file = None
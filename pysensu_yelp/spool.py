@@ -0,0 +1,177 @@
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from pysensu_yelp import _fork_aware
+
+
+class Spool:
+    """An append-only file of events that couldn't be delivered, to be sent
+    once the Sensu client is reachable again, even by another process after a
+    restart.
+
+    Events are stored as they were encoded, one JSON object per line. Only
+    the newest event of each check (source, name) is worth sending: Sensu
+    only keeps the latest result anyway, so older ones are compacted away
+    when the spool gets too large and before it is replayed.
+
+    Writes are flushed right away, but only fsync'ed once every
+    ``fsync_interval`` seconds, so that spooling many events in a row doesn't
+    wait on the disk for each of them.
+
+    A spool belongs to a single Sensu client, and to a single process at a
+    time. Use it through :class:`pysensu_yelp.SensuClient`::
+
+        client = pysensu_yelp.SensuClient(spool=Spool("/var/spool/my_service.sensu"))
+
+    :type path: str
+    :param path: The spool file. A rotated spool is kept next to it, with a
+                 ``.1`` suffix.
+
+    :type max_bytes: int
+    :param max_bytes: How large the spool file can get before it is compacted,
+                      and, if that's not enough, rotated. At most one rotated
+                      file is kept, so the spool never takes up more than about
+                      twice this.
+
+    :type fsync_interval: float
+    :param fsync_interval: How many seconds can go by between fsyncs of the
+                           spool file while events are written to it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 10 * 1024 * 1024,
+        fsync_interval: float = 1.0,
+    ) -> None:
+        self.path = path
+        self.rotated_path = path + ".1"
+        self.max_bytes = max_bytes
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._file: Optional[io.BufferedWriter] = None
+        self._synced_at = 0.0
+        self.pending = any(
+            os.path.exists(p) and os.path.getsize(p)
+            for p in (self.rotated_path, self.path)
+        )
+        _fork_aware.add(self)
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    def _open(self) -> io.BufferedWriter:
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        return self._file
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    def append(self, payloads: List[bytes]) -> None:
+        """Add encoded events (see :func:`pysensu_yelp.encode_event`) to the
+        end of the spool.
+        """
+        with self._lock:
+            spool_file = self._open()
+            for payload in payloads:
+                spool_file.write(payload)
+            spool_file.flush()
+            self.pending = True
+            now = time.monotonic()
+            if now - self._synced_at >= self.fsync_interval:
+                os.fsync(spool_file.fileno())
+                self._synced_at = now
+            if spool_file.tell() > self.max_bytes:
+                self._close()
+                self._compact()
+                if os.path.getsize(self.path) > self.max_bytes:
+                    os.replace(self.path, self.rotated_path)
+
+    def _read(self) -> List[bytes]:
+        lines: List[bytes] = []
+        for path in (self.rotated_path, self.path):
+            try:
+                with open(path, "rb") as spool_file:
+                    lines.extend(spool_file)
+            except FileNotFoundError:
+                pass
+        return compact(lines)
+
+    def _compact(self) -> None:
+        with open(self.path, "rb") as spool_file:
+            lines = compact(list(spool_file))
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as tmp_file:
+            tmp_file.writelines(lines)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        os.replace(tmp_path, self.path)
+
+    def replay(
+        self, send: Callable[[List[bytes]], None], batch_size: int = 1000
+    ) -> int:
+        """Send the spooled events, oldest first, and empty the spool.
+
+        If sending fails, the exception is raised and the spool is kept, to be
+        replayed again later. Events sent before the failure will then be
+        sent again.
+
+        :type send: callable
+        :param send: Called with lists of up to ``batch_size`` encoded events.
+
+        :rtype: int
+        :return: How many events were sent.
+        """
+        with self._lock:
+            self._close()
+            lines = self._read()
+            for start in range(0, len(lines), batch_size):
+                send(lines[start : start + batch_size])
+            for path in (self.rotated_path, self.path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self.pending = False
+            return len(lines)
+
+    def close(self) -> None:
+        """Flush and fsync the spool file and close it."""
+        with self._lock:
+            self._close()
+
+
+def _check_key(line: bytes) -> Optional[Tuple[Optional[str], str]]:
+    try:
+        event = json.loads(line)
+        return event.get("source"), event["name"]
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def compact(lines: List[bytes]) -> List[bytes]:
+    """Keep only the newest of the given encoded events for each check, in the
+    order those were written. Lines that aren't valid events (such as one
+    left half-written by a crash) are dropped.
+    """
+    newest: "OrderedDict[Tuple[Optional[str], str], bytes]" = OrderedDict()
+    for line in lines:
+        key = _check_key(line)
+        if key is None or not line.endswith(b"\n"):
+            continue
+        newest.pop(key, None)
+        newest[key] = line
+    return list(newest.values())
@@ -0,0 +1,310 @@
+"""Client-side statistics on the sending path: what was sent, what failed and
+how long it took.
+
+Statistics are off by default. To turn them on, give the client a
+:class:`Stats`::
+
+    from pysensu_yelp.stats import Stats
+
+    stats = Stats()
+    pysensu_yelp.set_default_client(pysensu_yelp.SensuClient(stats=stats))
+    ...
+    stats.snapshot()["checks"]["my_cool_check"]["failed"]
+
+They can also report on themselves to Sensu, as a check that warns when
+events couldn't be delivered::
+
+    stats.start_health_check(
+        client, name="my_service_sensu_health", team="ops", runbook="y/sensu"
+    )
+"""
+
+import bisect
+import json
+import logging
+import threading
+import time
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from pysensu_yelp import _fork_aware
+from pysensu_yelp import CheckTemplate
+from pysensu_yelp import SensuClient
+from pysensu_yelp import Status
+
+log = logging.getLogger(__name__)
+
+# Called with a metric's name, the name of the check it is about (or None),
+# and the value: 1 for the event counters, bytes for "bytes_written" and
+# seconds for the latencies
+Hook = Callable[[str, Optional[str], float], None]
+
+# What can happen to an event, counted per check
+OUTCOMES = ("sent", "failed", "spooled", "dropped", "suppressed")
+
+# Upper bounds of the latency histograms' buckets, in seconds
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+_NAME_PREFIX = b'{"name":"'
+
+
+def payload_name(payload: bytes) -> str:
+    """The name of the check an encoded event is about.
+
+    Events built by :func:`pysensu_yelp.build_event` start with their name,
+    which can't contain quotes, so there's usually no need to parse the whole
+    payload. Names with non-ASCII characters are escaped by some serializers
+    and not others, so those are parsed, to count them under the same name.
+    """
+    if payload.startswith(_NAME_PREFIX):
+        end = payload.find(b'"', len(_NAME_PREFIX))
+        if end != -1 and payload.find(b"\\", len(_NAME_PREFIX), end) == -1:
+            return payload[len(_NAME_PREFIX) : end].decode("utf-8", "replace")
+    try:
+        return str(json.loads(payload)["name"])
+    except (ValueError, TypeError, KeyError):
+        return "<unknown>"
+
+
+class Histogram:
+    """Counts observations in buckets with fixed upper bounds.
+
+    :type buckets: sequence
+    :param buckets: The buckets' upper bounds, in increasing order. Larger
+                    observations go in an extra, unbounded bucket.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """The upper bound of the bucket holding the ``q`` quantile, infinite
+        if that is the unbounded bucket, and 0 without any observations.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, Any]:
+        buckets = {str(bound): count for bound, count in zip(self.buckets, self.counts)}
+        buckets["+Inf"] = self.counts[-1]
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+
+class Stats:
+    """Counts what happens to the events a :class:`pysensu_yelp.SensuClient`
+    sends, per check, and how long connecting and sending take.
+
+    Events are counted as ``sent`` once written to the Sensu client,
+    ``failed`` if writing them raised an exception, ``spooled`` if they were
+    written to the client's spool instead, ``dropped`` if a
+    :class:`pysensu_yelp.emitter.BackgroundEmitter` had no room for them and
+    ``suppressed`` if the client's suppressor held them back.
+
+    :type hook: callable
+    :param hook: If set, also called for every event counted and every
+                 latency and byte count recorded, e.g. to forward them to a
+                 metrics system. It is called on the sending path, so it
+                 should be quick, and any exception it raises is logged and
+                 ignored.
+    """
+
+    def __init__(self, hook: Optional[Hook] = None) -> None:
+        self.hook = hook
+        self.checks: Dict[str, Dict[str, int]] = {}
+        self.bytes_written = 0
+        self.connect_latency = Histogram()
+        self.send_latency = Histogram()
+        self._lock = threading.Lock()
+        self._health_stop: Optional[threading.Event] = None
+        self._health_seen: Dict[str, int] = {}
+        _fork_aware.add(self)
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    def _call_hook(self, metric: str, name: Optional[str], value: float) -> None:
+        if self.hook is not None:
+            try:
+                self.hook(metric, name, value)
+            except Exception:
+                log.exception("Stats hook failed")
+
+    def count(self, outcome: str, name: str, number: int = 1) -> None:
+        """Count ``number`` events of the check ``name`` as ``outcome``, one
+        of :data:`OUTCOMES`.
+        """
+        with self._lock:
+            counters = self.checks.get(name)
+            if counters is None:
+                counters = self.checks[name] = dict.fromkeys(OUTCOMES, 0)
+            counters[outcome] += number
+        for _ in range(number):
+            self._call_hook(outcome, name, 1)
+
+    def count_payloads(self, outcome: str, payloads: List[bytes]) -> None:
+        for payload in payloads:
+            self.count(outcome, payload_name(payload))
+
+    def record_connect(self, seconds: float) -> None:
+        with self._lock:
+            self.connect_latency.observe(seconds)
+        self._call_hook("connect_latency", None, seconds)
+
+    def record_send(
+        self,
+        send: Callable[[List[bytes]], None],
+        payloads: List[bytes],
+        spooling: bool = False,
+    ) -> None:
+        """Call ``send(payloads)``, recording how long it took and what
+        became of the payloads.
+
+        :type spooling: bool
+        :param spooling: Whether the caller spools the payloads when sending
+                         them raises ``OSError``, in which case they are
+                         counted as spooled by the caller rather than failed.
+        """
+        start = time.perf_counter()
+        try:
+            send(payloads)
+        except OSError:
+            if not spooling:
+                self.count_payloads("failed", payloads)
+            raise
+        except BaseException:
+            self.count_payloads("failed", payloads)
+            raise
+        seconds = time.perf_counter() - start
+        written = sum(map(len, payloads))
+        with self._lock:
+            self.send_latency.observe(seconds)
+            self.bytes_written += written
+        self._call_hook("send_latency", None, seconds)
+        self._call_hook("bytes_written", None, written)
+        self.count_payloads("sent", payloads)
+
+    def totals(self) -> Dict[str, int]:
+        """The counters of :data:`OUTCOMES`, summed over all checks."""
+        with self._lock:
+            return {
+                outcome: sum(counters[outcome] for counters in self.checks.values())
+                for outcome in OUTCOMES
+            }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """A JSON-serializable copy of all the statistics."""
+        with self._lock:
+            checks = {name: dict(counters) for name, counters in self.checks.items()}
+            return {
+                "checks": checks,
+                "totals": {
+                    outcome: sum(counters[outcome] for counters in checks.values())
+                    for outcome in OUTCOMES
+                },
+                "bytes_written": self.bytes_written,
+                "connect_latency": self.connect_latency.snapshot(),
+                "send_latency": self.send_latency.snapshot(),
+            }
+
+    def health(self) -> Tuple[Status, str]:
+        """The status and output of a self-health check covering the events
+        since the previous call: WARNING if any of them failed or were
+        dropped, OK otherwise.
+        """
+        totals = self.totals()
+        since = {
+            outcome: totals[outcome] - self._health_seen.get(outcome, 0)
+            for outcome in OUTCOMES
+        }
+        self._health_seen = totals
+        status = Status.WARNING if since["failed"] or since["dropped"] else Status.OK
+        with self._lock:
+            send_p99 = self.send_latency.quantile(0.99)
+            connect_p99 = self.connect_latency.quantile(0.99)
+        output = (
+            "{}: {} events sent, {} failed, {} dropped, {} spooled, {} suppressed "
+            "since the last report; p99 send latency <= {:g}ms, connect <= {:g}ms"
+        ).format(
+            status.name,
+            since["sent"],
+            since["failed"],
+            since["dropped"],
+            since["spooled"],
+            since["suppressed"],
+            send_p99 * 1000,
+            connect_p99 * 1000,
+        )
+        return status, output
+
+    def start_health_check(
+        self,
+        client: SensuClient,
+        name: str,
+        runbook: str,
+        team: str,
+        interval: float = 60.0,
+        **kwargs: Any,
+    ) -> None:
+        """Send :meth:`health` as a check through ``client`` every
+        ``interval`` seconds, from a background thread.
+
+        The other keyword arguments are passed on to
+        :class:`pysensu_yelp.CheckTemplate`. Give the check a ``ttl``, so that
+        Sensu notices if the reports stop arriving altogether.
+        """
+        self.stop_health_check()
+        check = CheckTemplate(
+            name, runbook, team, check_every=f"{max(1, int(interval))}s", **kwargs
+        )
+        stop = self._health_stop = threading.Event()
+
+        def run() -> None:
+            while not stop.wait(interval):
+                try:
+                    check.emit(*self.health(), client=client)
+                except Exception:
+                    log.exception("Failed to send %s", name)
+
+        threading.Thread(target=run, name="pysensu-yelp-health", daemon=True).start()
+
+    def stop_health_check(self) -> None:
+        if self._health_stop is not None:
+            self._health_stop.set()
+            self._health_stop = None
@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+from pysensu_yelp import _fork_aware
+
+_Key = Tuple[Optional[str], str]
+
+
+class _CheckState:
+    __slots__ = ("status", "output", "sent_at", "suppressed")
+
+    def __init__(self, status: int, output: str, sent_at: float) -> None:
+        self.status = status
+        self.output = output
+        self.sent_at = sent_at
+        self.suppressed = 0
+
+
+class Suppressor:
+    """Decides which events are worth sending, so that code calling
+    ``send_event`` in a tight loop doesn't flood the monitoring
+    infrastructure.
+
+    Events are tracked per (source, name). An event is always sent when its
+    status or output differ from the last one sent for that check. Identical
+    repeats are only sent once every ``interval`` seconds, and at least every
+    half ``ttl`` so that they never cause a staleness alert.
+
+    ``interval`` defaults to each check's own ``check_every``: Sensu's
+    ``alert_after`` math counts on one event per ``check_every``, so repeats
+    can't be sent any less often than that without delaying alerts, and any
+    more often is wasted.
+
+    To use it, set it as the ``suppressor`` of a :class:`pysensu_yelp.SensuClient`::
+
+        pysensu_yelp.SensuClient(suppressor=Suppressor())
+
+    :type interval: float
+    :param interval: Minimum number of seconds between identical events for
+                     the same check. Defaults to the check's ``check_every``.
+
+    :type max_checks: int
+    :param max_checks: How many checks to remember. When more distinct checks
+                       are seen the least recently sent ones are forgotten,
+                       and their next event is always sent.
+    """
+
+    def __init__(
+        self, interval: Optional[float] = None, max_checks: int = 10000
+    ) -> None:
+        if max_checks < 1:
+            raise ValueError("max_checks must be at least 1")
+        self.interval = interval
+        self.max_checks = max_checks
+        # Total number of events sent and suppressed
+        self.sent = 0
+        self.suppressed = 0
+        self._checks: "OrderedDict[_Key, _CheckState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._clock = time.monotonic
+        _fork_aware.add(self)
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    def _interval(self, result_dict: Dict[str, Any]) -> float:
+        interval = self.interval
+        if interval is None:
+            interval = result_dict.get("interval") or 0
+        ttl = result_dict.get("ttl")
+        if ttl is not None:
+            interval = min(interval, ttl / 2)
+        return interval
+
+    def would_send(self, result_dict: Dict[str, Any]) -> bool:
+        """Decide whether an event (as built by :func:`pysensu_yelp.build_event`)
+        should be sent. Events held back are counted as suppressed. Those that
+        should be sent only count once :meth:`record_sent` says they were, so
+        that a retry after a failed send isn't suppressed.
+        """
+        key = (result_dict.get("source"), result_dict["name"])
+        now = self._clock()
+        with self._lock:
+            state = self._checks.get(key)
+            if (
+                state is not None
+                and state.status == result_dict["status"]
+                and state.output == result_dict["output"]
+                and now - state.sent_at < self._interval(result_dict)
+            ):
+                state.suppressed += 1
+                self.suppressed += 1
+                return False
+            return True
+
+    def record_sent(self, result_dict: Dict[str, Any]) -> None:
+        """Record that an event was sent, so that identical repeats of it are
+        suppressed from now on.
+        """
+        key = (result_dict.get("source"), result_dict["name"])
+        status = result_dict["status"]
+        output = result_dict["output"]
+        now = self._clock()
+        with self._lock:
+            state = self._checks.get(key)
+            if state is None:
+                self._checks[key] = _CheckState(status, output, now)
+                if len(self._checks) > self.max_checks:
+                    self._checks.popitem(last=False)
+            else:
+                state.status = status
+                state.output = output
+                state.sent_at = now
+                state.suppressed = 0
+                self._checks.move_to_end(key)
+            self.sent += 1
+
+    def should_send(self, result_dict: Dict[str, Any]) -> bool:
+        """Decide whether an event should be sent, and if so record it as
+        sent right away. See :meth:`would_send`.
+        """
+        if not self.would_send(result_dict):
+            return False
+        self.record_sent(result_dict)
+        return True
+
+    def suppressed_count(self, name: str, source: Optional[str] = None) -> int:
+        """How many events have been suppressed for a check since the last
+        one that was sent.
+        """
+        with self._lock:
+            state = self._checks.get((source, name))
+            return 0 if state is None else state.suppressed
@@ -0,0 +1,283 @@
+"""The command wrapper: runs a Nagios plugin and reports its status and
+output to Sensu. Run it with ``python -m pysensu_yelp`` or the
+``pysensu-yelp`` console script::
+
+    pysensu-yelp '{"name": "disk_space", "runbook": "y/disk", "team": "ops"}' \\
+        /usr/lib/nagios/plugins/check_disk -w 10%
+
+This lives apart from the rest of the library so that importing
+:mod:`pysensu_yelp` doesn't load argparse and subprocess. That doesn't make
+the wrapper itself start any faster: the rest of the library has grown by
+about as much as it saves, and ``benchmarks/startup.py`` shows
+``import pysensu_yelp`` taking about as long as in 1.0.3, and
+``import pysensu_yelp.wrapper`` a few milliseconds longer.
+"""
+
+import argparse
+import codecs
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import IO
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+
+import pysensu_yelp
+from pysensu_yelp import build_event
+from pysensu_yelp import parse_transport
+from pysensu_yelp import SensuClient
+from pysensu_yelp import Status
+
+# Default cap on how much of a command's output do_command_wrapper keeps
+DEFAULT_MAX_OUTPUT_BYTES = 64 * 1024
+
+# Replaces the middle of outputs too large to keep in full
+OUTPUT_OMITTED_MARKER = "\n[... {} bytes omitted ...]\n"
+
+# How much of a command's output is read at a time
+_READ_SIZE = 64 * 1024
+
+
+def read_output(stream: IO[bytes], max_bytes: int = DEFAULT_MAX_OUTPUT_BYTES) -> str:
+    """Read a stream until EOF, keeping only its first and last
+    ``max_bytes / 2`` bytes, and decode them as UTF-8.
+
+    The first line of a check's output matters most, while the last ones
+    often explain what went wrong, so when the output is too long the middle
+    is dropped and replaced with a note saying how much was left out. No more
+    than about ``max_bytes`` are held in memory, however much is read.
+    Invalid UTF-8 is replaced with U+FFFD.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    head: List[str] = []
+    head_left = max_bytes // 2
+    tail = bytearray()
+    tail_size = max_bytes - head_left
+    omitted = 0
+    while True:
+        chunk = stream.read(_READ_SIZE)
+        if not chunk:
+            break
+        if head_left:
+            taken = chunk[:head_left]
+            head.append(decoder.decode(taken))
+            head_left -= len(taken)
+            chunk = chunk[len(taken) :]
+        tail += chunk
+        excess = len(tail) - tail_size
+        if excess > 0:
+            del tail[:excess]
+            omitted += excess
+    if not omitted:
+        # Nothing was dropped, the tail just carries on from the head
+        head.append(decoder.decode(bytes(tail), final=True))
+        return "".join(head)
+    head.append(decoder.decode(b"", final=True))
+    # The tail may start in the middle of a character, skip the rest of it
+    start = 0
+    while start < min(3, len(tail)) and 0x80 <= tail[start] < 0xC0:
+        start += 1
+    return (
+        "".join(head)
+        + OUTPUT_OMITTED_MARKER.format(omitted + start)
+        + tail[start:].decode("utf-8", errors="replace")
+    )
+
+
+class CommandResult(NamedTuple):
+    """What :func:`run_command` found out about a command's run."""
+
+    # Exit code, or minus the number of the signal that killed the command
+    returncode: int
+    output: str
+    timed_out: bool
+    # Wall clock and CPU (user + system) seconds
+    duration: float
+    cpu_time: float
+    # Peak resident set size, in kilobytes
+    max_rss_kb: int
+
+
+def run_command(
+    command: List[str],
+    timeout: Optional[float] = None,
+    max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES,
+) -> CommandResult:
+    """Run a command, capturing its output (see :func:`read_output`) and
+    resource usage.
+
+    The command runs in its own process group. If it is still running after
+    ``timeout`` seconds, the whole group is killed, so that anything the
+    command started goes away with it.
+    """
+    start = time.monotonic()
+    p = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        start_new_session=True,
+    )
+    lock = threading.Lock()
+    reaped = False
+    timed_out = False
+
+    def kill() -> None:
+        nonlocal timed_out
+        with lock:
+            # Once reaped, the pid may belong to somebody else
+            if not reaped:
+                timed_out = True
+                try:
+                    os.killpg(p.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+
+    timer = threading.Timer(timeout, kill) if timeout is not None else None
+    try:
+        if timer is not None:
+            timer.daemon = True
+            timer.start()
+        assert p.stdout is not None
+        with p.stdout:
+            output = read_output(p.stdout, max_output_bytes)
+        # Unlike Popen.wait, wait4 tells us what resources the command used
+        _, wait_status, rusage = os.wait4(p.pid, 0)
+        with lock:
+            reaped = True
+    finally:
+        if timer is not None:
+            timer.cancel()
+    duration = time.monotonic() - start
+    if os.WIFSIGNALED(wait_status):
+        p.returncode = -os.WTERMSIG(wait_status)
+    else:
+        p.returncode = os.WEXITSTATUS(wait_status)
+    max_rss_kb = rusage.ru_maxrss
+    if sys.platform == "darwin":
+        # Which reports it in bytes
+        max_rss_kb //= 1024
+    return CommandResult(
+        returncode=p.returncode,
+        output=output,
+        timed_out=timed_out,
+        duration=duration,
+        cpu_time=rusage.ru_utime + rusage.ru_stime,
+        max_rss_kb=max_rss_kb,
+    )
+
+
+def nagios_status(returncode: int) -> Status:
+    """Exit codes 0 to 3 are Nagios statuses, anything else (including being
+    killed by a signal) is UNKNOWN.
+    """
+    if 0 <= returncode <= Status.UNKNOWN:
+        return Status(returncode)
+    return Status.UNKNOWN
+
+
+def max_warning_status(returncode: int) -> Status:
+    """Anything but a successful exit is a WARNING, never worse."""
+    return Status.OK if returncode == 0 else Status.WARNING
+
+
+# How do_command_wrapper turns a command's exit code into a status
+STATUS_POLICIES: Dict[str, Callable[[int], Status]] = {
+    "nagios": nagios_status,
+    "max-warning": max_warning_status,
+}
+
+
+def report_command(
+    sensu_dict: Dict[str, Any],
+    result: CommandResult,
+    status_policy: str = "nagios",
+    client: Optional[SensuClient] = None,
+) -> None:
+    """Send the event for a command's run.
+
+    :type sensu_dict: dict
+    :param sensu_dict: Keyword arguments to :func:`send_event`. Any
+                       ``status`` and ``output`` in it are replaced by the
+                       command's.
+    :type result: CommandResult
+    :param result: What :func:`run_command` returned.
+    :type status_policy: str
+    :param status_policy: The name of the :data:`STATUS_POLICIES` entry that
+                          turns the exit code into a status. A command that
+                          timed out is always UNKNOWN.
+    :type client: SensuClient
+    :param client: The client to send with. Defaults to the default client.
+    """
+    if result.timed_out:
+        status = Status.UNKNOWN
+        output = f"UNKNOWN: Timed out after {result.duration:.1f}s\n{result.output}"
+    else:
+        status = STATUS_POLICIES[status_policy](result.returncode)
+        output = result.output
+
+    sensu_dict = dict(sensu_dict)
+    sensu_host = sensu_dict.pop("sensu_host", None)
+    sensu_port = sensu_dict.pop("sensu_port", None)
+    transport = sensu_dict.pop("transport", None)
+    sensu_dict.pop("status", None)
+    sensu_dict.pop("output", None)
+    if transport is not None:
+        transport = parse_transport(transport)
+    result_dict = build_event(status=status, output=output, **sensu_dict)
+    result_dict["duration"] = round(result.duration, 3)
+    result_dict["cpu_time"] = round(result.cpu_time, 3)
+    result_dict["max_rss_kb"] = result.max_rss_kb
+    (client or pysensu_yelp._default_client).send_result(
+        result_dict, sensu_host=sensu_host, sensu_port=sensu_port, transport=transport
+    )
+
+
+def do_command_wrapper() -> int:
+    parser = argparse.ArgumentParser(
+        description="Execute a nagios plugin and report the results to a local Sensu agent"
+    )
+    parser.add_argument(
+        "--max-output-bytes",
+        type=int,
+        default=DEFAULT_MAX_OUTPUT_BYTES,
+        help="Keep at most this many bytes of the command's output, from its "
+        "beginning and end. Defaults to %(default)s.",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="Kill the command (and anything it started) if it runs for longer "
+        "than this many seconds, and report UNKNOWN.",
+    )
+    parser.add_argument(
+        "--status-policy",
+        choices=sorted(STATUS_POLICIES),
+        default="nagios",
+        help="How to turn the command's exit code into a status. 'nagios' "
+        "passes 0-3 through and reports anything else as UNKNOWN, 'max-warning' "
+        "reports any failure as WARNING. Defaults to %(default)s.",
+    )
+    parser.add_argument("sensu_dict")
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    sensu_dict = json.loads(args.sensu_dict)
+
+    result = run_command(
+        args.command, timeout=args.timeout, max_output_bytes=args.max_output_bytes
+    )
+    report_command(sensu_dict, result, args.status_policy)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(do_command_wrapper())
@@ -13,11 +13,20 @@ setup(
     packages=find_packages(exclude=['tests']),
     classifiers=[
          'Programming Language :: Python :: 3',
-         'Programming Language :: Python :: 3.6',
          'Programming Language :: Python :: 3.7',
          'Programming Language :: Python :: 3.8',
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.7',
+    extras_require={
+        'orjson': ['orjson'],
+    },
+    entry_points={
+        'console_scripts': [
+            'pysensu-yelp = pysensu_yelp.wrapper:do_command_wrapper',
+            'pysensu-yelp-runner = pysensu_yelp.runner:main',
+            'pysensu-yelp-loadgen = pysensu_yelp.loadgen:main',
+        ],
+    },
     package_data={
         'pysensu_yelp': ['py.typed'],
     },
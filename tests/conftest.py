@@ -0,0 +1,44 @@
+import socket
+
+import pytest
+
+from pysensu_yelp.sinks import MemorySink
+
+
+def make_event(name="a_check", status=0, **kwargs):
+    """The arguments of a valid event, for send_event."""
+    return dict(
+        dict(
+            name=name,
+            runbook="a_runbook",
+            status=status,
+            output="output",
+            team="a_team",
+        ),
+        **kwargs,
+    )
+
+
+class FakeClock:
+    """Stands in for time.monotonic, with a time set by the test."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def closed_port():
+    """A local TCP port that nothing listens on."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+@pytest.fixture
+def sink():
+    return MemorySink()
@@ -0,0 +1,224 @@
+import asyncio
+import json
+import os
+import socket
+import tempfile
+
+import pytest
+from conftest import make_event
+
+import pysensu_yelp
+from pysensu_yelp import aio
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class FakeSensu:
+    """A local asyncio TCP server, or Unix one listening on ``path``, standing
+    in for the Sensu client.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.events = []
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.handle_delay = 0
+        self.writers = []
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        self.writers.append(writer)
+        async for line in reader:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(self.handle_delay)
+            self.events.append(json.loads(line))
+            self.in_flight -= 1
+            writer.write(b"ok")
+        writer.close()
+
+    async def __aenter__(self):
+        if self.path is not None:
+            self.server = await asyncio.start_unix_server(self.handle, self.path)
+            return self
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.host, self.port = self.server.sockets[0].getsockname()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def wait_for_events(self, count):
+        while len(self.events) < count:
+            await asyncio.sleep(0.001)
+
+
+def test_send_event_reuses_connection():
+    async def test():
+        async with FakeSensu() as sensu:
+            async with aio.AsyncSensuClient(sensu.host, sensu.port) as client:
+                for status in range(3):
+                    await client.send_event(**make_event(status=status))
+                await sensu.wait_for_events(3)
+        assert [event["status"] for event in sensu.events] == [0, 1, 2]
+        assert sensu.connections == 1
+
+    run(test())
+
+
+def test_async_send_event():
+    async def test():
+        async with FakeSensu() as sensu:
+            await aio.async_send_event(
+                **make_event(), sensu_host=sensu.host, sensu_port=sensu.port
+            )
+            await sensu.wait_for_events(1)
+            await aio.get_default_client().close()
+        assert sensu.events[0]["name"] == "a_check"
+
+    run(test())
+
+
+def test_concurrency_limit():
+    async def test():
+        async with FakeSensu() as sensu:
+            sensu.handle_delay = 0.01
+            client = aio.AsyncSensuClient(sensu.host, sensu.port, max_connections=2)
+            await asyncio.gather(
+                *(
+                    client.send_event(**make_event(status=status))
+                    for status in range(10)
+                )
+            )
+            await sensu.wait_for_events(10)
+            await client.close()
+        assert sensu.connections == 2
+        assert sensu.max_in_flight == 2
+
+    run(test())
+
+
+def test_reconnects_after_server_closes_connection():
+    async def test():
+        async with FakeSensu() as sensu:
+            client = aio.AsyncSensuClient(sensu.host, sensu.port)
+            await client.send_event(**make_event(status=0))
+            await sensu.wait_for_events(1)
+            for writer in sensu.writers:
+                writer.transport.abort()
+            await asyncio.sleep(0.01)
+            await client.send_event(**make_event(status=1))
+            await sensu.wait_for_events(2)
+            await client.close()
+        assert [event["status"] for event in sensu.events] == [0, 1]
+        assert sensu.connections == 2
+
+    run(test())
+
+
+def test_send_events():
+    async def test():
+        async with FakeSensu() as sensu:
+            client = aio.AsyncSensuClient(sensu.host, sensu.port)
+            failures = await client.send_events(
+                [
+                    make_event(status=0),
+                    dict(make_event(status=1), name="bad name!"),
+                    make_event(status=2),
+                ]
+            )
+            await sensu.wait_for_events(2)
+            await client.close()
+        assert [index for index, _ in failures] == [1]
+        assert [event["status"] for event in sensu.events] == [0, 2]
+
+    run(test())
+
+
+def test_invalid_event_raises():
+    async def test():
+        client = aio.AsyncSensuClient()
+        with pytest.raises(ValueError):
+            await client.send_event(**dict(make_event(), team=""))
+
+    run(test())
+
+
+def test_send_event_over_udp():
+    class Protocol(asyncio.DatagramProtocol):
+        def __init__(self):
+            self.datagrams = []
+
+        def datagram_received(self, data, addr):
+            self.datagrams.append(data)
+
+    async def test():
+        loop = asyncio.get_event_loop()
+        server, protocol = await loop.create_datagram_endpoint(
+            Protocol, local_addr=("127.0.0.1", 0)
+        )
+        host, port = server.get_extra_info("sockname")
+        client = aio.AsyncSensuClient(
+            host, port, transport=pysensu_yelp.Transport.UDP, max_datagram_size=512
+        )
+        await client.send_event(**make_event(status=0))
+        await client.send_event(**dict(make_event(status=1), output="x" * 1000))
+        while len(protocol.datagrams) < 2:
+            await asyncio.sleep(0.001)
+        await client.close()
+        server.close()
+        events = [json.loads(datagram) for datagram in protocol.datagrams]
+        assert [event["status"] for event in events] == [0, 1]
+        assert all(len(datagram) <= 512 for datagram in protocol.datagrams)
+
+    run(test())
+
+
+@pytest.fixture
+def socket_path():
+    # tmp_path can be longer than a Unix socket's path may be
+    with tempfile.TemporaryDirectory() as directory:
+        yield os.path.join(directory, "sensu.sock")
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+def test_send_event_over_unix_socket(socket_path):
+    async def test():
+        async with FakeSensu(socket_path) as sensu:
+            async with aio.AsyncSensuClient(sensu_socket_path=socket_path) as client:
+                for status in range(3):
+                    await client.send_event(**make_event(status=status))
+                await sensu.wait_for_events(3)
+        assert [event["status"] for event in sensu.events] == [0, 1, 2]
+        assert sensu.connections == 1
+
+    run(test())
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+def test_send_event_over_unix_datagram_socket(socket_path):
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    server.bind(socket_path)
+    server.settimeout(5)
+
+    async def test():
+        client = aio.AsyncSensuClient(
+            "unix://" + socket_path, transport=pysensu_yelp.Transport.UDP
+        )
+        await client.send_event(**make_event(status=2))
+        await client.close()
+
+    try:
+        run(test())
+        assert json.loads(server.recv(65536))["status"] == 2
+    finally:
+        server.close()
@@ -0,0 +1,148 @@
+import socket
+import time
+from unittest import mock
+
+import pytest
+from conftest import FakeClock
+from conftest import make_event
+
+import pysensu_yelp
+from pysensu_yelp.breaker import CircuitBreaker
+from pysensu_yelp.breaker import CircuitOpenError
+from pysensu_yelp.spool import Spool
+
+
+def make_breaker(**kwargs):
+    breaker = CircuitBreaker(**kwargs)
+    breaker._clock = FakeClock()
+    return breaker
+
+
+def fail(payloads):
+    raise ConnectionRefusedError
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        breaker = make_breaker(failure_threshold=3)
+        for _ in range(2):
+            with pytest.raises(ConnectionRefusedError):
+                breaker.call("a", fail, [b"x"])
+        assert breaker.state("a") == "closed"
+        breaker.call("a", mock.Mock(), [b"x"])
+        for _ in range(3):
+            with pytest.raises(ConnectionRefusedError):
+                breaker.call("a", fail, [b"x"])
+        assert breaker.state("a") == "open"
+
+        send = mock.Mock()
+        with pytest.raises(CircuitOpenError):
+            breaker.call("a", send, [b"x"])
+        send.assert_not_called()
+        assert breaker.rejected == 1
+        # Other destinations are unaffected
+        breaker.call("b", send, [b"x"])
+        send.assert_called_once_with([b"x"])
+
+    def test_probe_closes_circuit(self):
+        breaker = make_breaker(failure_threshold=1, cooldown=10)
+        with pytest.raises(ConnectionRefusedError):
+            breaker.call("a", fail, [b"x"])
+        breaker._clock.now = 10
+        assert breaker.state("a") == "half-open"
+        send = mock.Mock()
+        breaker.call("a", send, [b"x"])
+        send.assert_called_once_with([b"x"])
+        assert breaker.state("a") == "closed"
+
+    def test_failed_probe_reopens_circuit(self):
+        breaker = make_breaker(failure_threshold=2, cooldown=10)
+        for _ in range(2):
+            with pytest.raises(ConnectionRefusedError):
+                breaker.call("a", fail, [b"x"])
+        breaker._clock.now = 15
+        with pytest.raises(ConnectionRefusedError):
+            breaker.call("a", fail, [b"x"])
+        assert breaker.state("a") == "open"
+        breaker._clock.now = 24
+        with pytest.raises(CircuitOpenError):
+            breaker.call("a", mock.Mock(), [b"x"])
+        breaker._clock.now = 25
+        breaker.call("a", mock.Mock(), [b"x"])
+        assert breaker.state("a") == "closed"
+
+    def test_one_probe_at_a_time(self):
+        breaker = make_breaker(failure_threshold=1, cooldown=10)
+        with pytest.raises(ConnectionRefusedError):
+            breaker.call("a", fail, [b"x"])
+        breaker._clock.now = 10
+
+        def probe(payloads):
+            with pytest.raises(CircuitOpenError):
+                breaker.call("a", mock.Mock(), payloads)
+
+        breaker.call("a", probe, [b"x"])
+        assert breaker.state("a") == "closed"
+
+    def test_other_errors_release_the_probe(self):
+        breaker = make_breaker(failure_threshold=1, cooldown=10)
+        with pytest.raises(ConnectionRefusedError):
+            breaker.call("a", fail, [b"x"])
+        breaker._clock.now = 10
+        with pytest.raises(ValueError):
+            breaker.call("a", mock.Mock(side_effect=ValueError), [b"x"])
+        assert breaker.state("a") == "half-open"
+        breaker.call("a", mock.Mock(), [b"x"])
+        assert breaker.state("a") == "closed"
+
+    def test_failure_threshold_must_be_positive(self):
+        with pytest.raises(ValueError):
+            CircuitBreaker(failure_threshold=0)
+
+
+class TestSensuClient:
+    def test_fails_fast(self, closed_port):
+        client = pysensu_yelp.SensuClient(
+            "127.0.0.1", closed_port, breaker=CircuitBreaker(failure_threshold=2)
+        )
+        for _ in range(2):
+            with pytest.raises(ConnectionRefusedError):
+                client.send_event(**make_event())
+        with mock.patch("socket.socket") as skt_patch:
+            with pytest.raises(CircuitOpenError):
+                client.send_event(**make_event())
+            skt_patch.assert_not_called()
+
+    def test_spools_while_open(self, closed_port, tmp_path):
+        breaker = CircuitBreaker(failure_threshold=1)
+        spool = Spool(str(tmp_path / "spool"))
+        client = pysensu_yelp.SensuClient(
+            "127.0.0.1", closed_port, spool=spool, breaker=breaker
+        )
+        client.send_event(**make_event("a"))
+        client.send_event(**make_event("b"))
+        assert breaker.rejected == 1
+        assert spool.pending
+
+    def test_connect_timeout(self):
+        magic_skt = mock.MagicMock()
+        with mock.patch("socket.socket", return_value=magic_skt):
+            client = pysensu_yelp.SensuClient(connect_timeout=0.5, send_timeout=None)
+            client.send_payload(b"{}\n")
+        assert magic_skt.settimeout.call_args_list == [mock.call(0.5), mock.call(None)]
+        magic_skt.setsockopt.assert_not_called()
+
+    def test_send_timeout(self):
+        # Nothing is ever read from the connection, so the writes back up
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen(1)
+        client = pysensu_yelp.SensuClient(*server.getsockname(), send_timeout=0.1)
+        try:
+            start = time.monotonic()
+            with pytest.raises(BlockingIOError):
+                client.send_payload(b"x" * 64 * 1024 * 1024)
+            assert time.monotonic() - start < 30
+        finally:
+            client.close()
+            server.close()
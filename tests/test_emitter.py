@@ -0,0 +1,157 @@
+import threading
+from unittest import mock
+
+import pytest
+
+import pysensu_yelp
+from pysensu_yelp.emitter import BackgroundEmitter
+from pysensu_yelp.emitter import Overflow
+from pysensu_yelp.sinks import FileSink
+
+
+class FakeSensu:
+    """Stands in for the connection to the Sensu client, recording what the
+    emitter sends and optionally holding the worker thread up until released.
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.delivering = threading.Event()
+        self.released = threading.Event()
+        self.released.set()
+
+    def write(self, client, payloads, destination):
+        self.delivering.set()
+        self.released.wait()
+        self.sent.append(b"".join(payloads))
+
+
+@pytest.fixture
+def sensu():
+    fake = FakeSensu()
+    with mock.patch.object(
+        pysensu_yelp.SensuClient, "_write", autospec=True, side_effect=fake.write
+    ):
+        yield fake
+        fake.released.set()
+
+
+def send_test_event(client):
+    client.send_event(
+        name="a_check", runbook="a_runbook", status=0, output="ok", team="a_team"
+    )
+
+
+def test_send_event_in_background(sensu):
+    emitter = BackgroundEmitter()
+    send_test_event(emitter)
+    assert emitter.flush(timeout=5)
+    assert len(sensu.sent) == 1
+    emitter.close()
+
+
+def test_queued_events_are_sent_together(sensu):
+    sensu.released.clear()
+    emitter = BackgroundEmitter()
+    emitter.send_payload(b"0\n")
+    assert sensu.delivering.wait(timeout=5)
+    for payload in (b"1\n", b"2\n"):
+        emitter.send_payload(payload)
+    sensu.released.set()
+    assert emitter.flush(timeout=5)
+    assert sensu.sent == [b"0\n", b"1\n2\n"]
+    emitter.close()
+
+
+def test_set_default_client(sensu):
+    emitter = BackgroundEmitter()
+    previous = pysensu_yelp.set_default_client(emitter)
+    try:
+        send_test_event(pysensu_yelp)
+        assert emitter.flush(timeout=5)
+        assert len(sensu.sent) == 1
+    finally:
+        pysensu_yelp.set_default_client(previous)
+        emitter.close()
+
+
+@pytest.mark.parametrize(
+    "overflow,expected",
+    [
+        (Overflow.DROP_OLDEST, [b"0", b"23"]),
+        (Overflow.DROP_NEWEST, [b"0", b"12"]),
+        (Overflow.BLOCK, [b"0", b"12"]),
+    ],
+)
+def test_overflow(sensu, overflow, expected):
+    sensu.released.clear()
+    emitter = BackgroundEmitter(max_queue_size=2, overflow=overflow, block_timeout=0.01)
+    emitter.send_payload(b"0")
+    assert sensu.delivering.wait(timeout=5)
+    for payload in (b"1", b"2", b"3"):
+        emitter.send_payload(payload)
+    assert emitter.dropped == 1
+    sensu.released.set()
+    emitter.close(timeout=5)
+    assert sensu.sent == expected
+
+
+def test_block_waits_for_room(sensu):
+    sensu.released.clear()
+    emitter = BackgroundEmitter(max_queue_size=1, overflow=Overflow.BLOCK)
+    emitter.send_payload(b"0")
+    assert sensu.delivering.wait(timeout=5)
+    emitter.send_payload(b"1")
+    threading.Timer(0.05, sensu.released.set).start()
+    # Blocks until the worker has picked up b"1"
+    emitter.send_payload(b"2")
+    emitter.close(timeout=5)
+    assert emitter.dropped == 0
+    assert b"".join(sensu.sent) == b"012"
+
+
+def test_flush_timeout(sensu):
+    sensu.released.clear()
+    emitter = BackgroundEmitter()
+    emitter.send_payload(b"0")
+    assert not emitter.flush(timeout=0.01)
+    sensu.released.set()
+    assert emitter.flush(timeout=5)
+    emitter.close()
+
+
+def test_failed_delivery_is_counted(sensu):
+    emitter = BackgroundEmitter()
+    with mock.patch.object(
+        pysensu_yelp.SensuClient, "_write", side_effect=ConnectionRefusedError
+    ):
+        emitter.send_payload(b"0")
+        assert emitter.flush(timeout=5)
+    assert emitter.failed == 1
+    emitter.close()
+
+
+def test_send_after_close(sensu):
+    emitter = BackgroundEmitter()
+    emitter.close()
+    with pytest.raises(RuntimeError):
+        emitter.send_payload(b"0")
+
+
+def test_close_drains_queue(sensu):
+    emitter = BackgroundEmitter()
+    for payload in (b"0", b"1", b"2"):
+        emitter.send_payload(payload)
+    emitter.close(timeout=5)
+    assert b"".join(sensu.sent) == b"012"
+
+
+def test_failing_sink(tmp_path):
+    emitter = BackgroundEmitter(
+        transport=FileSink(str(tmp_path / "missing" / "events"))
+    )
+    for _ in range(2):
+        send_test_event(emitter)
+        assert emitter.flush(timeout=5)
+    assert emitter.failed == 2
+    emitter.close()
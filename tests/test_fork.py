@@ -0,0 +1,241 @@
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from collections import Counter
+
+import pytest
+from conftest import make_event
+
+import pysensu_yelp
+from pysensu_yelp.emitter import BackgroundEmitter
+from pysensu_yelp.handler import SensuHandler
+from pysensu_yelp.heartbeat import HeartbeatScheduler
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "register_at_fork"), reason="needs os.register_at_fork"
+)
+
+WORKERS = 4
+EVENTS_PER_WORKER = 200
+
+
+class Listener:
+    """A TCP server keeping what it reads from each connection apart."""
+
+    def __init__(self):
+        self.streams = []
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen(64)
+        self.host, self.port = self._server.getsockname()
+        self._threads = []
+        self._accepting = threading.Thread(target=self._accept, daemon=True)
+        self._accepting.start()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self._server.accept()
+            except OSError:
+                return
+            stream = bytearray()
+            self.streams.append(stream)
+            thread = threading.Thread(target=self._read, args=(sock, stream))
+            thread.start()
+            self._threads.append(thread)
+
+    def _read(self, sock, stream):
+        with sock:
+            while True:
+                data = sock.recv(65536)
+                if not data:
+                    return
+                stream += data
+
+    def wait_for_connections(self, count, timeout=10):
+        """Wait for ``count`` connections to be accepted, so that closing the
+        server doesn't drop any still waiting in its backlog.
+        """
+        deadline = time.monotonic() + timeout
+        while len(self.streams) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self):
+        try:
+            # Wakes up the accepting thread
+            self._server.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._server.close()
+        self._accepting.join(10)
+        for thread in self._threads:
+            thread.join(10)
+
+    def events(self):
+        events = []
+        for stream in self.streams:
+            assert stream.endswith(b"\n")
+            events.extend(json.loads(line) for line in stream.splitlines())
+        return events
+
+
+@pytest.fixture
+def listener():
+    listener = Listener()
+    yield listener
+    listener.close()
+
+
+def fork(target):
+    """Run ``target`` in a child process, returning its pid."""
+    pid = os.fork()
+    if pid == 0:
+        try:
+            target()
+            code = 0
+        except BaseException:
+            code = 1
+        os._exit(code)
+    return pid
+
+
+def wait(pids, timeout=30):
+    """Wait for the children to succeed, killing them if they hang."""
+    deadline = time.monotonic() + timeout
+    for i, pid in enumerate(pids):
+        while True:
+            waited, status = os.waitpid(pid, os.WNOHANG)
+            if waited:
+                break
+            if time.monotonic() > deadline:
+                for hung in pids[i:]:
+                    os.kill(hung, signal.SIGKILL)
+                    os.waitpid(hung, 0)
+                pytest.fail("Child process hung")
+            time.sleep(0.01)
+        assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+
+def worker_event(worker, sequence):
+    return make_event(
+        f"worker_{worker}",
+        # Large enough for writes from different processes to interleave if
+        # they shared a socket
+        output=f"{sequence}:" + "x" * 4096,
+    )
+
+
+def test_workers_do_not_share_connections(listener):
+    client = pysensu_yelp.SensuClient(listener.host, listener.port)
+    # Open the connection before forking, so that the children inherit it
+    client.send_event(**worker_event("parent", 0))
+
+    def work(worker):
+        for sequence in range(EVENTS_PER_WORKER):
+            client.send_event(**worker_event(worker, sequence))
+        client.close()
+
+    # A lock held while forking must not be held in the child
+    with client._connection(client._destination(None, None, None)).lock:
+        pids = [fork(lambda: work(worker)) for worker in range(WORKERS)]
+    work("parent")
+    wait(pids)
+    listener.wait_for_connections(WORKERS + 1)
+    listener.close()
+
+    events = listener.events()
+    assert Counter(event["name"] for event in events) == dict(
+        {f"worker_{worker}": EVENTS_PER_WORKER for worker in range(WORKERS)},
+        worker_parent=EVENTS_PER_WORKER + 1,
+    )
+    for worker in range(WORKERS):
+        sequences = [
+            int(event["output"].split(":")[0])
+            for event in events
+            if event["name"] == f"worker_{worker}"
+        ]
+        assert sequences == list(range(EVENTS_PER_WORKER))
+    assert len(listener.streams) == WORKERS + 1
+
+
+def test_emitter_restarts_in_child(listener):
+    emitter = BackgroundEmitter(listener.host, listener.port)
+    emitter.send_event(**worker_event("parent", 0))
+    assert emitter.flush(5)
+
+    def work():
+        emitter.send_event(**worker_event("child", 0))
+        assert emitter.flush(5)
+        emitter.close()
+
+    wait([fork(work)])
+    emitter.close()
+    listener.wait_for_connections(2)
+    listener.close()
+
+    assert sorted(event["name"] for event in listener.events()) == [
+        "worker_child",
+        "worker_parent",
+    ]
+
+
+def test_logging_handler_restarts_in_child(listener):
+    logger = logging.getLogger("pysensu_yelp_tests.fork")
+    logger.propagate = False
+    handler = SensuHandler(
+        runbook="a_runbook",
+        team="a_team",
+        client=pysensu_yelp.SensuClient(listener.host, listener.port),
+    )
+    logger.addHandler(handler)
+    try:
+        logger.error("In the parent")
+        assert handler.flush()
+
+        def work():
+            logger.error("In the child")
+            assert handler.flush()
+            handler.close()
+
+        wait([fork(work)])
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+        handler.client.close()
+    listener.wait_for_connections(2)
+    listener.close()
+
+    assert sorted(event["output"] for event in listener.events()) == [
+        "In the child",
+        "In the parent",
+    ]
+
+
+def test_heartbeats_not_repeated_in_child(listener):
+    client = pysensu_yelp.SensuClient(listener.host, listener.port)
+    heartbeats = HeartbeatScheduler(client)
+    heartbeats.register("parent_check", "a_runbook", "a_team", interval=0.05)
+
+    def work():
+        with pytest.raises(KeyError):
+            heartbeats.report("parent_check", 2, "Reported by the child")
+        heartbeats.register("child_check", "a_runbook", "a_team", interval=0.05)
+        time.sleep(0.3)
+        heartbeats.close()
+        client.close()
+
+    wait([fork(work)])
+    heartbeats.close()
+    client.close()
+    listener.wait_for_connections(2)
+    listener.close()
+
+    names = [
+        {json.loads(line)["name"] for line in stream.splitlines()}
+        for stream in listener.streams
+    ]
+    assert sorted(names, key=sorted) == [{"child_check"}, {"parent_check"}]
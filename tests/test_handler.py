@@ -0,0 +1,234 @@
+import logging
+import threading
+import time
+
+import pytest
+
+import pysensu_yelp
+from pysensu_yelp.handler import level_to_status
+from pysensu_yelp.handler import SensuHandler
+from pysensu_yelp.sinks import Sink
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger("pysensu_yelp_tests.handler")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    yield logger
+    logger.setLevel(logging.NOTSET)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def add_handler(logger, sink, **kwargs):
+    handler = SensuHandler(
+        runbook="a_runbook",
+        team="a_team",
+        client=pysensu_yelp.SensuClient(transport=sink),
+        **kwargs,
+    )
+    logger.addHandler(handler)
+    return handler
+
+
+@pytest.mark.parametrize(
+    "level,status",
+    [
+        (logging.DEBUG, pysensu_yelp.Status.OK),
+        (logging.INFO, pysensu_yelp.Status.OK),
+        (logging.WARNING, pysensu_yelp.Status.WARNING),
+        (logging.ERROR, pysensu_yelp.Status.CRITICAL),
+        (logging.CRITICAL, pysensu_yelp.Status.CRITICAL),
+    ],
+)
+def test_level_to_status(level, status):
+    assert level_to_status(level) == status
+
+
+def test_sends_event(logger, sink):
+    handler = add_handler(logger, sink)
+    logger.error("Could not charge %s", "a_customer")
+    assert handler.flush()
+    [result] = sink.results()
+    assert result["name"] == "pysensu_yelp_tests.handler"
+    assert result["status"] == pysensu_yelp.Status.CRITICAL
+    assert result["output"] == "Could not charge a_customer"
+    assert result["team"] == "a_team"
+    assert result["runbook"] == "a_runbook"
+
+
+def test_level(logger, sink):
+    handler = add_handler(logger, sink)
+    logger.warning("Not that bad")
+    logger.removeHandler(handler)
+    handler.close()
+    assert sink.results() == []
+
+    handler = add_handler(logger, sink, level=logging.INFO)
+    logger.warning("Not that bad")
+    logger.info("All better")
+    assert handler.flush()
+    assert [r["status"] for r in sink.results()] == [1, 0]
+
+
+def test_traceback_in_output(logger, sink):
+    handler = add_handler(logger, sink)
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception("Oops")
+    assert handler.flush()
+    [result] = sink.results()
+    assert result["output"].startswith("Oops\nTraceback")
+    assert "ZeroDivisionError" in result["output"]
+
+
+def test_check_name(sink):
+    logger = logging.getLogger("pysensu_yelp_tests.a handler!")
+    logger.propagate = False
+    handler = add_handler(logger, sink)
+    try:
+        logger.error("Oops")
+        assert handler.flush()
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+    assert sink.results()[0]["name"] == "pysensu_yelp_tests.a_handler_"
+
+
+def test_rolls_up_repeats(logger, sink):
+    handler = add_handler(logger, sink, window=0.2)
+    for i in range(100):
+        logger.error("Failed request %d", i)
+    assert handler.flush()
+    [first] = sink.results()
+    assert first["output"] == "Failed request 0"
+
+    time.sleep(0.3)
+    assert handler.flush()
+    [_, rollup] = sink.results()
+    assert rollup["status"] == pysensu_yelp.Status.CRITICAL
+    assert rollup["output"] == (
+        "Failed request 99\n\n(Logged 99 more times in the last 0.2s)"
+    )
+
+    # Once the repeats stop, the next one is sent right away again
+    time.sleep(0.3)
+    logger.error("Failed request %d", 100)
+    assert handler.flush()
+    assert sink.results()[-1]["output"] == "Failed request 100"
+    assert len(sink.results()) == 3
+
+
+def test_different_records_are_not_rolled_up(logger, sink):
+    handler = add_handler(logger, sink)
+    logger.error("One thing")
+    logger.error("Another thing")
+    logger.warning("One thing")
+    handler.setLevel(logging.WARNING)
+    logger.warning("One thing")
+    assert handler.flush()
+    assert [r["output"] for r in sink.results()] == [
+        "One thing",
+        "Another thing",
+        "One thing",
+    ]
+
+
+def test_status_change_ends_rollup(logger, sink):
+    handler = add_handler(logger, sink, level=logging.INFO, window=0.2)
+    logger.error("db down")
+    logger.error("db down")
+    logger.info("db back up")
+    assert handler.flush()
+    time.sleep(0.3)
+    assert handler.flush()
+    assert [(r["status"], r["output"]) for r in sink.results()] == [
+        (2, "db down"),
+        (2, "db down\n\n(Logged 1 more time in the last 0.2s)"),
+        (0, "db back up"),
+    ]
+
+
+def test_close_sends_rollups(logger, sink):
+    handler = add_handler(logger, sink)
+    for _ in range(3):
+        logger.error("Oops")
+    handler.close()
+    assert [r["output"] for r in sink.results()] == [
+        "Oops",
+        "Oops\n\n(Logged 2 more times in the last 60s)",
+    ]
+
+
+def test_max_pending(logger, sink):
+    handler = add_handler(logger, sink, max_pending=2)
+    for i in range(3):
+        logger.error(f"Error {i}")
+    assert handler.flush()
+    assert handler.dropped == 1
+    assert [r["output"] for r in sink.results()] == ["Error 0", "Error 1"]
+
+
+class BlockingSink(Sink):
+    def __init__(self):
+        self.released = threading.Event()
+        self.payloads = []
+
+    def send(self, payloads):
+        self.released.wait()
+        self.payloads.extend(payloads)
+
+
+def test_does_not_block(logger):
+    sink = BlockingSink()
+    handler = add_handler(logger, sink)
+    start = time.monotonic()
+    for i in range(10):
+        logger.error(f"Error {i}")
+    assert time.monotonic() - start < 1
+    assert not handler.flush(0.1)
+    sink.released.set()
+    assert handler.flush()
+    assert len(sink.payloads) == 10
+
+
+class LoggingSink(Sink):
+    def __init__(self, logger, fail):
+        self.logger = logger
+        self.fail = fail
+        self.payloads = []
+
+    def send(self, payloads):
+        self.logger.error("Sending")
+        if self.fail:
+            raise OSError("Sensu is down")
+        self.payloads.extend(payloads)
+
+
+def test_does_not_send_its_own_records(logger):
+    sink = LoggingSink(logger, fail=False)
+    handler = add_handler(logger, sink)
+    logger.error("Oops")
+    assert handler.flush()
+    handler.close()
+    assert len(sink.payloads) == 1
+
+
+def test_send_errors_are_handled(logger, monkeypatch):
+    errors = []
+    sink = LoggingSink(logger, fail=True)
+    handler = add_handler(logger, sink)
+    monkeypatch.setattr(handler, "handleError", errors.append)
+    logger.error("Oops")
+    assert handler.flush()
+    assert [record.getMessage() for record in errors] == ["Oops"]
+
+
+def test_bad_arguments():
+    with pytest.raises(ValueError):
+        SensuHandler(runbook="a_runbook", team="a_team", window=0)
+    with pytest.raises(ValueError):
+        SensuHandler(runbook="a_runbook", team="a_team", alert_after="soon")
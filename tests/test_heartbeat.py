@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+
+import pysensu_yelp
+from pysensu_yelp.heartbeat import HeartbeatScheduler
+from pysensu_yelp.heartbeat import jitter_offset
+
+
+@pytest.fixture
+def heartbeats(sink):
+    heartbeats = HeartbeatScheduler(pysensu_yelp.SensuClient(transport=sink))
+    yield heartbeats
+    heartbeats.close()
+
+
+def register(heartbeats, name, **kwargs):
+    heartbeats.register(name=name, runbook="a_runbook", team="a_team", **kwargs)
+
+
+def wait_for(sink, count, timeout=5):
+    deadline = time.monotonic() + timeout
+    while len(sink.payloads) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return sink.results()
+
+
+def test_jitter_offset():
+    offset = jitter_offset("a_host", "a_check", 60)
+    assert 0 <= offset < 60
+    assert jitter_offset("a_host", "a_check", 60) == offset
+    assert jitter_offset("a_host", "a_check", 120) == offset * 2
+    offsets = {jitter_offset(f"host_{i}", "a_check", 60) for i in range(100)}
+    # Spread over the whole interval
+    assert len(offsets) == 100
+    assert min(offsets) < 10 and max(offsets) > 50
+
+
+def test_sends_keepalives(heartbeats, sink):
+    register(heartbeats, "fast", interval=0.1)
+    results = wait_for(sink, 4)
+    assert [r["name"] for r in results[:4]] == ["fast"] * 4
+    assert results[0]["status"] == pysensu_yelp.Status.OK
+    assert results[0]["output"] == "fast is alive"
+
+
+def test_one_thread_for_all_checks(heartbeats, sink):
+    for i in range(10):
+        register(heartbeats, f"check_{i}", interval=0.1)
+    results = wait_for(sink, 30)
+    assert {r["name"] for r in results} == {f"check_{i}" for i in range(10)}
+    threads = [t for t in threading.enumerate() if t.name == "pysensu-yelp-heartbeats"]
+    assert len(threads) == 1
+
+
+def test_report_overrides_keepalives(heartbeats, sink):
+    register(heartbeats, "a_check", interval=0.1)
+    heartbeats.report("a_check", pysensu_yelp.Status.CRITICAL, "It broke")
+    assert (2, "It broke") in [(r["status"], r["output"]) for r in sink.results()]
+    sink.clear()
+    results = wait_for(sink, 2)
+    assert [(r["status"], r["output"]) for r in results[:2]] == [(2, "It broke")] * 2
+
+
+def test_report_unknown_check(heartbeats):
+    with pytest.raises(KeyError):
+        heartbeats.report("a_check", 0, "OK")
+
+
+def test_unregister(heartbeats, sink):
+    register(heartbeats, "a_check", interval=0.05)
+    wait_for(sink, 1)
+    heartbeats.unregister("a_check")
+    time.sleep(0.1)
+    sink.clear()
+    time.sleep(0.2)
+    assert sink.results() == []
+
+
+@pytest.mark.parametrize(
+    "kwargs,interval",
+    [
+        (dict(ttl="1h"), 1800),
+        (dict(check_every="1m"), 60),
+        (dict(check_every="1h", ttl="1h"), 1800),
+        (dict(check_every="1m", ttl="1h"), 60),
+        (dict(ttl="1h", interval=5), 5),
+    ],
+)
+def test_interval(heartbeats, kwargs, interval):
+    register(heartbeats, "a_check", **kwargs)
+    assert heartbeats._heartbeats[(None, "a_check")].interval == interval
+
+
+def test_needs_an_interval(heartbeats):
+    with pytest.raises(ValueError):
+        register(heartbeats, "a_check")
+
+
+def test_due_at_jittered_point_of_interval(sink):
+    heartbeats = HeartbeatScheduler(pysensu_yelp.SensuClient(transport=sink))
+    heartbeats._clock = lambda: 50.0
+    heartbeats._wall_clock = lambda: 6000.0
+    try:
+        register(heartbeats, "a_check", ttl="2m", source="a_host")
+        due = heartbeats._heartbeats[("a_host", "a_check")].due
+    finally:
+        heartbeats.close()
+    offset = jitter_offset("a_host", "a_check", 60)
+    # 6000 is a whole number of minutes
+    assert due == pytest.approx(50 + offset)
@@ -0,0 +1,136 @@
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+import pysensu_yelp
+from pysensu_yelp.loadgen import main
+from pysensu_yelp.loadgen import parse_status_mix
+from pysensu_yelp.loadgen import run_load
+from pysensu_yelp.loadgen import synthesize_events
+from pysensu_yelp.sinks import FileSink
+
+
+def read_events(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_parse_status_mix():
+    assert parse_status_mix("0:90,2:10") == [
+        (pysensu_yelp.Status.OK, 90.0),
+        (pysensu_yelp.Status.CRITICAL, 10.0),
+    ]
+    with pytest.raises(ValueError):
+        parse_status_mix("0:0")
+    with pytest.raises(ValueError):
+        parse_status_mix("7:1")
+
+
+def test_synthesize_events():
+    mix = parse_status_mix("0:1,2:1")
+    events = synthesize_events(100, 10, 200, mix, seed=1)
+    assert len({event["name"] for event in events}) == 10
+    assert {len(event["output"]) for event in events} == {200}
+    assert {event["status"] for event in events} == {
+        pysensu_yelp.Status.OK,
+        pysensu_yelp.Status.CRITICAL,
+    }
+    assert synthesize_events(100, 10, 200, mix, seed=1) == events
+
+
+@pytest.mark.parametrize("option", ["--names", "--concurrency"])
+def test_main_validates_counts(option, capsys):
+    with pytest.raises(SystemExit):
+        main([option, "0", "--transport", "null"])
+    assert f"{option} must be at least 1" in capsys.readouterr().err
+
+
+def test_run_load_to_file(tmp_path):
+    path = str(tmp_path / "events")
+    events = synthesize_events(10, 5, 50, parse_status_mix("0:1"))
+    report = run_load(events, transport=f"file:{path}", concurrency=3, count=100)
+    assert report["sent"] == 100
+    assert report["errors"] == {}
+    assert set(report["latency_ms"]) == {"p50", "p90", "p99", "max"}
+    assert len(read_events(path)) == 100
+
+
+def test_rate_limit(tmp_path):
+    events = synthesize_events(10, 5, 50, parse_status_mix("0:1"))
+    report = run_load(events, transport="null", rate=100, count=20)
+    assert report["sent"] == 20
+    # The first event goes out right away
+    assert report["seconds"] >= 0.18
+
+
+def test_duration():
+    events = synthesize_events(10, 5, 50, parse_status_mix("0:1"))
+    start = time.monotonic()
+    report = run_load(events, transport="null", rate=50, duration=0.2)
+    assert time.monotonic() - start < 2
+    assert 0 < report["sent"] <= 12
+
+
+def test_replay(tmp_path):
+    recorded = str(tmp_path / "recorded")
+    client = pysensu_yelp.SensuClient(transport=FileSink(recorded))
+    for i in range(3):
+        client.send_event(
+            name=f"check_{i}", runbook="a_runbook", status=0, output="OK", team="a_team"
+        )
+    client.close()
+
+    replayed = str(tmp_path / "replayed")
+    assert (
+        main(["--replay", recorded, "--transport", f"file:{replayed}", "--count", "6"])
+        == 0
+    )
+    assert read_events(replayed) == read_events(recorded) * 2
+
+
+def test_main_over_tcp(capsys):
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(8)
+    received = []
+
+    def read(sock):
+        with sock, sock.makefile("rb") as f:
+            received.extend(f)
+
+    def accept():
+        threads = []
+        for _ in range(4):
+            sock, _ = server.accept()
+            thread = threading.Thread(target=read, args=(sock,))
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join(10)
+
+    acceptor = threading.Thread(target=accept)
+    acceptor.start()
+    try:
+        argv = ["--host", "127.0.0.1", "--port", str(server.getsockname()[1])]
+        argv += ["--count", "200", "--concurrency", "4", "--json"]
+        assert main(argv) == 0
+        acceptor.join(10)
+    finally:
+        server.close()
+
+    report = json.loads(capsys.readouterr().out)
+    assert report["sent"] == 200
+    assert len(received) == 200
+
+
+def test_main_reports_errors(capsys):
+    # Nothing listens on the port
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    assert main(["--host", "127.0.0.1", "--port", str(port), "--count", "3"]) == 1
+    assert "Errors: 3 ConnectionRefusedError" in capsys.readouterr().out
@@ -1,11 +1,32 @@
+import copy
 import json
+import os
+import pickle
+import socket
+import tempfile
 from unittest import mock
 
 import pytest
+from conftest import make_event
 
 import pysensu_yelp
 
 
+@pytest.fixture(autouse=True)
+def reset_default_client():
+    yield
+    pysensu_yelp._default_client.close()
+
+
+@pytest.fixture(params=sorted(pysensu_yelp.serializers))
+def serializer(request):
+    previous = pysensu_yelp._dumps
+    pysensu_yelp.set_serializer(request.param)
+    yield request.param
+    pysensu_yelp.set_serializer(previous)
+
+
+@pytest.mark.usefixtures("serializer")
 class TestPySensuYelp:
     test_name = "then_i_saw_her_face"
     test_runbook = "now_im_a_believer"
@@ -55,7 +76,12 @@ class TestPySensuYelp:
     event_dict["irc_channels"] = test_irc_channels
     event_dict["slack_channels"] = test_slack_channels
     event_dict["cluster_name"] = test_cluster_name
-    event_hash = json.dumps(event_dict).encode("utf-8")
+
+    def assert_sent_event(self, magic_skt):
+        magic_skt.sendall.assert_called_once()
+        (payload,) = magic_skt.sendall.call_args[0]
+        assert payload.endswith(b"\n")
+        assert json.loads(payload) == self.event_dict
 
     def test_human_to_seconds(self):
         assert pysensu_yelp.human_to_seconds("1s") == 1
@@ -65,9 +91,27 @@ class TestPySensuYelp:
         assert pysensu_yelp.human_to_seconds("0s") == 0
         assert pysensu_yelp.human_to_seconds(None) is None
 
+        assert pysensu_yelp.human_to_seconds("") == 0
+
         pytest.raises(Exception, pysensu_yelp.human_to_seconds, ("ss"))
         pytest.raises(Exception, pysensu_yelp.human_to_seconds, ("0q"))
 
+    @pytest.mark.parametrize("interval", ["ss", "0q", "1", "s1", "1s ", "1s1", "1sx2m"])
+    def test_human_to_seconds_bad_interval(self, interval):
+        with pytest.raises(pysensu_yelp.IntervalError):
+            pysensu_yelp.human_to_seconds(interval)
+
+    def test_human_to_seconds_bad_interval_is_value_error(self):
+        with pytest.raises(ValueError, match="Bad interval format for 1q"):
+            pysensu_yelp.human_to_seconds("1q")
+
+    def test_human_to_seconds_cached(self):
+        pysensu_yelp._interval_to_seconds.cache_clear()
+        for _ in range(3):
+            assert pysensu_yelp.human_to_seconds("1h30m") == 5400
+        cache_info = pysensu_yelp._interval_to_seconds.cache_info()
+        assert (cache_info.hits, cache_info.misses) == (2, 1)
+
     def test_send_event_valid_args(self):
         magic_skt = mock.MagicMock()
         with mock.patch("socket.socket", return_value=magic_skt) as skt_patch:
@@ -97,8 +141,8 @@ class TestPySensuYelp:
             )
             assert skt_patch.call_count == 1
             magic_skt.connect.assert_called_once_with(("169.254.255.254", 3030))
-            magic_skt.sendall.assert_called_once_with(self.event_hash + b"\n")
-            magic_skt.close.assert_called_once()
+            self.assert_sent_event(magic_skt)
+            magic_skt.close.assert_not_called()
 
     def test_send_event_custom_sensu_host(self):
         magic_skt = mock.MagicMock()
@@ -131,8 +175,8 @@ class TestPySensuYelp:
             )
             assert skt_patch.call_count == 1
             magic_skt.connect.assert_called_once_with(("testhost", 666))
-            magic_skt.sendall.assert_called_once_with(self.event_hash + b"\n")
-            magic_skt.close.assert_called_once()
+            self.assert_sent_event(magic_skt)
+            magic_skt.close.assert_not_called()
 
     def test_send_event_no_team(self):
         magic_skt = mock.MagicMock()
@@ -194,3 +238,536 @@ class TestPySensuYelp:
                         cluster_name=self.test_cluster_name,
                         issuetype=self.test_issuetype,
                     )
+
+
+class TestEvent:
+    kwargs = dict(
+        name="a_check",
+        runbook="a_runbook",
+        status=pysensu_yelp.Status.OK,
+        output="some output",
+        team="a_team",
+        tags=["a_tag"],
+        slack_channels=["#a_channel"],
+        ttl="1h",
+    )
+
+    def test_matches_build_event(self):
+        event = pysensu_yelp.Event(**self.kwargs)
+        result_dict = pysensu_yelp.build_event(**self.kwargs)
+        assert event.to_dict() == result_dict
+        assert event.encode() == pysensu_yelp.encode_event(result_dict)
+        assert event.encode() is event.encode()
+
+    def test_validated_on_creation(self):
+        with pytest.raises(ValueError):
+            pysensu_yelp.Event(**dict(self.kwargs, name="a check"))
+        with pytest.raises(pysensu_yelp.IntervalError):
+            pysensu_yelp.Event(**dict(self.kwargs, check_every="often"))
+
+    def test_immutable(self):
+        event = pysensu_yelp.Event(**self.kwargs)
+        with pytest.raises(AttributeError):
+            event.status = pysensu_yelp.Status.CRITICAL
+        with pytest.raises(AttributeError):
+            event.extra = 1
+        assert event.tags == ("a_tag",)
+        assert not hasattr(event, "__dict__")
+
+    def test_copy_and_pickle(self):
+        event = pysensu_yelp.Event(**self.kwargs)
+        for copied in (
+            copy.copy(event),
+            copy.deepcopy(event),
+            pickle.loads(pickle.dumps(event)),
+        ):
+            assert copied == event
+            assert copied.to_dict() == event.to_dict()
+            assert copied.encode() == event.encode()
+
+    def test_to_dict_is_a_copy(self):
+        event = pysensu_yelp.Event(**self.kwargs)
+        event.to_dict()["tags"].append("oops")
+        assert event.to_dict()["tags"] == ["a_tag"]
+
+    def test_hashable(self):
+        first = pysensu_yelp.Event(**self.kwargs)
+        second = pysensu_yelp.Event(**self.kwargs)
+        assert first == second
+        assert len({first, second}) == 1
+        assert first != first.replace(status=pysensu_yelp.Status.WARNING)
+
+    def test_replace(self):
+        event = pysensu_yelp.Event(**self.kwargs)
+        critical = event.replace(status=pysensu_yelp.Status.CRITICAL, output="broken")
+        assert critical.to_dict() == pysensu_yelp.build_event(
+            **dict(self.kwargs, status=pysensu_yelp.Status.CRITICAL, output="broken")
+        )
+        assert event.status == pysensu_yelp.Status.OK
+
+    def test_client_send(self):
+        with mock.patch("socket.socket") as skt_patch:
+            client = pysensu_yelp.SensuClient()
+            event = pysensu_yelp.Event(**self.kwargs)
+            client.send(event)
+        skt_patch.return_value.sendall.assert_called_once_with(event.encode())
+
+    def test_client_send_truncates_for_udp(self):
+        with mock.patch("socket.socket") as skt_patch:
+            client = pysensu_yelp.SensuClient(
+                transport=pysensu_yelp.Transport.UDP, max_datagram_size=1000
+            )
+            client.send(pysensu_yelp.Event(**dict(self.kwargs, output="x" * 2000)))
+        (payload,) = skt_patch.return_value.send.call_args[0]
+        assert len(payload) <= 1000
+        assert json.loads(payload)["output"].endswith(pysensu_yelp.TRUNCATION_MARKER)
+
+
+def test_build_event_default_lists_are_not_shared():
+    kwargs = dict(
+        name="a_check", runbook="a_runbook", status=0, output="", team="a_team"
+    )
+    pysensu_yelp.build_event(**kwargs)["tags"].append("oops")
+    pysensu_yelp.build_event(**kwargs)["dependencies"].append("oops")
+    result_dict = pysensu_yelp.build_event(**kwargs)
+    assert result_dict["tags"] == result_dict["dependencies"] == []
+
+
+class TestSensuClient:
+    payload = b'{"name": "a_check"}\n'
+
+    def test_send_payload_reuses_connection(self):
+        magic_skt = mock.MagicMock()
+        magic_skt.recv.side_effect = BlockingIOError
+        with mock.patch("socket.socket", return_value=magic_skt) as skt_patch:
+            client = pysensu_yelp.SensuClient(sensu_host="testhost", sensu_port=666)
+            client.send_payload(self.payload)
+            client.send_payload(self.payload)
+            assert skt_patch.call_count == 1
+            magic_skt.connect.assert_called_once_with(("testhost", 666))
+            assert magic_skt.sendall.call_args_list == [mock.call(self.payload)] * 2
+            client.close()
+            magic_skt.close.assert_called_once()
+
+    def test_send_payload_one_connection_per_address(self):
+        with mock.patch("socket.socket") as skt_patch:
+            client = pysensu_yelp.SensuClient()
+            client.send_payload(self.payload, sensu_host="host1")
+            client.send_payload(self.payload, sensu_host="host2", sensu_port=666)
+            assert skt_patch.call_count == 2
+            skt_patch.return_value.connect.assert_has_calls(
+                [mock.call(("host1", 3030)), mock.call(("host2", 666))]
+            )
+
+    def test_send_payload_reconnects_on_broken_pipe(self):
+        broken_skt = mock.MagicMock()
+        broken_skt.recv.side_effect = BlockingIOError
+        broken_skt.sendall.side_effect = [None, BrokenPipeError]
+        fresh_skt = mock.MagicMock()
+        with mock.patch("socket.socket", side_effect=[broken_skt, fresh_skt]):
+            client = pysensu_yelp.SensuClient()
+            client.send_payload(self.payload)
+            client.send_payload(self.payload)
+            broken_skt.close.assert_called_once()
+            fresh_skt.sendall.assert_called_once_with(self.payload)
+
+    def test_send_payload_reconnects_when_peer_closed(self):
+        closed_skt = mock.MagicMock()
+        closed_skt.recv.return_value = b""
+        fresh_skt = mock.MagicMock()
+        with mock.patch("socket.socket", side_effect=[closed_skt, fresh_skt]):
+            client = pysensu_yelp.SensuClient()
+            client.send_payload(self.payload)
+            client.send_payload(self.payload)
+            closed_skt.sendall.assert_called_once_with(self.payload)
+            closed_skt.close.assert_called_once()
+            fresh_skt.sendall.assert_called_once_with(self.payload)
+
+    def test_send_payload_connect_failure_raises(self):
+        magic_skt = mock.MagicMock()
+        magic_skt.connect.side_effect = ConnectionRefusedError
+        with mock.patch("socket.socket", return_value=magic_skt):
+            client = pysensu_yelp.SensuClient()
+            with pytest.raises(ConnectionRefusedError):
+                client.send_payload(self.payload)
+            magic_skt.close.assert_called_once()
+
+    def test_send_event_over_real_socket(self):
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen(1)
+        host, port = server.getsockname()
+        try:
+            with pysensu_yelp.SensuClient(sensu_host=host, sensu_port=port) as client:
+                for status in range(3):
+                    client.send_event(
+                        name="a_check",
+                        runbook="a_runbook",
+                        status=status,
+                        output="some output",
+                        team="a_team",
+                    )
+                conn, _ = server.accept()
+            with conn, conn.makefile("rb") as lines:
+                events = [json.loads(line) for line in lines]
+        finally:
+            server.close()
+        assert [event["status"] for event in events] == [0, 1, 2]
+
+
+class TestSendEvents:
+    def test_send_events_single_write(self):
+        magic_skt = mock.MagicMock()
+        with mock.patch("socket.socket", return_value=magic_skt) as skt_patch:
+            failures = pysensu_yelp.send_events(
+                [make_event(f"check_{i}", status=i) for i in range(3)]
+            )
+            assert failures == []
+            assert skt_patch.call_count == 1
+            magic_skt.sendall.assert_called_once()
+            (payload,) = magic_skt.sendall.call_args[0]
+        lines = payload.split(b"\n")
+        assert lines.pop() == b""
+        assert [json.loads(line)["status"] for line in lines] == [0, 1, 2]
+
+    def test_send_events_reports_invalid_events(self):
+        events = [
+            make_event("check_0"),
+            make_event("bad name!"),
+            dict(make_event("check_2"), ttl="1q"),
+            dict(make_event("check_3"), not_an_arg=True),
+            make_event("check_4"),
+        ]
+        magic_skt = mock.MagicMock()
+        with mock.patch("socket.socket", return_value=magic_skt):
+            failures = pysensu_yelp.send_events(events)
+            (payload,) = magic_skt.sendall.call_args[0]
+        assert [index for index, _ in failures] == [1, 2, 3]
+        assert isinstance(failures[0][1], ValueError)
+        assert isinstance(failures[2][1], TypeError)
+        names = [json.loads(line)["name"] for line in payload.splitlines()]
+        assert names == ["check_0", "check_4"]
+
+    @pytest.mark.parametrize("send", ["send_event", "send_events"])
+    def test_default_client_destination(self, send):
+        client = pysensu_yelp.SensuClient(sensu_host="10.1.2.3", sensu_port=9999)
+        previous = pysensu_yelp.set_default_client(client)
+        magic_skt = mock.MagicMock()
+        try:
+            with mock.patch("socket.socket", return_value=magic_skt):
+                if send == "send_event":
+                    pysensu_yelp.send_event(**make_event())
+                else:
+                    pysensu_yelp.send_events([make_event()])
+        finally:
+            pysensu_yelp.set_default_client(previous)
+            client.close()
+        magic_skt.connect.assert_called_once_with(("10.1.2.3", 9999))
+
+    def test_send_events_nothing_valid(self):
+        with mock.patch("socket.socket") as skt_patch:
+            failures = pysensu_yelp.send_events([make_event("bad name!")])
+            assert len(failures) == 1
+            skt_patch.assert_not_called()
+
+
+@pytest.mark.usefixtures("serializer")
+class TestCheckTemplate:
+    template_args = dict(
+        name="a_check",
+        runbook="a_runbook",
+        team="a_team",
+        tip="a_tip",
+        ttl="1h",
+        tags=["a_tag"],
+        irc_channels=["#a_channel"],
+        cluster_name="a_cluster",
+    )
+
+    @pytest.mark.parametrize(
+        "status,output",
+        [
+            (pysensu_yelp.Status.CRITICAL, "CRIT: it's broken"),
+            (0, 'unicode ☃ and "quotes"\nand newlines'),
+        ],
+    )
+    def test_encode_matches_encode_event(self, status, output):
+        template = pysensu_yelp.CheckTemplate(**self.template_args)
+        expected = pysensu_yelp.encode_event(
+            pysensu_yelp.build_event(status=status, output=output, **self.template_args)
+        )
+        assert template.encode(status, output) == expected
+        assert template.build(status, output) == json.loads(expected)
+
+    def test_validates_once(self):
+        with pytest.raises(ValueError):
+            pysensu_yelp.CheckTemplate(**dict(self.template_args, name="bad name!"))
+        with pytest.raises(pysensu_yelp.IntervalError):
+            pysensu_yelp.CheckTemplate(**dict(self.template_args, ttl="1q"))
+
+    def test_emit(self):
+        template = pysensu_yelp.CheckTemplate(
+            sensu_host="testhost", **self.template_args
+        )
+        magic_skt = mock.MagicMock()
+        with mock.patch("socket.socket", return_value=magic_skt):
+            template.emit(pysensu_yelp.Status.WARNING, "WARN: hmm")
+            magic_skt.connect.assert_called_once_with(("testhost", 3030))
+            magic_skt.sendall.assert_called_once_with(
+                template.encode(pysensu_yelp.Status.WARNING, "WARN: hmm")
+            )
+
+    def test_emit_through_client(self):
+        template = pysensu_yelp.CheckTemplate(**self.template_args)
+        client = pysensu_yelp.SensuClient()
+        with mock.patch.object(client, "send_payload") as send_payload:
+            template.emit(0, "OK", client=client)
+        send_payload.assert_called_once_with(
+            template.encode(0, "OK"),
+            sensu_host=None,
+            sensu_port=None,
+            transport=pysensu_yelp.Transport.TCP,
+        )
+
+
+class TestUDP:
+    @pytest.fixture
+    def sensu(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        server.bind(("127.0.0.1", 0))
+        server.settimeout(5)
+        yield server
+        server.close()
+
+    def send_event(self, client, output="some output", **kwargs):
+        client.send_event(
+            name="a_check",
+            runbook="a_runbook",
+            status=0,
+            output=output,
+            team="a_team",
+            **kwargs,
+        )
+
+    def test_send_event_one_datagram_per_event(self, sensu):
+        host, port = sensu.getsockname()
+        client = pysensu_yelp.SensuClient(
+            host, port, transport=pysensu_yelp.Transport.UDP
+        )
+        with mock.patch("socket.socket", wraps=socket.socket) as skt_patch:
+            self.send_event(client)
+            client.send_events(
+                [
+                    dict(name=f"check_{i}", runbook="r", status=i, output="", team="t")
+                    for i in range(2)
+                ]
+            )
+            assert skt_patch.call_count == 1
+        client.close()
+        datagrams = [sensu.recv(65536) for _ in range(3)]
+        assert [json.loads(d)["name"] for d in datagrams] == [
+            "a_check",
+            "check_0",
+            "check_1",
+        ]
+
+    def test_module_send_event_over_udp(self, sensu):
+        host, port = sensu.getsockname()
+        self.send_event(
+            pysensu_yelp,
+            sensu_host=host,
+            sensu_port=port,
+            transport=pysensu_yelp.Transport.UDP,
+        )
+        assert json.loads(sensu.recv(65536))["output"] == "some output"
+
+    def test_large_output_truncated(self, sensu):
+        host, port = sensu.getsockname()
+        client = pysensu_yelp.SensuClient(
+            host, port, transport=pysensu_yelp.Transport.UDP, max_datagram_size=1024
+        )
+        self.send_event(client, output="OK: first line\n" + "x" * 5000)
+        client.close()
+        datagram = sensu.recv(65536)
+        assert len(datagram) <= 1024
+        output = json.loads(datagram)["output"]
+        assert output.startswith("OK: first line\nxxx")
+        assert output.endswith(pysensu_yelp.TRUNCATION_MARKER)
+
+    def test_send_payload_too_large(self):
+        client = pysensu_yelp.SensuClient(
+            transport=pysensu_yelp.Transport.UDP, max_datagram_size=10
+        )
+        with pytest.raises(ValueError):
+            client.send_payload(b"x" * 11)
+
+    def test_retries_after_connection_refused(self):
+        magic_skt = mock.MagicMock()
+        magic_skt.send.side_effect = [ConnectionRefusedError, None]
+        with mock.patch("socket.socket", return_value=magic_skt) as skt_patch:
+            client = pysensu_yelp.SensuClient(transport=pysensu_yelp.Transport.UDP)
+            client.send_payload(b"{}\n")
+            skt_patch.assert_called_once_with(socket.AF_INET, socket.SOCK_DGRAM)
+            assert magic_skt.send.call_args_list == [mock.call(b"{}\n")] * 2
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+class TestUnixSocket:
+    @pytest.fixture
+    def path(self):
+        # tmp_path can be longer than a Unix socket's path may be
+        with tempfile.TemporaryDirectory() as directory:
+            yield os.path.join(directory, "sensu.sock")
+
+    def bind(self, path, socket_type):
+        server = socket.socket(socket.AF_UNIX, socket_type)
+        server.bind(path)
+        server.settimeout(5)
+        return server
+
+    def send_event(self, client, output="some output", **kwargs):
+        client.send_event(
+            name="a_check",
+            runbook="a_runbook",
+            status=0,
+            output=output,
+            team="a_team",
+            **kwargs,
+        )
+
+    def test_stream_reuses_connection(self, path):
+        server = self.bind(path, socket.SOCK_STREAM)
+        server.listen(1)
+        try:
+            with pysensu_yelp.SensuClient(sensu_socket_path=path) as client:
+                with mock.patch("socket.socket", wraps=socket.socket) as skt_patch:
+                    for _ in range(3):
+                        self.send_event(client)
+                    skt_patch.assert_called_once_with(
+                        socket.AF_UNIX, socket.SOCK_STREAM
+                    )
+                conn, _ = server.accept()
+            with conn, conn.makefile("rb") as lines:
+                events = [json.loads(line) for line in lines]
+        finally:
+            server.close()
+        assert [event["name"] for event in events] == ["a_check"] * 3
+
+    def test_datagram_per_call(self, path):
+        server = self.bind(path, socket.SOCK_DGRAM)
+        try:
+            self.send_event(
+                pysensu_yelp,
+                sensu_host="unix://" + path,
+                transport=pysensu_yelp.Transport.UDP,
+            )
+            assert json.loads(server.recv(65536))["output"] == "some output"
+        finally:
+            server.close()
+
+    def test_default_client_socket_path(self, path):
+        server = self.bind(path, socket.SOCK_DGRAM)
+        client = pysensu_yelp.SensuClient(
+            sensu_socket_path=path, transport=pysensu_yelp.Transport.UDP
+        )
+        previous = pysensu_yelp.set_default_client(client)
+        try:
+            self.send_event(pysensu_yelp)
+            assert json.loads(server.recv(65536))["output"] == "some output"
+        finally:
+            pysensu_yelp.set_default_client(previous)
+            client.close()
+            server.close()
+
+    def test_datagram_truncated(self, path):
+        server = self.bind(path, socket.SOCK_DGRAM)
+        client = pysensu_yelp.SensuClient(
+            sensu_socket_path=path,
+            transport=pysensu_yelp.Transport.UDP,
+            max_datagram_size=1024,
+        )
+        try:
+            self.send_event(client, output="x" * 5000)
+            datagram = server.recv(65536)
+        finally:
+            client.close()
+            server.close()
+        assert len(datagram) <= 1024
+        assert json.loads(datagram)["output"].endswith(pysensu_yelp.TRUNCATION_MARKER)
+
+    def test_datagram_reconnects_to_new_socket(self, path):
+        client = pysensu_yelp.SensuClient(
+            sensu_host="unix://" + path, transport=pysensu_yelp.Transport.UDP
+        )
+        server = self.bind(path, socket.SOCK_DGRAM)
+        self.send_event(client, output="first")
+        server.close()
+        os.unlink(path)
+        server = self.bind(path, socket.SOCK_DGRAM)
+        try:
+            self.send_event(client, output="second")
+            assert json.loads(server.recv(65536))["output"] == "second"
+        finally:
+            client.close()
+            server.close()
+
+
+class TestEncodeEventTruncated:
+    result_dict = pysensu_yelp.build_event(
+        name="a_check", runbook="a_runbook", status=0, output="", team="a_team"
+    )
+
+    @pytest.mark.parametrize(
+        "output",
+        ["x" * 1000, "☃" * 1000, "☃x\n" * 300],
+        ids=["ascii", "unicode", "mixed"],
+    )
+    def test_fits(self, output):
+        result_dict = dict(self.result_dict, output=output)
+        size = len(pysensu_yelp.encode_event(self.result_dict)) + 200
+        payload = pysensu_yelp.encode_event_truncated(result_dict, size)
+        assert size - 12 <= len(payload) <= size
+        truncated = json.loads(payload)["output"]
+        assert output.startswith(truncated[: -len(pysensu_yelp.TRUNCATION_MARKER)])
+
+    def test_small_enough(self):
+        result_dict = dict(self.result_dict, output="x" * 10)
+        assert pysensu_yelp.encode_event_truncated(
+            result_dict, 4096
+        ) == pysensu_yelp.encode_event(result_dict)
+
+    def test_too_large_without_output(self):
+        result_dict = dict(self.result_dict, output="x" * 100)
+        with pytest.raises(ValueError):
+            pysensu_yelp.encode_event_truncated(result_dict, 50)
+
+
+class TestSerializers:
+    result_dict = pysensu_yelp.build_event(
+        name="a_check", runbook="a_runbook", status=2, output="☃", team="a_team"
+    )
+
+    def test_compact(self, serializer):
+        payload = pysensu_yelp.encode_event(self.result_dict)
+        assert payload.endswith(b"}\n")
+        assert b", " not in payload and b": " not in payload
+        assert json.loads(payload) == self.result_dict
+
+    def test_default_prefers_orjson(self):
+        pytest.importorskip("orjson")
+        assert pysensu_yelp._dumps is pysensu_yelp.serializers["orjson"]
+
+    def test_orjson_falls_back_to_json(self):
+        pytest.importorskip("orjson")
+        result_dict = dict(self.result_dict, output="\udc80", ttl=2**70)
+        assert pysensu_yelp.serializers["orjson"](
+            result_dict
+        ) == pysensu_yelp.serializers["json"](result_dict)
+
+    def test_custom_serializer(self, serializer):
+        pysensu_yelp.set_serializer(lambda obj: b"custom\n")
+        assert pysensu_yelp.encode_event(self.result_dict) == b"custom\n"
+
+    def test_unknown_serializer(self):
+        with pytest.raises(ValueError):
+            pysensu_yelp.set_serializer("pickle")
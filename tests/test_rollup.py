@@ -0,0 +1,105 @@
+import time
+
+import pytest
+
+import pysensu_yelp
+from pysensu_yelp import Status
+from pysensu_yelp.rollup import ClusterRollup
+from pysensu_yelp.rollup import rollup_status
+from pysensu_yelp.rollup import summarize
+
+
+def make_rollup(sink, **kwargs):
+    return ClusterRollup(
+        name="shard_health",
+        runbook="a_runbook",
+        team="a_team",
+        cluster_name="shards",
+        client=pysensu_yelp.SensuClient(transport=sink),
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize(
+    "statuses,expected",
+    [
+        ([Status.OK] * 10, Status.OK),
+        ([Status.OK] * 9 + [Status.WARNING], Status.WARNING),
+        ([Status.OK] * 9 + [Status.CRITICAL], Status.WARNING),
+        ([Status.OK] * 8 + [Status.CRITICAL] * 2, Status.CRITICAL),
+        ([Status.OK] * 8 + [Status.UNKNOWN] * 2, Status.WARNING),
+        ([], Status.OK),
+    ],
+)
+def test_rollup_status(statuses, expected):
+    assert rollup_status(statuses) == expected
+
+
+def test_rollup_status_custom_thresholds():
+    thresholds = [(Status.CRITICAL, 0.5), (Status.WARNING, 0.2)]
+    critical = [Status.CRITICAL] * 3
+    assert rollup_status([Status.OK] * 7 + critical, thresholds) == Status.WARNING
+    assert rollup_status([Status.OK] * 2 + critical, thresholds) == Status.CRITICAL
+    assert rollup_status([Status.OK] * 12 + critical, thresholds) == Status.OK
+
+
+def test_summarize():
+    results = {f"shard-{i:02}": (Status.OK, "fine") for i in range(20)}
+    results["shard-03"] = (Status.CRITICAL, "Disk full\nmore details")
+    results["shard-01"] = (Status.WARNING, "Slow")
+    results["shard-02"] = (Status.CRITICAL, "x" * 500)
+    results["shard-04"] = (Status.UNKNOWN, "")
+    output = summarize(Status.CRITICAL, results, max_listed=3)
+    assert output.split("\n") == [
+        "CRITICAL: 20 members, 2 CRITICAL, 1 UNKNOWN, 1 WARNING, 16 OK",
+        "shard-02: CRITICAL " + "x" * 100,
+        "shard-03: CRITICAL Disk full",
+        "shard-04: UNKNOWN",
+        "... and 1 more",
+    ]
+
+
+def test_flush_sends_one_event(sink):
+    rollup = make_rollup(sink)
+    for i in range(1000):
+        rollup.record(f"shard-{i}", Status.OK, "fine")
+    # Only the latest result of each member counts
+    rollup.record("shard-1", Status.CRITICAL, "Lagging")
+    rollup.record_event(
+        pysensu_yelp.build_event(
+            "shard_check", "r", Status.WARNING, "Slow", "t", source="shard-2"
+        )
+    )
+    assert rollup.flush()[0] == Status.WARNING
+    (event,) = sink.results()
+    assert event["name"] == "shard_health"
+    assert event["cluster_name"] == "shards"
+    assert event["status"] == Status.WARNING
+    assert event["output"].startswith("WARNING: 1000 members, 1 CRITICAL")
+    assert "shard-1: CRITICAL Lagging" in event["output"]
+
+
+def test_windows_start_empty(sink):
+    rollup = make_rollup(sink, window=30)
+    rollup.record("shard-1", Status.CRITICAL, "Down")
+    rollup.flush()
+    assert rollup.flush() == (
+        Status.UNKNOWN,
+        "UNKNOWN: No members reported in the last 30s",
+    )
+    assert sink.results()[0]["interval"] == 30
+
+
+def test_start(sink):
+    rollup = make_rollup(sink, window=0.05)
+    rollup.record("shard-1", Status.OK)
+    rollup.start()
+    try:
+        deadline = time.monotonic() + 5
+        while len(sink.payloads) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        rollup.stop()
+    first, second = sink.results()[:2]
+    assert first["status"] == Status.OK
+    assert second["status"] == Status.UNKNOWN
@@ -0,0 +1,163 @@
+import json
+import sys
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from pysensu_yelp import SensuClient
+from pysensu_yelp import Status
+from pysensu_yelp.runner import Check
+from pysensu_yelp.runner import CheckRunner
+from pysensu_yelp.runner import load_manifest
+from pysensu_yelp.runner import main
+
+
+def sensu_dict(name, **kwargs):
+    return dict(name=name, runbook="a_runbook", team="a_team", **kwargs)
+
+
+def python(script):
+    return [sys.executable, "-c", script]
+
+
+@pytest.fixture
+def client():
+    client = SensuClient()
+    with mock.patch.object(client, "send_result", autospec=True):
+        yield client
+
+
+def run_for(runner, seconds):
+    thread = threading.Thread(target=runner.run)
+    thread.start()
+    time.sleep(seconds)
+    runner.stop()
+    thread.join(10)
+    assert not thread.is_alive()
+
+
+def sent(client, name):
+    return [
+        call[0][0]
+        for call in client.send_result.call_args_list
+        if call[0][0]["name"] == name
+    ]
+
+
+class TestCheckRunner:
+    def test_runs_checks_on_their_schedule(self, client):
+        runner = CheckRunner(
+            [
+                Check(sensu_dict("fast"), python("print('fast')"), interval=0.2),
+                Check(sensu_dict("slow"), python("exit(2)"), interval=60),
+            ],
+            client=client,
+        )
+        run_for(runner, 1)
+        fast = sent(client, "fast")
+        assert 3 <= len(fast) <= 6
+        assert fast[0]["output"] == "fast\n"
+        (slow,) = sent(client, "slow")
+        assert slow["status"] == Status.CRITICAL
+
+    def test_overrun_does_not_delay_other_checks(self, client):
+        runner = CheckRunner(
+            [
+                Check(
+                    sensu_dict("hung"),
+                    python("import time; time.sleep(60)"),
+                    interval=0.2,
+                    timeout=0.7,
+                ),
+                Check(sensu_dict("fast"), python("pass"), interval=0.2),
+            ],
+            client=client,
+        )
+        run_for(runner, 1)
+        assert len(sent(client, "fast")) >= 3
+        hung = sent(client, "hung")
+        assert 1 <= len(hung) <= 2
+        assert all(event["status"] == Status.UNKNOWN for event in hung)
+        assert runner.skipped >= 2
+
+    def test_stop_closes_client(self, client):
+        runner = CheckRunner([], client=client)
+        with mock.patch.object(client, "close") as close:
+            runner.run()
+        close.assert_called_once_with()
+
+    def test_failing_check_does_not_stop_runner(self, client):
+        runner = CheckRunner(
+            [
+                Check(sensu_dict("missing"), ["/does/not/exist"], interval=0.2),
+                Check(sensu_dict("fine"), python("pass"), interval=0.2),
+            ],
+            client=client,
+        )
+        run_for(runner, 0.5)
+        assert sent(client, "missing") == []
+        assert len(sent(client, "fine")) >= 2
+
+
+class TestLoadManifest:
+    def write(self, tmp_path, entries):
+        path = tmp_path / "manifest.json"
+        path.write_text(json.dumps(entries))
+        return str(path)
+
+    def test_load(self, tmp_path):
+        path = self.write(
+            tmp_path,
+            [
+                {"sensu_dict": sensu_dict("a", check_every="1m"), "command": ["true"]},
+                {
+                    "sensu_dict": sensu_dict("b", sensu_port=1234),
+                    "command": ["false"],
+                    "timeout": 5,
+                    "status_policy": "max-warning",
+                },
+                {
+                    "sensu_dict": sensu_dict("c", status=0, output=""),
+                    "command": ["true"],
+                },
+            ],
+        )
+        assert load_manifest(path) == [
+            Check(sensu_dict("a", check_every="1m"), ["true"], 60, 60, "nagios"),
+            Check(sensu_dict("b", sensu_port=1234), ["false"], 30, 5, "max-warning"),
+            Check(sensu_dict("c", status=0, output=""), ["true"], 30, 30, "nagios"),
+        ]
+
+    @pytest.mark.parametrize(
+        "entry",
+        [
+            {"sensu_dict": sensu_dict("a b"), "command": ["true"]},
+            {"sensu_dict": sensu_dict("a"), "command": []},
+            {"sensu_dict": sensu_dict("a"), "command": "true"},
+            {"sensu_dict": sensu_dict("a", check_every="0s"), "command": ["true"]},
+            {
+                "sensu_dict": sensu_dict("a"),
+                "command": ["true"],
+                "status_policy": "lenient",
+            },
+            {"command": ["true"]},
+        ],
+    )
+    def test_invalid(self, tmp_path, entry):
+        path = self.write(tmp_path, [entry])
+        with pytest.raises(ValueError, match="Invalid check #0"):
+            load_manifest(path)
+
+
+def test_main(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps([{"sensu_dict": sensu_dict("a"), "command": ["true"]}]))
+    with mock.patch.object(CheckRunner, "run", autospec=True) as run, mock.patch.object(
+        CheckRunner, "stop", autospec=True
+    ):
+        assert main([str(path), "--max-workers", "2"]) == 0
+    (runner,) = run.call_args[0]
+    assert [check.command for check in runner.checks] == [["true"]]
+    assert runner._executor._max_workers == 2
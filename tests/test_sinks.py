@@ -0,0 +1,163 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+from conftest import make_event
+
+import pysensu_yelp
+from pysensu_yelp import aio
+from pysensu_yelp.sinks import FileSink
+from pysensu_yelp.sinks import MemorySink
+from pysensu_yelp.sinks import NullSink
+from pysensu_yelp.sinks import Sink
+
+
+def test_sink_must_implement_send():
+    class Incomplete(Sink):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+class TestMemorySink:
+    def test_client_sends_to_sink(self):
+        sink = MemorySink()
+        client = pysensu_yelp.SensuClient(transport=sink)
+        client.send_event(**make_event())
+        client.send_events([make_event("b"), make_event("c")])
+        assert [r["name"] for r in sink.results()] == ["a_check", "b", "c"]
+        assert sink.results()[0] == pysensu_yelp.build_event(**make_event())
+
+    def test_keeps_the_latest(self):
+        sink = MemorySink(max_events=2)
+        client = pysensu_yelp.SensuClient(transport=sink)
+        for name in "abc":
+            client.send_event(**make_event(name))
+        assert [r["name"] for r in sink.results()] == ["b", "c"]
+        sink.clear()
+        assert sink.results() == []
+
+    def test_threads(self):
+        sink = MemorySink(max_events=None)
+        client = pysensu_yelp.SensuClient(transport=sink)
+
+        def send():
+            for _ in range(500):
+                client.send_event(**make_event())
+
+        threads = [threading.Thread(target=send) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(sink.results()) == 2000
+
+    def test_module_send_event(self):
+        sink = MemorySink()
+        pysensu_yelp.set_default_client(pysensu_yelp.SensuClient(transport=sink))
+        pysensu_yelp.send_event(**make_event())
+        assert len(sink.payloads) == 1
+
+    def test_per_call(self):
+        sink = MemorySink()
+        client = pysensu_yelp.SensuClient()
+        client.send_event(**make_event(), transport=sink)
+        assert len(sink.payloads) == 1
+
+    def test_async_client(self):
+        sink = MemorySink()
+        client = aio.AsyncSensuClient(transport=sink)
+
+        async def send():
+            await client.send_event(**make_event())
+            await client.send_events([make_event("b")])
+            await client.close()
+
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(send())
+        finally:
+            loop.close()
+        assert [r["name"] for r in sink.results()] == ["a_check", "b"]
+
+
+def test_null_sink():
+    sink = NullSink()
+    client = pysensu_yelp.SensuClient(transport=sink)
+    client.send_events([make_event(), make_event()])
+    assert sink.sent == 2
+
+
+def test_file_sink(tmp_path):
+    path = tmp_path / "events.ndjson"
+    client = pysensu_yelp.SensuClient(transport=FileSink(str(path)))
+    client.send_event(**make_event("a"))
+    client.close()
+    client.send_events([make_event("b"), make_event("c")])
+    client.close()
+    lines = path.read_bytes().splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["a", "b", "c"]
+
+
+class TestParseTransport:
+    @pytest.mark.parametrize(
+        "spec,expected",
+        [
+            ("tcp", pysensu_yelp.Transport.TCP),
+            ("udp", pysensu_yelp.Transport.UDP),
+            ("unix", pysensu_yelp.Transport.UNIX),
+            ("unix_datagram", pysensu_yelp.Transport.UNIX_DATAGRAM),
+        ],
+    )
+    def test_network(self, spec, expected):
+        assert pysensu_yelp.parse_transport(spec) is expected
+
+    def test_sinks(self):
+        assert isinstance(pysensu_yelp.parse_transport("memory"), MemorySink)
+        assert isinstance(pysensu_yelp.parse_transport("null"), NullSink)
+        sink = pysensu_yelp.parse_transport("file:/tmp/some/events.ndjson")
+        assert isinstance(sink, FileSink)
+        assert sink.path == "/tmp/some/events.ndjson"
+
+    def test_unknown(self):
+        with pytest.raises(ValueError, match="Unknown transport 'carrier_pigeon'"):
+            pysensu_yelp.parse_transport("carrier_pigeon")
+
+    def test_environment(self, monkeypatch, tmp_path):
+        path = tmp_path / "events.ndjson"
+        monkeypatch.setenv(pysensu_yelp.TRANSPORT_ENVIRONMENT_VARIABLE, f"file:{path}")
+        pysensu_yelp.SensuClient().send_event(**make_event())
+        assert json.loads(path.read_bytes())["name"] == "a_check"
+
+    def test_explicit_transport_wins(self, monkeypatch):
+        monkeypatch.setenv(pysensu_yelp.TRANSPORT_ENVIRONMENT_VARIABLE, "null")
+        client = pysensu_yelp.SensuClient(transport=pysensu_yelp.Transport.UDP)
+        assert client.transport is pysensu_yelp.Transport.UDP
+        assert isinstance(pysensu_yelp.SensuClient().transport, NullSink)
+
+    def test_unknown_environment(self, monkeypatch, caplog):
+        monkeypatch.setenv(pysensu_yelp.TRANSPORT_ENVIRONMENT_VARIABLE, "bogus")
+        with pytest.raises(ValueError, match="Unknown transport 'bogus'"):
+            pysensu_yelp.SensuClient()
+        client = pysensu_yelp._make_default_client()
+        assert client.transport is pysensu_yelp.Transport.TCP
+        assert "Ignoring PYSENSU_YELP_TRANSPORT" in caplog.text
+
+    def test_unknown_environment_import(self):
+        output = subprocess.check_output(
+            [
+                sys.executable,
+                "-c",
+                "import pysensu_yelp; print(pysensu_yelp.Status.OK.name)",
+            ],
+            env=dict(
+                os.environ, **{pysensu_yelp.TRANSPORT_ENVIRONMENT_VARIABLE: "bogus"}
+            ),
+            stderr=subprocess.STDOUT,
+        )
+        assert output.splitlines()[-1] == b"OK"
@@ -0,0 +1,136 @@
+import json
+import os
+from unittest import mock
+
+import pytest
+
+import pysensu_yelp
+from pysensu_yelp.spool import compact
+from pysensu_yelp.spool import Spool
+
+
+def encode(name, status=0, source=None):
+    return pysensu_yelp.encode_event(
+        pysensu_yelp.build_event(
+            name=name,
+            runbook="a_runbook",
+            status=status,
+            output="some output",
+            team="a_team",
+            source=source,
+        )
+    )
+
+
+def statuses(payloads):
+    return [(json.loads(p)["name"], json.loads(p)["status"]) for p in payloads]
+
+
+@pytest.fixture
+def spool_path(tmp_path):
+    return str(tmp_path / "sensu.spool")
+
+
+def test_compact_keeps_newest_per_check_in_order():
+    lines = [
+        encode("a", 0),
+        encode("b", 0),
+        encode("a", 1, source="elsewhere"),
+        encode("a", 2),
+        b'{"name": "torn',
+        encode("c", 0)[:-1],
+    ]
+    assert compact(lines) == [lines[1], lines[2], lines[3]]
+
+
+def test_append_and_replay(spool_path):
+    spool = Spool(spool_path)
+    assert not spool.pending
+    spool.append([encode("a", 0), encode("b", 0)])
+    spool.append([encode("a", 2)])
+    assert spool.pending
+    sent = []
+    assert spool.replay(sent.extend) == 2
+    assert statuses(sent) == [("b", 0), ("a", 2)]
+    assert not spool.pending
+    assert not os.path.exists(spool_path)
+
+
+def test_survives_restart(spool_path):
+    Spool(spool_path).append([encode("a")])
+    spool = Spool(spool_path)
+    assert spool.pending
+    sent = []
+    spool.replay(sent.extend)
+    assert statuses(sent) == [("a", 0)]
+
+
+def test_failed_replay_keeps_spool(spool_path):
+    spool = Spool(spool_path)
+    spool.append([encode("a")])
+    with pytest.raises(ConnectionRefusedError):
+        spool.replay(mock.Mock(side_effect=ConnectionRefusedError))
+    assert spool.pending
+    sent = []
+    spool.replay(sent.extend)
+    assert statuses(sent) == [("a", 0)]
+
+
+def test_compacted_when_full(spool_path):
+    payload = encode("a")
+    spool = Spool(spool_path, max_bytes=len(payload) * 3)
+    for _ in range(10):
+        spool.append([payload])
+    assert os.path.getsize(spool_path) <= len(payload) * 3
+    assert not os.path.exists(spool.rotated_path)
+
+
+def test_rotated_when_compaction_is_not_enough(spool_path):
+    spool = Spool(spool_path, max_bytes=len(encode("a")) * 3)
+    spool.append([encode(f"check_{i}") for i in range(4)])
+    spool.append([encode("check_4")])
+    assert os.path.exists(spool.rotated_path)
+    sent = []
+    spool.replay(sent.extend, batch_size=2)
+    assert [name for name, _ in statuses(sent)] == [f"check_{i}" for i in range(5)]
+    assert not os.path.exists(spool.rotated_path)
+
+
+class TestClientSpooling:
+    def make_client(self, spool_path):
+        return pysensu_yelp.SensuClient(spool=Spool(spool_path))
+
+    def send(self, client, name, status=0):
+        client.send_event(
+            name=name, runbook="a_runbook", status=status, output="out", team="a"
+        )
+
+    def test_spools_instead_of_raising(self, spool_path):
+        client = self.make_client(spool_path)
+        magic_skt = mock.MagicMock()
+        magic_skt.connect.side_effect = ConnectionRefusedError
+        with mock.patch("socket.socket", return_value=magic_skt):
+            self.send(client, "a")
+        assert client.spool.pending
+
+    def test_replays_before_next_event(self, spool_path):
+        client = self.make_client(spool_path)
+        down_skt = mock.MagicMock()
+        down_skt.connect.side_effect = ConnectionRefusedError
+        up_skt = mock.MagicMock()
+        with mock.patch("socket.socket", side_effect=[down_skt, down_skt, up_skt]):
+            self.send(client, "a", 2)
+            self.send(client, "b", 2)
+            self.send(client, "a", 0)
+        sent = b"".join(c[0][0] for c in up_skt.sendall.call_args_list)
+        assert statuses(sent.splitlines()) == [("a", 2), ("b", 2), ("a", 0)]
+        assert not client.spool.pending
+
+    def test_replay_spool(self, spool_path):
+        Spool(spool_path).append([encode("a")])
+        client = self.make_client(spool_path)
+        magic_skt = mock.MagicMock()
+        with mock.patch("socket.socket", return_value=magic_skt):
+            assert client.replay_spool() == 1
+            assert client.replay_spool() == 0
+        magic_skt.sendall.assert_called_once_with(encode("a"))
@@ -0,0 +1,183 @@
+import json
+import socket
+import time
+from unittest import mock
+
+import pytest
+from conftest import make_event
+
+import pysensu_yelp
+from pysensu_yelp.emitter import BackgroundEmitter
+from pysensu_yelp.emitter import Overflow
+from pysensu_yelp.sinks import MemorySink
+from pysensu_yelp.spool import Spool
+from pysensu_yelp.stats import Histogram
+from pysensu_yelp.stats import payload_name
+from pysensu_yelp.stats import Stats
+from pysensu_yelp.suppression import Suppressor
+
+
+@pytest.fixture
+def listener():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(8)
+    yield server.getsockname()
+    server.close()
+
+
+def test_counts_sent_events(listener):
+    stats = Stats()
+    host, port = listener
+    client = pysensu_yelp.SensuClient(sensu_host=host, sensu_port=port, stats=stats)
+    client.send_event(**make_event("a"))
+    client.send_events([make_event("a"), make_event("b")])
+    client.close()
+
+    snapshot = stats.snapshot()
+    assert snapshot["checks"]["a"]["sent"] == 2
+    assert snapshot["checks"]["b"]["sent"] == 1
+    assert snapshot["totals"]["sent"] == 3
+    assert snapshot["bytes_written"] == sum(
+        len(pysensu_yelp.encode_event(pysensu_yelp.build_event(**make_event(name))))
+        for name in "aab"
+    )
+    assert snapshot["connect_latency"]["count"] == 1
+    assert snapshot["send_latency"]["count"] == 2
+    json.dumps(snapshot)
+
+
+def test_counts_failed_events(closed_port):
+    stats = Stats()
+    client = pysensu_yelp.SensuClient(
+        sensu_host="127.0.0.1", sensu_port=closed_port, stats=stats
+    )
+    with pytest.raises(ConnectionRefusedError):
+        client.send_event(**make_event())
+    assert stats.totals() == dict(sent=0, failed=1, spooled=0, dropped=0, suppressed=0)
+
+
+def test_counts_spooled_events(closed_port, tmp_path):
+    stats = Stats()
+    client = pysensu_yelp.SensuClient(
+        sensu_host="127.0.0.1",
+        sensu_port=closed_port,
+        spool=Spool(str(tmp_path / "spool")),
+        stats=stats,
+    )
+    client.send_event(**make_event())
+    assert stats.totals() == dict(sent=0, failed=0, spooled=1, dropped=0, suppressed=0)
+    assert stats.health()[0] == pysensu_yelp.Status.OK
+
+
+def test_counts_suppressed_events():
+    stats = Stats()
+    client = pysensu_yelp.SensuClient(
+        transport=MemorySink(), suppressor=Suppressor(), stats=stats
+    )
+    client.send_event(**make_event())
+    client.send_event(**make_event())
+    client.send_events([make_event()])
+    pysensu_yelp.CheckTemplate("a_check", "a_runbook", "a_team").emit(
+        0, "output", client=client
+    )
+    assert stats.checks["a_check"]["sent"] == 1
+    assert stats.checks["a_check"]["suppressed"] == 3
+
+
+def test_counts_dropped_events():
+    stats = Stats()
+    emitter = BackgroundEmitter(
+        transport=MemorySink(),
+        max_queue_size=1,
+        overflow=Overflow.DROP_NEWEST,
+        stats=stats,
+    )
+    destination = emitter._destination(None, None, None)
+    payload = pysensu_yelp.encode_event(pysensu_yelp.build_event(**make_event("a")))
+    with emitter._cond:
+        emitter._enqueue((payload, destination))
+        emitter._enqueue((payload, destination))
+    assert stats.checks["a"]["dropped"] == 1
+
+
+def test_hook():
+    hook = mock.Mock()
+    client = pysensu_yelp.SensuClient(transport=MemorySink(), stats=Stats(hook))
+    client.send_event(**make_event())
+    metrics = [call[0][:2] for call in hook.call_args_list]
+    assert metrics == [
+        ("send_latency", None),
+        ("bytes_written", None),
+        ("sent", "a_check"),
+    ]
+
+
+def test_hook_errors_are_ignored():
+    hook = mock.Mock(side_effect=ValueError)
+    stats = Stats(hook)
+    client = pysensu_yelp.SensuClient(transport=MemorySink(), stats=stats)
+    client.send_event(**make_event())
+    assert stats.checks["a_check"]["sent"] == 1
+
+
+def test_payload_name():
+    assert payload_name(b'{"name":"a.b-c","status":0}\n') == "a.b-c"
+    assert payload_name(b'{"status":0,"name":"late"}\n') == "late"
+    assert payload_name(b"not json") == "<unknown>"
+
+
+@pytest.mark.parametrize("serializer", sorted(pysensu_yelp.serializers))
+def test_payload_name_non_ascii(serializer):
+    result_dict = pysensu_yelp.build_event(**make_event(name="caf\u00e9"))
+    payload = pysensu_yelp.serializers[serializer](result_dict)
+    assert payload_name(payload) == "caf\u00e9"
+
+
+def test_histogram():
+    histogram = Histogram([1, 2, 5])
+    assert histogram.quantile(0.5) == 0
+    for value in (0.5, 1, 1.5, 3, 10):
+        histogram.observe(value)
+    assert histogram.quantile(0.4) == 1
+    assert histogram.quantile(0.6) == 2
+    assert histogram.quantile(0.99) == float("inf")
+    assert histogram.snapshot() == {
+        "count": 5,
+        "sum": 16,
+        "buckets": {"1": 2, "2": 1, "5": 1, "+Inf": 1},
+    }
+
+
+class TestHealth:
+    def test_warns_about_failures_since_last_report(self):
+        stats = Stats()
+        stats.count("sent", "a", 3)
+        stats.count("failed", "a")
+        status, output = stats.health()
+        assert status == pysensu_yelp.Status.WARNING
+        assert output.startswith("WARNING: 3 events sent, 1 failed, 0 dropped")
+        stats.count("sent", "a")
+        status, output = stats.health()
+        assert status == pysensu_yelp.Status.OK
+        assert output.startswith("OK: 1 events sent, 0 failed")
+
+    def test_health_check(self):
+        sink = MemorySink()
+        stats = Stats()
+        client = pysensu_yelp.SensuClient(transport=sink, stats=stats)
+        stats.start_health_check(
+            client, "health", "a_runbook", "a_team", interval=0.05, ttl="1m"
+        )
+        try:
+            deadline = time.monotonic() + 5
+            while len(sink.payloads) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            stats.stop_health_check()
+        first, second = sink.results()[:2]
+        assert first["name"] == "health"
+        assert first["ttl"] == 60
+        assert first["output"].startswith("OK: 0 events sent")
+        # The first report is counted in the second
+        assert second["output"].startswith("OK: 1 events sent")
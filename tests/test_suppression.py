@@ -0,0 +1,123 @@
+from unittest import mock
+
+import pytest
+from conftest import FakeClock
+
+import pysensu_yelp
+from pysensu_yelp.suppression import Suppressor
+
+
+@pytest.fixture
+def clock():
+    return FakeClock(1000.0)
+
+
+def make_suppressor(clock, **kwargs):
+    suppressor = Suppressor(**kwargs)
+    suppressor._clock = clock
+    return suppressor
+
+
+def make_result(name="a_check", status=0, output="OK", **kwargs):
+    return pysensu_yelp.build_event(
+        name=name,
+        runbook="a_runbook",
+        status=status,
+        output=output,
+        team="a_team",
+        **kwargs,
+    )
+
+
+def test_repeats_sent_once_per_check_every(clock):
+    suppressor = make_suppressor(clock)
+    result = make_result(check_every="1m")
+    assert suppressor.should_send(result)
+    clock.now += 59
+    assert not suppressor.should_send(result)
+    assert not suppressor.should_send(result)
+    assert suppressor.suppressed_count("a_check") == 2
+    clock.now += 1
+    assert suppressor.should_send(result)
+    assert suppressor.suppressed_count("a_check") == 0
+    assert (suppressor.sent, suppressor.suppressed) == (2, 2)
+
+
+def test_changes_sent_immediately(clock):
+    suppressor = make_suppressor(clock)
+    assert suppressor.should_send(make_result(status=0))
+    assert suppressor.should_send(make_result(status=2))
+    assert suppressor.should_send(make_result(status=2, output="worse"))
+    assert not suppressor.should_send(make_result(status=2, output="worse"))
+
+
+def test_checks_tracked_separately(clock):
+    suppressor = make_suppressor(clock)
+    assert suppressor.should_send(make_result())
+    assert suppressor.should_send(make_result(name="another_check"))
+    assert suppressor.should_send(make_result(source="another_source"))
+    assert not suppressor.should_send(make_result(source="another_source"))
+
+
+def test_explicit_interval_capped_by_ttl(clock):
+    suppressor = make_suppressor(clock, interval=3600)
+    result = make_result(ttl="10m")
+    assert suppressor.should_send(result)
+    clock.now += 299
+    assert not suppressor.should_send(result)
+    clock.now += 1
+    assert suppressor.should_send(result)
+
+
+def test_max_checks(clock):
+    suppressor = make_suppressor(clock, max_checks=2)
+    for name in ("check_1", "check_2", "check_3"):
+        assert suppressor.should_send(make_result(name=name))
+    assert len(suppressor._checks) == 2
+    # check_1 was forgotten, so it isn't suppressed
+    assert suppressor.should_send(make_result(name="check_1"))
+    assert not suppressor.should_send(make_result(name="check_3"))
+
+
+def test_client_suppresses_send_event_and_emit():
+    client = pysensu_yelp.SensuClient(suppressor=Suppressor())
+    with mock.patch.object(client, "_write") as write:
+        for _ in range(3):
+            client.send_event(
+                name="a_check", runbook="a_runbook", status=0, output="OK", team="a"
+            )
+        template = pysensu_yelp.CheckTemplate(name="a_check", runbook="r", team="a")
+        template.emit(0, "OK", client=client)
+        template.emit(2, "CRIT", client=client)
+    assert write.call_count == 2
+
+
+def test_client_send_events_filters(clock):
+    client = pysensu_yelp.SensuClient(suppressor=make_suppressor(clock))
+    event = dict(name="a_check", runbook="a_runbook", status=0, output="OK", team="a")
+    with mock.patch.object(client, "_write") as write:
+        client.send_events([event, dict(event, name="b_check"), event])
+    payloads, _ = write.call_args[0]
+    assert len(payloads) == 2
+
+
+def test_would_send_does_not_record(clock):
+    suppressor = make_suppressor(clock)
+    result = make_result(check_every="1m")
+    assert suppressor.would_send(result)
+    assert suppressor.would_send(result)
+    suppressor.record_sent(result)
+    assert not suppressor.would_send(result)
+    assert (suppressor.sent, suppressor.suppressed) == (1, 1)
+
+
+def test_client_retries_failed_send():
+    client = pysensu_yelp.SensuClient(suppressor=Suppressor())
+    event = dict(name="a_check", runbook="a_runbook", status=2, output="CRIT", team="a")
+    with mock.patch.object(client, "_write", side_effect=ConnectionRefusedError):
+        with pytest.raises(ConnectionRefusedError):
+            client.send_event(**event)
+    with mock.patch.object(client, "_write") as write:
+        client.send_event(**event)
+        client.send_event(**event)
+    assert write.call_count == 1
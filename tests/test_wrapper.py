@@ -0,0 +1,206 @@
+import io
+import json
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+from unittest import mock
+
+import pytest
+
+import pysensu_yelp
+from pysensu_yelp import wrapper
+
+
+class TestReadOutput:
+    def test_short_output(self):
+        output = "OK: ☃ is fine\nreally".encode()
+        assert wrapper.read_output(io.BytesIO(output), 1024) == output.decode()
+
+    def test_exactly_max_bytes(self):
+        output = b"x" * 1024
+        assert wrapper.read_output(io.BytesIO(output), 1024) == output.decode()
+
+    def test_keeps_head_and_tail(self):
+        output = b"OK: first line\n" + b"x" * 1000000 + b"\nlast line"
+        captured = wrapper.read_output(io.BytesIO(output), 100)
+        head, omitted, tail = re.match(
+            r"(.*)\n\[\.\.\. (\d+) bytes omitted \.\.\.\]\n(.*)\Z", captured, re.S
+        ).groups()
+        assert head.startswith("OK: first line\n")
+        assert len(head) == 50
+        assert tail.endswith("\nlast line")
+        assert len(tail) == 50
+        assert int(omitted) == len(output) - 100
+
+    def test_memory_bounded(self):
+        class Endless(io.RawIOBase):
+            left = 20 * 1024 * 1024
+
+            def readable(self):
+                return True
+
+            def readinto(self, buffer):
+                size = min(len(buffer), self.left)
+                buffer[:size] = b"y" * size
+                self.left -= size
+                return size
+
+        tracemalloc.start()
+        try:
+            captured = wrapper.read_output(io.BufferedReader(Endless()), 1000)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert len(captured) < 1100
+        assert peak < 1024 * 1024
+
+    def test_invalid_utf8_replaced(self):
+        output = b"bad \xff byte"
+        assert wrapper.read_output(io.BytesIO(output)) == "bad � byte"
+
+    def test_tail_does_not_start_mid_character(self):
+        output = b"x" * 100 + "☃".encode() * 100
+        captured = wrapper.read_output(io.BytesIO(output), 100)
+        tail = captured.rsplit("\n", 1)[1]
+        assert "�" not in tail
+        assert set(tail) == {"☃"}
+
+
+class TestDoCommandWrapper:
+    sensu_dict = {"name": "a_check", "runbook": "a_runbook", "team": "a_team"}
+
+    def run(self, *args):
+        with mock.patch.object(sys, "argv", ["pysensu_yelp", *args]), mock.patch.object(
+            pysensu_yelp._default_client, "send_result"
+        ) as send_result:
+            assert wrapper.do_command_wrapper() == 0
+        send_result.assert_called_once()
+        return send_result.call_args[0][0]
+
+    def run_script(self, script, *options):
+        return self.run(
+            *options, json.dumps(self.sensu_dict), sys.executable, "-c", script
+        )
+
+    def test_reports_output_as_text(self):
+        event = self.run(
+            json.dumps(self.sensu_dict),
+            sys.executable,
+            "-c",
+            "print('OK: ☃'); import sys; sys.stderr.write('and stderr')",
+        )
+        assert event["output"] == "OK: ☃\nand stderr"
+        assert event["status"] == 0
+        json.dumps(event)
+
+    def test_max_output_bytes(self):
+        event = self.run(
+            "--max-output-bytes",
+            "20",
+            json.dumps(self.sensu_dict),
+            sys.executable,
+            "-c",
+            "print('x' * 100000)",
+        )
+        assert "bytes omitted" in event["output"]
+        assert len(event["output"]) < 100
+
+    @pytest.mark.parametrize(
+        "policy,returncode,expected",
+        [
+            ("nagios", 0, pysensu_yelp.Status.OK),
+            ("nagios", 2, pysensu_yelp.Status.CRITICAL),
+            ("nagios", 3, pysensu_yelp.Status.UNKNOWN),
+            ("nagios", 127, pysensu_yelp.Status.UNKNOWN),
+            ("max-warning", 0, pysensu_yelp.Status.OK),
+            ("max-warning", 2, pysensu_yelp.Status.WARNING),
+        ],
+    )
+    def test_status_policy(self, policy, returncode, expected):
+        event = self.run_script(
+            f"import sys; sys.exit({returncode})", "--status-policy", policy
+        )
+        assert event["status"] == expected
+
+    def test_killed_by_signal_is_unknown(self):
+        event = self.run_script(
+            "import os, signal; os.kill(os.getpid(), signal.SIGTERM)"
+        )
+        assert event["status"] == pysensu_yelp.Status.UNKNOWN
+
+    def test_records_resource_usage(self):
+        event = self.run_script("x = b'x' * 50 * 1024 * 1024; sum(range(10 ** 6))")
+        assert event["duration"] >= event["cpu_time"] > 0
+        assert event["max_rss_kb"] >= 50 * 1024
+
+    def test_timeout_kills_process_group(self, tmp_path):
+        pidfile = tmp_path / "pid"
+        # The grandchild holds on to stdout, so we'd wait for it too
+        script = (
+            "import subprocess, sys; "
+            "p = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); "
+            f"open({str(pidfile)!r}, 'w').write(str(p.pid)); "
+            "print('started', flush=True); p.wait()"
+        )
+        event = self.run_script(script, "--timeout", "0.5")
+        assert event["status"] == pysensu_yelp.Status.UNKNOWN
+        assert event["output"].startswith("UNKNOWN: Timed out after 0.")
+        assert "started" in event["output"]
+        assert event["duration"] < 10
+        # SIGKILL takes a moment, after which the grandchild is gone or a
+        # zombie waiting for init to reap it
+        stat = "/proc/{}/stat".format(pidfile.read_text())
+        for _ in range(100):
+            try:
+                with open(stat) as f:
+                    if f.read().rsplit(")", 1)[1].split()[0] == "Z":
+                        break
+            except FileNotFoundError:
+                break
+            time.sleep(0.05)
+        else:
+            pytest.fail("grandchild is still running")
+
+    def test_status_and_output_in_sensu_dict_are_replaced(self):
+        sensu_dict = dict(self.sensu_dict, status=0, output="")
+        event = self.run(json.dumps(sensu_dict), sys.executable, "-c", "exit(2)")
+        assert event["status"] == 2
+        assert event["output"] == ""
+
+    def test_transport_from_sensu_dict(self):
+        sensu_dict = dict(self.sensu_dict, transport="udp", sensu_port=1234)
+        with mock.patch.object(
+            sys, "argv", ["pysensu_yelp", json.dumps(sensu_dict), "true"]
+        ), mock.patch.object(
+            pysensu_yelp._default_client, "send_result"
+        ) as send_result:
+            wrapper.do_command_wrapper()
+        assert send_result.call_args[1] == {
+            "sensu_host": None,
+            "sensu_port": 1234,
+            "transport": pysensu_yelp.Transport.UDP,
+        }
+
+
+class TestLazyImport:
+    def test_library_does_not_import_cli_machinery(self):
+        script = (
+            "import sys, pysensu_yelp; "
+            "print([m for m in ('argparse', 'subprocess') if m in sys.modules])"
+        )
+        output = subprocess.check_output([sys.executable, "-c", script])
+        assert output.strip() == b"[]"
+
+    def test_wrapper_names_are_loaded_on_use(self):
+        assert pysensu_yelp.do_command_wrapper is wrapper.do_command_wrapper
+        assert pysensu_yelp.DEFAULT_MAX_OUTPUT_BYTES == wrapper.DEFAULT_MAX_OUTPUT_BYTES
+        with pytest.raises(AttributeError):
+            pysensu_yelp.no_such_thing
+
+    def test_run_as_module(self):
+        output = subprocess.check_output(
+            [sys.executable, "-m", "pysensu_yelp", "--help"]
+        )
+        assert b"sensu_dict" in output